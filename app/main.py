@@ -5,7 +5,7 @@ FastAPI 应用主入口
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import search, add, upload, feishu_webhook  # ✅ 加入 feishu_webhook
+from app.routes import search, add, upload, feishu_webhook, metrics  # ✅ 加入 feishu_webhook
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -28,6 +28,7 @@ app.include_router(search.router, tags=["搜索"])
 app.include_router(add.router, tags=["数据更新"])
 app.include_router(upload.router, tags=["上传简历"])  # ✅ 新增上传模块
 app.include_router(feishu_webhook.router, tags=["飞书Bot"])  # ✅ 注册路由
+app.include_router(metrics.router, tags=["运行指标"])
 
 # 健康检查接口
 @app.get("/health")
@@ -7,10 +7,12 @@ import requests
 from dotenv import load_dotenv
 from datetime import datetime
 
+from scripts.collection_registry import active_class
+
 load_dotenv()
 
 WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
 
 router = APIRouter()
 
@@ -41,7 +43,8 @@ def add_note(data: NoteData):
 # ========== 更新简历内容（保留沟通记录） ==========
 @router.patch("/update_resume_content", summary="更新简历内容（保留原有沟通记录）")
 def update_resume_content(data: UpdateResumeData):
-    get_url = f"{WEAVIATE_URL}/v1/objects/{WEAVIATE_CLASS}/{data.uuid}"
+    weaviate_class = active_class(WEAVIATE_COLLECTION)  # 集合注册表中当前生效的物理 class
+    get_url = f"{WEAVIATE_URL}/v1/objects/{weaviate_class}/{data.uuid}"
     res = requests.get(get_url)
 
     if res.status_code != 200:
@@ -63,7 +66,7 @@ def update_resume_content(data: UpdateResumeData):
     if data.filename:
         update_payload["properties"]["filename"] = data.filename
 
-    update_url = f"{WEAVIATE_URL}/v1/objects/{WEAVIATE_CLASS}/{data.uuid}"
+    update_url = f"{WEAVIATE_URL}/v1/objects/{weaviate_class}/{data.uuid}"
     update_res = requests.patch(update_url, json=update_payload)
 
     if update_res.status_code in [200, 204]:
@@ -74,7 +77,8 @@ def update_resume_content(data: UpdateResumeData):
 # ========== 新增：供飞书机器人/本地使用的添加笔记函数 ==========
 def add_note_by_uuid(uuid: str, note: str) -> bool:
     try:
-        get_url = f"{WEAVIATE_URL}/v1/objects/{WEAVIATE_CLASS}/{uuid}"
+        weaviate_class = active_class(WEAVIATE_COLLECTION)
+        get_url = f"{WEAVIATE_URL}/v1/objects/{weaviate_class}/{uuid}"
         res = requests.get(get_url)
         if res.status_code != 200:
             print(f"[❌] 未找到候选人 {uuid}")
@@ -90,7 +94,7 @@ def add_note_by_uuid(uuid: str, note: str) -> bool:
         new_note = f"{timestamp} - {note}"
         updated_notes = old_notes + [new_note]
 
-        update_url = f"{WEAVIATE_URL}/v1/objects/{WEAVIATE_CLASS}/{uuid}"
+        update_url = f"{WEAVIATE_URL}/v1/objects/{weaviate_class}/{uuid}"
         update_payload = {
             "properties": {
                 "notes": updated_notes
@@ -3,8 +3,8 @@ import os
 import logging
 import re
 import asyncio
-from openai import OpenAI
 from typing import Optional
+from scripts.provider_client import get_client
 
 # ✅ 常量配置
 MAX_TEXT_LENGTH = 1500  # 防止 prompt 太长
@@ -12,7 +12,7 @@ MAX_SUMMARY_POINTS = 5  # 最多展示的摘要条数
 GPT_MODEL = "gpt-4o"
 
 # ✅ 初始化
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_client("openai", api_key=os.getenv("OPENAI_API_KEY"), chat_model=GPT_MODEL)
 logger = logging.getLogger(__name__)
 
 def is_structured(text: str) -> bool:
@@ -108,16 +108,18 @@ async def clean_summary_with_gpt(text: str) -> str:
             f"{text.strip()}\n\n"
             "请直接输出 bullet point 格式，每条以 • 开头。"
         )
-        response = client.chat.completions.create(
+        messages = [
+            {"role": "system", "content": "你是一个专业的招聘助手，擅长提炼候选人简历内容为要点摘要。"},
+            {"role": "user", "content": prompt}
+        ]
+        # temperature 0.3 的生成式摘要直接调用模型；LLM 缓存只用于 temperature=0 的抽取类 prompt
+        content = client.chat(
+            messages,
             model=GPT_MODEL,
-            messages=[
-                {"role": "system", "content": "你是一个专业的招聘助手，擅长提炼候选人简历内容为要点摘要。"},
-                {"role": "user", "content": prompt}
-            ],
             temperature=0.3
         )
         try:
-            content = response.choices[0].message.content.strip()
+            content = content.strip()
             logger.debug(f"[GPT清洗后摘要] {content}")
             if content:
                 return content
@@ -21,7 +21,8 @@ from app.utils.memory import (
     find_abnormal_names,
     standardize_candidate_fields
 )
-from openai import OpenAI
+from scripts.provider_client import get_client
+from scripts.candidate_schema import split_filter_terms
 
 # ✅ 加载环境变量（确保在最顶部）
 load_dotenv()
@@ -31,6 +32,7 @@ GPT_USAGE_GUIDE = (
     "你好，我是招聘智能助手 😊\n"
     "📌 可用命令：\n"
     "- 搜索候选人：`#search 职位关键词`\n"
+    "  可附加条件：`#search 光学工程师 5年以上 本科及以上 深圳`，也支持 `城市:上海 学历:硕士 公司:华为 年限:3-5`\n"
     "- 添加沟通记录：`#add_note UUID:备注内容`\n"
     "如有其他问题，欢迎直接提问～"
 )
@@ -102,8 +104,10 @@ async def handle_webhook(request: Request):
                 
                 # ✅ 记录搜索关键词
                 update_session(sender_id, "last_search_query", keyword)
-                
-                results = await search_candidates_async(keyword, top_k=5)
+
+                # ✅ 年限 / 学历 / 城市等条件转为过滤条件，在向量检索前执行
+                query, filters = split_filter_terms(keyword)
+                results = await search_candidates_async(query, top_k=5, filters=filters or None)
                 logger.info(f"[DEBUG] search_candidates_async 返回类型: {type(results)}")
                 logger.info(f"[DEBUG] search_candidates_async 返回值预览: {str(results)[:500]}")
                 
@@ -178,7 +182,7 @@ async def handle_webhook(request: Request):
         logger.error("❌ webhook 处理失败:\n" + traceback.format_exc())
         return {"status": "error", "reason": str(e)}
 
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai_client = get_client("openai", api_key=os.getenv("OPENAI_API_KEY"), chat_model=GPT_MODEL)
 
 async def handle_gpt_fusion_intent(text: str, sender_id: str = None, previous_results: str = None) -> str:
     system_prompt = """
@@ -278,12 +282,13 @@ async def handle_gpt_fusion_intent(text: str, sender_id: str = None, previous_re
         else:
             messages.append({"role": "user", "content": text})
 
-        response = openai_client.chat.completions.create(
+        # 对话式回复（temperature 0.3）直接调用模型，不走 LLM 缓存：同一句话不应总得到同一条回答
+        content = openai_client.chat(
+            messages,
             model=GPT_MODEL,
-            messages=messages,
             temperature=0.3
         )
-        return response.choices[0].message.content.strip()
+        return content.strip()
     except Exception as e:
         logger.error(f"❌ GPT融合处理失败: {e}")
         return GPT_USAGE_GUIDE  # fallback
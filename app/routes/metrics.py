@@ -0,0 +1,30 @@
+"""
+运行指标路由模块
+暴露缓存命中率、模型服务限流状态等运行时统计，便于排查成本与性能问题
+"""
+
+from fastapi import APIRouter
+from scripts.embedding_cache import get_embedding_cache
+from scripts.llm_cache import get_cache
+from scripts.rate_controller import limiter_stats
+
+router = APIRouter()
+
+@router.get("/metrics", summary="运行指标")
+async def get_metrics():
+    llm_cache = get_cache()
+    embedding_cache = get_embedding_cache()
+    return {
+        "llm_cache": {
+            "mode": llm_cache.mode,
+            "by_call_site": llm_cache.stats(),
+            "disk": llm_cache.disk_usage(),
+        },
+        "embedding_cache": {
+            "mode": embedding_cache.mode,
+            "by_scope": embedding_cache.stats(),
+            "disk": embedding_cache.disk_usage(),
+        },
+        # 每个 provider 当前的并发 / 速率预算（AIMD）与限流次数
+        "providers": limiter_stats(),
+    }
@@ -3,6 +3,9 @@
 处理简历搜索相关的 API 路由
 """
 
+from datetime import datetime
+from typing import List, Literal, Optional, Union
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from app.utils.search_runner import SearchRunner
@@ -10,9 +13,29 @@ import asyncio  # ✅ 新增，用于在非 async 场景中调用 async search()
 
 router = APIRouter()
 
+class SearchFilters(BaseModel):
+    """在 Weaviate 内先过滤、再做向量检索；多个条件同时满足，列表值表示任一匹配"""
+    name: Optional[Union[str, List[str]]] = Field(default=None, description="姓名（精确匹配）")
+    position: Optional[str] = Field(default=None, description="应聘职位（包含匹配），如'光学'")
+    phone: Optional[str] = Field(default=None, description="手机号（纯数字）")
+    email: Optional[str] = Field(default=None, description="邮箱（小写）")
+    source_hash: Optional[str] = Field(default=None, description="源文件 sha256")
+    ingested_after: Optional[datetime] = Field(default=None, description="入库时间下限，如 2025-06-01")
+    ingested_before: Optional[datetime] = Field(default=None, description="入库时间上限")
+    min_years: Optional[float] = Field(default=None, ge=0, description="工作年限下限，如 5")
+    max_years: Optional[float] = Field(default=None, ge=0, description="工作年限上限")
+    degree: Optional[str] = Field(default=None, description="最高学历（精确）：初中 / 高中 / 中专 / 大专 / 本科 / 硕士 / 博士")
+    min_degree: Optional[str] = Field(default=None, description="最低学历，如'本科'表示本科及以上")
+    city: Optional[Union[str, List[str]]] = Field(default=None, description="所在城市，如'深圳'")
+    recent_company: Optional[str] = Field(default=None, description="最近任职公司（包含匹配）")
+
 class SearchRequest(BaseModel):
     query: str = Field(..., description="搜索关键词，如'光学工程师'")
     top_k: int = Field(default=5, ge=1, le=20, description="返回结果数量")
+    filters: Optional[SearchFilters] = Field(default=None, description="结构化过滤条件")
+    mode: Optional[Literal["vector", "keyword", "hybrid"]] = Field(
+        default=None, description="检索模式：vector（向量）/ keyword（BM25 关键词）/ hybrid（混合），默认取 SEARCH_MODE")
+    alpha: Optional[float] = Field(default=None, ge=0, le=1, description="混合检索中向量得分的权重，1 为纯向量，0 为纯关键词")
 
 @router.post("/search", summary="搜索简历")
 async def search_resumes(request: SearchRequest):
@@ -20,11 +43,16 @@ async def search_resumes(request: SearchRequest):
     搜索简历接口
     - query: 搜索关键词（如"光学工程师"）
     - top_k: 返回前 top_k 个候选人
+    - filters: 姓名 / 职位 / 手机号 / 邮箱 / 源文件哈希 / 入库时间范围 / 工作年限范围 / 学历 / 城市 / 最近公司
+    - mode / alpha: 向量 / 关键词 / 混合检索，混合检索的向量权重
     """
+    filters = request.filters.model_dump(exclude_none=True) if request.filters else None
     try:
         print(f"搜索关键词: {request.query}")
         search_runner = SearchRunner()
-        results = await search_runner.search(request.query, request.top_k)
+        results = await search_runner.search(request.query, request.top_k, filters, request.mode, request.alpha)
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"搜索失败: {str(e)}")
\ No newline at end of file
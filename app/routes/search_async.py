@@ -4,6 +4,7 @@
 """
 
 from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, Field
 from app.utils.search_runner import SearchRunner
 import logging
@@ -31,11 +32,11 @@ async def search_resumes(request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"搜索失败: {str(e)}")
 
 # ✅ 供 feishu_webhook 调用的异步函数
-async def search_candidates_async(query: str, top_k: int = 5) -> list:
+async def search_candidates_async(query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> list:
     try:
-        logger.info(f"[🔍 Feishu] 内部搜索关键词: {query}")
+        logger.info(f"[🔍 Feishu] 内部搜索关键词: {query}，过滤条件: {filters or '无'}")
         search_runner = SearchRunner()
-        results = await search_runner.search(query, top_k)
+        results = await search_runner.search(query, top_k, filters)
         logger.info(f"[🔍 Feishu] 搜索结果: {results}")
         
         # 确保返回格式正确
@@ -45,6 +46,10 @@ async def search_candidates_async(query: str, top_k: int = 5) -> list:
             logger.warning(f"[⚠️ Feishu] 搜索结果格式不正确: {results}")
             return {"候选人列表": []}
             
+    except ValueError as e:
+        # 过滤条件无法识别或集合缺少属性：原样提示给用户（webhook 收到字符串会直接回复）
+        logger.warning(f"[⚠️ Feishu] 过滤条件无效: {e}")
+        return f"过滤条件无效：{e}"
     except Exception as e:
         logger.error(f"[❌ Feishu搜索失败] {e}")
         return {"候选人列表": []}
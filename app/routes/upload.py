@@ -12,7 +12,7 @@ router = APIRouter()
 # 📁 设置目录路径
 UPLOAD_DIR = Path("~/Documents/recruitment_rag_system/data/resumes").expanduser()
 EXTRACT_SCRIPT = Path("scripts/extract_text_openai.py")
-INDEX_SCRIPT = Path("scripts/index_resumes_openai.py")
+INDEX_COMMAND = ["python", "scripts/index_resumes.py", "index", "--variant", "openai"]
 
 def sanitize_filename(name: str) -> str:
     """转换为 ASCII 并去除特殊符号"""
@@ -44,8 +44,8 @@ async def upload_resume(file: UploadFile = File(...)):
             try:
                 print("🧠 执行 extract_text_openai.py")
                 subprocess.run(["python", str(EXTRACT_SCRIPT)], check=True)
-                print("🔍 执行 index_resumes_openai.py")
-                subprocess.run(["python", str(INDEX_SCRIPT)], check=True)
+                print("🔍 执行 index_resumes.py index")
+                subprocess.run(INDEX_COMMAND, check=True)
                 print("✅ 简历处理完成")
             except Exception as e:
                 print(f"❌ 后台任务失败: {e}")
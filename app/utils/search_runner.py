@@ -4,9 +4,10 @@
 """
 
 import asyncio
+import functools
 import os
 import sys
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -31,14 +32,14 @@ class SearchRunner:
     def __init__(self):
         self.searcher = ResumeSearcher()
 
-    async def search(self, query: str, top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    async def search(self, query: str, top_k: int = DEFAULT_TOP_K, filters: Optional[Dict[str, Any]] = None,
+                     mode: Optional[str] = None, alpha: Optional[float] = None) -> Dict[str, Any]:
         loop = asyncio.get_event_loop()
 
         # 在后台线程中运行搜索（非阻塞主线程）
         results = await loop.run_in_executor(
             None,
-            self.searcher.search,
-            query
+            functools.partial(self.searcher.search, query, filters, mode=mode, alpha=alpha)
         )
 
         # 截断候选人列表（最多返回 top_k 个）
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+段落级索引 vs 单向量索引基准：索引大小与查询延迟。
+默认离线运行：合成 N 份长度不一的简历，按索引脚本的 chunk_text（scripts/text_chunker.py）切分，
+    - single：每份简历取前 TOP_N 段合成一个向量（当前布局）
+    - chunk：每段一个向量 + 父引用，查询时召回 CHUNK_SEARCH_LIMIT 段再按候选人聚合
+向量用随机单位向量代替（只比较规模和延迟，不评估召回），检索用 NumPy 暴力余弦近似 Weaviate 的开销比例。
+指定 --url 时改为对真实 Weaviate 的两个集合各跑 --queries 次 ResumeSearcher 查询。
+用法示例：
+    python scripts/bench_chunk_index.py --resumes 5000 --dim 1536
+    python scripts/bench_chunk_index.py --url http://localhost:8080 --queries 50
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.chunk_index import CHUNK_SEARCH_LIMIT, aggregate
+from scripts.text_chunker import chunk_text
+
+TOP_N = 5
+SENTENCES = [
+    "2018年-2021年 在某光电科技有限公司担任光学工程师，负责镜头设计与公差分析",
+    "熟练使用 Zemax、CodeV、LightTools 等光学设计软件",
+    "主导车载摄像头模组项目，从方案设计到量产导入，良率提升至98%",
+    "本科毕业于浙江大学光电信息工程专业，硕士就读于中国科学院",
+    "负责大客户销售与渠道拓展，年度销售额达到3000万元",
+    "搭建数据分析体系，使用 Python 与 SQL 完成用户增长分析",
+    "带领10人团队完成产品从0到1的规划与迭代",
+    "获得PMP项目管理认证，英语六级，能够阅读英文技术文档",
+    "参与ISO9001质量体系建设，推动供应商质量改进",
+    "负责招聘、培训与绩效管理，年度招聘完成率95%",
+]
+
+
+def synth_resumes(n: int, seed: int = 7) -> List[List[str]]:
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(n):
+        # 长度 1~12k 字符，长尾分布（多数简历 2~4k）
+        target = int(min(12000, max(1000, rng.lognormvariate(8.0, 0.5))))
+        parts, size = [], 0
+        while size < target:
+            sentence = rng.choice(SENTENCES)
+            parts.append(sentence)
+            size += len(sentence) + 1
+        resumes.append(chunk_text("\n".join(parts)))
+    return resumes
+
+
+def unit_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def layout_size(contents: List[str], dim: int, extra_props_bytes: int = 0) -> Dict[str, float]:
+    """对象数、向量字节数、属性字节数，以及 HNSW 图的近似开销（每个节点 maxConnections*2 个 8 字节邻居）"""
+    n = len(contents)
+    vector_mb = n * dim * 4 / 1024 / 1024
+    props_mb = (sum(len(c.encode("utf-8")) for c in contents) + n * extra_props_bytes) / 1024 / 1024
+    graph_mb = n * 64 * 2 * 8 / 1024 / 1024
+    return {"objects": n, "vector_mb": round(vector_mb, 1), "props_mb": round(props_mb, 1),
+            "graph_mb": round(graph_mb, 1), "total_mb": round(vector_mb + props_mb + graph_mb, 1)}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_offline(args):
+    rng = np.random.default_rng(11)
+    resumes = synth_resumes(args.resumes)
+    single_texts = ["\n".join(chunks[:TOP_N]) for chunks in resumes]
+    chunk_texts = [chunk for chunks in resumes for chunk in chunks]
+    parents = np.array([i for i, chunks in enumerate(resumes) for _ in chunks])
+    coverage = sum(len(t) for t in single_texts) / max(1, sum(len(t) for t in chunk_texts))
+
+    single_vectors = unit_vectors(len(single_texts), args.dim, rng)
+    chunk_vectors = unit_vectors(len(chunk_texts), args.dim, rng)
+    queries = unit_vectors(args.queries, args.dim, rng)
+
+    single_lat, chunk_lat = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        scores = single_vectors @ q
+        np.argpartition(-scores, args.top_k)[: args.top_k]
+        single_lat.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        scores = chunk_vectors @ q
+        hits = np.argpartition(-scores, CHUNK_SEARCH_LIMIT)[:CHUNK_SEARCH_LIMIT]
+        groups: Dict[int, List[float]] = {}
+        for idx in hits:
+            groups.setdefault(int(parents[idx]), []).append(float(scores[idx]))
+        sorted(groups, key=lambda p: aggregate(groups[p], args.aggregation), reverse=True)[: args.top_k]
+        chunk_lat.append(time.perf_counter() - t0)
+
+    results = {
+        "resumes": args.resumes,
+        "chunks_per_resume": round(len(chunk_texts) / args.resumes, 1),
+        "single_text_coverage": f"{coverage:.1%}",
+        "single": dict(layout_size(single_texts, args.dim, 200),
+                       p50_ms=round(percentile(single_lat, 50) * 1000, 2),
+                       p95_ms=round(percentile(single_lat, 95) * 1000, 2)),
+        "chunk": dict(layout_size(chunk_texts, args.dim, 120),
+                      p50_ms=round(percentile(chunk_lat, 50) * 1000, 2),
+                      p95_ms=round(percentile(chunk_lat, 95) * 1000, 2)),
+    }
+    return results
+
+
+def bench_weaviate(args):
+    import os
+    os.environ["WEAVIATE_URL"] = args.url
+    from scripts.search_candidates import ResumeSearcher
+
+    queries = [s.split("，")[-1] for s in SENTENCES]
+    results = {}
+    for mode in ("single", "chunk"):
+        searcher = ResumeSearcher(weaviate_url=args.url, index_mode=mode, aggregation=args.aggregation)
+        for q in queries:
+            searcher.get_embedding(q)  # 预热向量缓存，只计检索耗时
+        latencies = []
+        for i in range(args.queries):
+            t0 = time.perf_counter()
+            searcher.search(queries[i % len(queries)])
+            latencies.append(time.perf_counter() - t0)
+        results[mode] = {"p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                         "p95_ms": round(percentile(latencies, 95) * 1000, 1)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="段落级索引 vs 单向量索引基准")
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--aggregation", choices=["max", "sum"], default="max")
+    parser.add_argument("--url", help="对真实 Weaviate 测查询延迟（需已分别建好单向量与段落级索引）")
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = bench_weaviate(args) if args.url else bench_offline(args)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
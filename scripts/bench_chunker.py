@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+切分器基准：在超长简历上对比旧 chunk_text（按字符、字符串反复拼接）与 scripts/text_chunker.py。
+合成 --sizes 指定字符数的简历（带【字段信息】等结构标题），每种长度重复 --repeat 次取中位耗时，输出：
+    - 耗时（ms）及随长度增长的倍数（线性实现长度翻倍耗时约翻倍）
+    - 段落数、平均 / 最大 token 数、超过 CHUNK_MAX_TOKENS 的段落数、跨越结构标题的段落数
+用法示例：
+    python scripts/bench_chunker.py
+    python scripts/bench_chunker.py --sizes 10000,100000,1000000 --model text-embedding-ada-002
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.bench_chunk_index import SENTENCES
+from scripts.text_chunker import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, SECTION_PATTERN, chunk_text
+from scripts.tokens import get_token_counter, is_exact
+
+LEGACY_MAX_LENGTH = 300
+
+
+def legacy_chunk_text(text: str, max_length: int = LEGACY_MAX_LENGTH) -> List[str]:
+    """索引脚本原有的切分逻辑（保留作对照）"""
+    sentences = re.split(r'[\n。！？!\?]', text)
+    chunks, current = [], ""
+    for sentence in sentences:
+        if len(current) + len(sentence) < max_length:
+            current += sentence + "。"
+        else:
+            if current:
+                chunks.append(current.strip())
+            current = sentence + "。"
+    if current:
+        chunks.append(current.strip())
+    return [c for c in chunks if len(c) > 10]
+
+
+def synth_resume(size: int, rng: random.Random) -> str:
+    """按 build_vector_text 的格式拼一份约 size 字符的简历，原文部分夹杂超长无标点行"""
+    raw, total = [], 0
+    while total < size:
+        if rng.random() < 0.02:
+            line = "".join(rng.choice(SENTENCES) for _ in range(20)).replace("，", " ")  # 模拟 PDF 抽取出的超长行
+        else:
+            line = rng.choice(SENTENCES) + rng.choice(["。", "；", "", "!"])
+        raw.append(line)
+        total += len(line) + 1
+    fields = json.dumps({"姓名": "张三", "应聘职位": "光学工程师"}, ensure_ascii=False, indent=2)
+    sections = json.dumps([{"模块": "岗位经历", "内容": SENTENCES[0]}, {"模块": "教育背景", "内容": SENTENCES[3]}],
+                          ensure_ascii=False, indent=2)
+    return f"【字段信息】\n{fields}\n\n【模块结构分类】\n{sections}\n\n【原文补充】\n" + "\n".join(raw)
+
+
+def measure(fn: Callable[[str], List[str]], text: str, repeat: int, count: Callable[[str], int],
+            max_tokens: int) -> Dict:
+    timings, chunks = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = fn(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    tokens = [count(c) for c in chunks]
+    # 一个段落内出现了两个及以上结构标题，说明跨越了结构边界
+    crossing = sum(1 for c in chunks if len(SECTION_PATTERN.findall(c)) > 1)
+    return {
+        "ms": round(statistics.median(timings), 2),
+        "chunks": len(chunks),
+        "avg_tokens": round(sum(tokens) / max(1, len(tokens)), 1),
+        "max_tokens": max(tokens, default=0),
+        "over_limit": sum(1 for t in tokens if t > max_tokens),
+        "cross_section": crossing,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历切分器基准")
+    parser.add_argument("--sizes", default="5000,50000,200000,800000", help="简历字符数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--model", default=None, help="tokenizer 对应的 embedding 模型")
+    parser.add_argument("--max-tokens", type=int, default=CHUNK_MAX_TOKENS)
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP_TOKENS)
+    args = parser.parse_args()
+
+    count = get_token_counter(args.model)
+    print(f"🧮 token 计数: {'tiktoken' if is_exact(args.model) else '估算'}，"
+          f"上限 {args.max_tokens}，重叠 {args.overlap}")
+    rng = random.Random(7)
+    results = []
+    previous = None
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        text = synth_resume(size, rng)
+        legacy = measure(legacy_chunk_text, text, args.repeat, count, args.max_tokens)
+        new = measure(lambda t: chunk_text(t, args.max_tokens, args.overlap, args.model), text, args.repeat,
+                      count, args.max_tokens)
+        row = {"chars": len(text), "legacy": legacy, "token_chunker": new}
+        if previous:
+            growth = len(text) / previous["chars"]
+            row["time_growth"] = {
+                "length": round(growth, 1),
+                "legacy": round(legacy["ms"] / max(previous["legacy"]["ms"], 1e-3), 1),
+                "token_chunker": round(new["ms"] / max(previous["token_chunker"]["ms"], 1e-3), 1),
+            }
+        previous = row
+        results.append(row)
+        print(f"📏 {len(text):>9} 字符 | 旧: {legacy['ms']:>9} ms {legacy['chunks']:>6} 段 超限 {legacy['over_limit']:>5} "
+              f"| 新: {new['ms']:>9} ms {new['chunks']:>6} 段 超限 {new['over_limit']:>5} 跨结构 {new['cross_section']}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+简历文本提取吞吐基准。
+以 fuxin_resume.pdf 和 failed_resumes/ 为种子生成各格式样本：
+    text_pdf（文字版 PDF）、scanned_pdf（纯图片 PDF）、docx_tables（含表格的 docx）、
+    docx_image（仅含图片的 docx）、doc（需要 soffice 转换，缺失时跳过）
+每种格式在独立子进程中运行 extract_text 及各子提取器（LLM 走 fake 后端），
+输出 files/sec、p50/p95 延迟和峰值 RSS。改动提取脚本前后各跑一次即可对比。
+用法示例：
+    python scripts/bench_extraction.py --per-format 20 --json bench_before.json
+    python scripts/bench_extraction.py --per-format 20 --baseline bench_before.json
+"""
+
+import argparse
+import importlib
+import io
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+FORMATS = ["text_pdf", "scanned_pdf", "docx_tables", "docx_image", "doc"]
+EXTRACTORS = {
+    "openai": "scripts.extract_text_openai",
+    "openai_v1": "scripts.extract_text_openai_v1",
+    "tongyi": "scripts.extract_text_tongyi",
+}
+SEED_PDF = root_dir / "fuxin_resume.pdf"
+SEED_DOCX_DIR = root_dir / "failed_resumes"
+
+
+# ========= 样本生成 =========
+def seed_texts() -> List[str]:
+    import fitz
+    from docx import Document
+
+    texts = []
+    if SEED_PDF.exists():
+        with fitz.open(str(SEED_PDF)) as doc:
+            texts.append("\n".join(page.get_text() for page in doc))
+    for path in sorted(SEED_DOCX_DIR.glob("*.docx")):
+        try:
+            doc = Document(str(path))
+            texts.append("\n".join(p.text for p in doc.paragraphs if p.text.strip()))
+        except Exception as e:
+            print(f"⚠️ 种子读取失败: {path.name} | {e}")
+    return [t for t in texts if t.strip()] or ["张三\n13800138000\nzhangsan@example.com\n工作经历\n2019-2023 某公司 光学工程师"]
+
+
+def vary(text: str, i: int) -> str:
+    """替换手机号等细节，避免样本完全相同"""
+    return re.sub(r"1[3-9]\d{9}", f"138{i:08d}", text) + f"\n样本编号 {i}"
+
+
+def write_text_pdf(text: str, path: Path):
+    import fitz
+    doc = fitz.open()
+    lines = text.splitlines()
+    for start in range(0, max(len(lines), 1), 45):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(40, 40, 555, 802), "\n".join(lines[start:start + 45]),
+                            fontsize=10, fontname="china-s")
+    doc.save(str(path))
+    doc.close()
+
+
+def render_pages(pdf_path: Path, dpi: int = 100) -> List[bytes]:
+    import fitz
+    with fitz.open(str(pdf_path)) as doc:
+        return [page.get_pixmap(dpi=dpi).tobytes("png") for page in doc]
+
+
+def write_scanned_pdf(text_pdf: Path, path: Path):
+    import fitz
+    doc = fitz.open()
+    for png in render_pages(text_pdf):
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=png)
+    doc.save(str(path))
+    doc.close()
+
+
+def write_docx_tables(text: str, path: Path):
+    from docx import Document
+    doc = Document()
+    lines = [line for line in text.splitlines() if line.strip()]
+    for line in lines[: len(lines) // 2]:
+        doc.add_paragraph(line)
+    rest = lines[len(lines) // 2:]
+    table = doc.add_table(rows=0, cols=2)
+    for i in range(0, len(rest), 2):
+        cells = table.add_row().cells
+        cells[0].text = rest[i]
+        cells[1].text = rest[i + 1] if i + 1 < len(rest) else ""
+    doc.save(str(path))
+
+
+def write_docx_image(text_pdf: Path, path: Path):
+    from docx import Document
+    from docx.shared import Inches
+    doc = Document()
+    for png in render_pages(text_pdf):
+        doc.add_picture(io.BytesIO(png), width=Inches(6))
+    doc.save(str(path))
+
+
+def write_doc(docx_path: Path, out_dir: Path) -> bool:
+    if not shutil.which("soffice"):
+        return False
+    try:
+        subprocess.run(["soffice", "--headless", "--convert-to", "doc", "--outdir", str(out_dir), str(docx_path)],
+                       check=True, capture_output=True, timeout=120)
+        return True
+    except Exception:
+        return False
+
+
+def generate_fixtures(out_dir: Path, per_format: int):
+    texts = seed_texts()
+    for fmt in FORMATS:
+        (out_dir / fmt).mkdir(parents=True, exist_ok=True)
+    scratch = out_dir / "_scratch"
+    scratch.mkdir(exist_ok=True)
+
+    if SEED_PDF.exists():
+        shutil.copy(SEED_PDF, out_dir / "text_pdf" / "seed_fuxin_resume.pdf")
+    for docx in sorted(SEED_DOCX_DIR.glob("*.docx")):
+        shutil.copy(docx, out_dir / "docx_tables" / f"seed_{docx.name}")
+
+    for i in range(per_format):
+        text = vary(texts[i % len(texts)], i)
+        text_pdf = out_dir / "text_pdf" / f"resume_{i:04d}.pdf"
+        write_text_pdf(text, text_pdf)
+        write_scanned_pdf(text_pdf, out_dir / "scanned_pdf" / f"resume_{i:04d}.pdf")
+        docx_path = out_dir / "docx_tables" / f"resume_{i:04d}.docx"
+        write_docx_tables(text, docx_path)
+        write_docx_image(text_pdf, out_dir / "docx_image" / f"resume_{i:04d}.docx")
+        if not write_doc(docx_path, scratch):
+            continue
+        converted = scratch / f"resume_{i:04d}.doc"
+        if converted.exists():
+            shutil.move(str(converted), str(out_dir / "doc" / converted.name))
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+# ========= 单格式运行（子进程） =========
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def sub_extractors(module, fmt: str):
+    """每种格式对应的子提取器（与 extract_text 的分支一致）"""
+    steps = []
+    if fmt in ("text_pdf", "scanned_pdf"):
+        steps.append(("extract_pdf_text", module.extract_pdf_text))
+        if fmt == "scanned_pdf":
+            steps.append(("extract_via_ocr", module.extract_via_ocr))
+    elif fmt in ("docx_tables", "docx_image"):
+        steps.append(("extract_docx_text", module.extract_docx_text))
+    elif fmt == "doc":
+        steps.append(("extract_doc_text", module.extract_doc_text))
+    return steps
+
+
+def run_format(fmt: str, fixtures: Path, extractor: str) -> Dict:
+    os.environ["PROVIDER_OVERRIDE"] = "fake"
+    os.environ.setdefault("LLM_CACHE_MODE", "off")
+    module = importlib.import_module(EXTRACTORS[extractor])
+
+    src = fixtures / fmt
+    files = sorted(p for p in src.iterdir() if p.is_file()) if src.exists() else []
+    result = {"format": fmt, "files": len(files), "steps": {}}
+    if not files:
+        return result
+
+    # 在临时副本上运行：docx 兜底转换会在原目录生成 pdf
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in files:
+            shutil.copy(f, tmp)
+        paths = [str(Path(tmp) / f.name) for f in files]
+
+        latencies, empties = [], 0
+        start = time.perf_counter()
+        for path in paths:
+            t0 = time.perf_counter()
+            text = module.extract_text(path)
+            text = module.enhance_text(text or "")
+            module.extract_fields(text)
+            module.classify_resume_sections(text)
+            latencies.append(time.perf_counter() - t0)
+            empties += 0 if text.strip() else 1
+        elapsed = time.perf_counter() - start
+        result.update({
+            "files_per_sec": round(len(paths) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "empty": empties,
+        })
+
+        for name, fn in sub_extractors(module, fmt):
+            step_lat = []
+            for path in paths:
+                t0 = time.perf_counter()
+                fn(path)
+                step_lat.append(time.perf_counter() - t0)
+            result["steps"][name] = {
+                "p50_ms": round(percentile(step_lat, 50) * 1000, 1),
+                "p95_ms": round(percentile(step_lat, 95) * 1000, 1),
+            }
+
+    # Linux 下 ru_maxrss 单位为 KB
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+# ========= 汇总 =========
+def print_report(results: List[Dict], baseline: Dict[str, Dict]):
+    print(f"\n{'格式':<14}{'文件数':>6}{'files/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'RSS(MB)':>10}{'空文本':>8}")
+    for r in results:
+        if not r.get("files"):
+            print(f"{r['format']:<14}{0:>6}  （无样本，已跳过）")
+            continue
+        line = (f"{r['format']:<14}{r['files']:>6}{r['files_per_sec']:>10}{r['p50_ms']:>10}"
+                f"{r['p95_ms']:>10}{r['peak_rss_mb']:>10}{r['empty']:>8}")
+        base = baseline.get(r["format"])
+        if base and base.get("files_per_sec"):
+            delta = (r["files_per_sec"] - base["files_per_sec"]) / base["files_per_sec"]
+            line += f"   Δfiles/s {delta:+.1%}  Δp95 {r['p95_ms'] - base['p95_ms']:+.1f}ms"
+        print(line)
+        for name, step in r["steps"].items():
+            print(f"  └ {name:<20} p50 {step['p50_ms']}ms | p95 {step['p95_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历文本提取吞吐基准")
+    parser.add_argument("--fixtures", default=str(root_dir / "data" / "bench" / "extraction"), help="样本目录")
+    parser.add_argument("--per-format", type=int, default=10, help="每种格式生成的样本数")
+    parser.add_argument("--regenerate", action="store_true", help="重新生成样本")
+    parser.add_argument("--extractor", choices=sorted(EXTRACTORS), default="openai")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    parser.add_argument("--baseline", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    fixtures = Path(args.fixtures)
+
+    if args.worker:
+        print(json.dumps(run_format(args.worker, fixtures, args.extractor), ensure_ascii=False))
+        return
+
+    if args.regenerate and fixtures.exists():
+        shutil.rmtree(fixtures)
+    if not fixtures.exists():
+        print(f"🧪 生成样本到 {fixtures}（每种格式 {args.per_format} 份）")
+        generate_fixtures(fixtures, args.per_format)
+
+    results = []
+    for fmt in [f for f in args.formats.split(",") if f]:
+        print(f"⏱️ 运行 {fmt} ...")
+        proc = subprocess.run([sys.executable, __file__, "--worker", fmt, "--fixtures", str(fixtures),
+                               "--extractor", args.extractor], capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"❌ {fmt} 运行失败:\n{proc.stderr[-2000:]}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {r["format"]: r for r in json.load(f)}
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
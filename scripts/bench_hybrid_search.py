@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+检索模式基准：vector / keyword（BM25）/ hybrid（不同 alpha）的 p50 / p95 查询延迟与 recall@k。
+BM25 与分词只能在 Weaviate 中测量，因此需要 --url：
+    - 默认对当前生效的候选人集合测量，查询为技能词（SKILL_TERMS，可用 --queries 追加 JSONL：{"query": ..., "term": ...}），
+      相关集合为 content 中包含该技能词（忽略大小写与空格）的全部对象
+    - 加 --synthetic N 时新建临时集合写入 N 份合成简历（部分注入技能词），用 --provider 向量化
+      （local 后端可离线运行），测完删除（--keep 保留）；--tokenization 可比较 gse / trigram / word
+recall@k = 前 k 条中相关对象数 / min(k, 相关对象总数)；查询向量只计算一次，延迟只包含 Weaviate 查询本身。
+用法示例：
+    python scripts/bench_hybrid_search.py --url http://localhost:8080
+    python scripts/bench_hybrid_search.py --url http://localhost:8080 --synthetic 2000 --provider local --alphas 0.25,0.5,0.75
+    python scripts/bench_hybrid_search.py --url http://localhost:8080 --synthetic 2000 --tokenization trigram --json hybrid.json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.bench_chunk_index import SENTENCES, percentile
+from scripts.collection_registry import resolve
+from scripts.hybrid_search import (CONTENT_TOKENIZATION, WEAVIATE_COLLECTION, additional_fields, content_property,
+                                   content_tokenization, search_clause)
+from scripts.index_manifest import scan_collection
+from scripts.provider_client import get_client
+from scripts.weaviate_batch import BatchWriter
+from scripts.weaviate_schema import create_class, delete_class, get_class
+
+SKILL_TERMS = ["Zemax", "CODE V", "LightTools", "TracePro", "SolidWorks", "MATLAB", "LabVIEW", "FPGA",
+               "Verilog", "PyTorch", "TensorFlow", "Kubernetes", "SAP", "六西格玛", "PMP", "光刻"]
+SKILL_SENTENCES = ["熟练使用 {term} 完成设计与仿真", "项目中使用 {term} 进行分析，输出评审报告",
+                   "掌握 {term}，有三年以上实际项目经验"]
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", "", text or "").lower()
+
+
+# ========= 数据 =========
+def synth_corpus(n: int, seed: int = 7) -> List[str]:
+    """合成简历：通用句子若干 + 0~2 个技能词（约 3 成简历不含任何技能词）；通用句子中的技能词先去掉，保证真值只来自注入"""
+    rng = random.Random(seed)
+    filler = [s for s in SENTENCES if not any(normalize(t) in normalize(s) for t in SKILL_TERMS)]
+    corpus = []
+    for _ in range(n):
+        parts = rng.sample(filler, k=min(len(filler), rng.randint(3, 6)))
+        for term in rng.sample(SKILL_TERMS, k=rng.choice([0, 1, 1, 2])):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(SKILL_SENTENCES).format(term=term))
+        corpus.append("\n".join(parts))
+    return corpus
+
+
+def load_synthetic(url: str, args, client) -> str:
+    name = f"BenchHybrid{args.tokenization.capitalize()}"
+    if get_class(url, name) is not None:
+        delete_class(url, name)
+    create_class(url, {"class": name, "vectorizer": "none",
+                       "properties": [content_property(args.tokenization)]})
+    corpus = synth_corpus(args.synthetic)
+    t0 = time.perf_counter()
+    vectors = client.embed(corpus)
+    print(f"🧮 向量化 {len(corpus)} 份合成简历: {time.perf_counter() - t0:.1f}s（{client.provider}）")
+    with BatchWriter(weaviate_url=url, weaviate_class=name) as writer:
+        for i, (content, vector) in enumerate(zip(corpus, vectors)):
+            writer.add(str(uuid.UUID(int=i + 1)), {"content": content}, vector)
+    return name
+
+
+def load_queries(path: Optional[str]) -> List[Dict[str, str]]:
+    queries = [{"query": term, "term": term} for term in SKILL_TERMS]
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    queries.append({"query": item["query"], "term": item.get("term") or item["query"]})
+    return queries
+
+
+def relevant_sets(url: str, weaviate_class: str, queries: List[Dict[str, str]]) -> Dict[str, set]:
+    """真值：content 中包含技能词的对象"""
+    terms = {normalize(q["term"]) for q in queries}
+    relevant = {term: set() for term in terms}
+    for obj in scan_collection(url, weaviate_class):
+        content = normalize((obj.get("properties") or {}).get("content"))
+        for term in terms:
+            if term in content:
+                relevant[term].add(obj["id"])
+    return relevant
+
+
+# ========= 查询 =========
+def run_query(url: str, weaviate_class: str, clause: str, mode: str, k: int) -> Tuple[List[str], float]:
+    fields = additional_fields(mode)
+    query = {"query": f"{{ Get {{ {weaviate_class}({clause}, limit: {k}) {{ _additional {{ {fields} }} }} }} }}"}
+    t0 = time.perf_counter()
+    res = requests.post(f"{url}/v1/graphql", json=query, timeout=60)
+    elapsed = time.perf_counter() - t0
+    res.raise_for_status()
+    body = res.json()
+    if body.get("errors"):
+        raise RuntimeError(f"GraphQL 错误：{body['errors']}")
+    return [o["_additional"]["id"] for o in body["data"]["Get"][weaviate_class] or []], elapsed
+
+
+def bench_mode(url: str, weaviate_class: str, queries: List[Dict[str, str]], vectors: List[List[float]],
+               relevant: Dict[str, set], mode: str, k: int, repeat: int, alpha: float = 0.5) -> Dict:
+    latencies, recalls = [], []
+    for q, vector in zip(queries, vectors):
+        truth = relevant[normalize(q["term"])]
+        if not truth:
+            continue
+        clause = search_clause(mode, q["query"], vector, alpha=alpha)
+        for _ in range(repeat):
+            hits, elapsed = run_query(url, weaviate_class, clause, mode, k)
+            latencies.append(elapsed)
+        recalls.append(len(set(hits) & truth) / min(k, len(truth)))
+    if not recalls:
+        return {"queries": 0}
+    return {"queries": len(recalls), "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            f"recall@{k}": round(sum(recalls) / len(recalls), 4)}
+
+
+def bench(args) -> Dict:
+    url = args.url.rstrip("/")
+    if args.synthetic:
+        client = get_client(args.provider or "local", dimensions=args.dimensions)
+        weaviate_class = load_synthetic(url, args, client)
+    else:
+        current = resolve(args.collection)
+        client = get_client(args.provider or current.provider or "openai",
+                            embedding_model=current.embedding_model, dimensions=current.dimensions)
+        weaviate_class = current.class_name
+
+    queries = load_queries(args.queries)
+    relevant = relevant_sets(url, weaviate_class, queries)
+    vectors = client.embed([q["query"] for q in queries], scope="query")
+    results = {"class": weaviate_class, "tokenization": content_tokenization(get_class(url, weaviate_class)),
+               "provider": client.provider, "top_k": args.top_k,
+               "queries_with_relevant": sum(1 for q in queries if relevant[normalize(q["term"])])}
+
+    results["vector"] = bench_mode(url, weaviate_class, queries, vectors, relevant, "vector", args.top_k, args.repeat)
+    results["keyword"] = bench_mode(url, weaviate_class, queries, vectors, relevant, "keyword", args.top_k,
+                                    args.repeat)
+    for alpha in args.alphas:
+        results[f"hybrid@{alpha}"] = bench_mode(url, weaviate_class, queries, vectors, relevant, "hybrid",
+                                                args.top_k, args.repeat, alpha)
+    if args.synthetic and not args.keep:
+        delete_class(url, weaviate_class)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量 / 关键词 / 混合检索基准")
+    parser.add_argument("--url", required=True, help="Weaviate 地址")
+    parser.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名（非 --synthetic 时）")
+    parser.add_argument("--queries", help="追加查询的 JSONL 文件")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="每条查询重复次数（延迟取全部样本）")
+    parser.add_argument("--alphas", default="0.25,0.5,0.75", help="混合检索的 alpha 列表")
+    parser.add_argument("--synthetic", type=int, default=0, help="新建临时集合写入 N 份合成简历")
+    parser.add_argument("--tokenization", default=CONTENT_TOKENIZATION, choices=("gse", "trigram", "word"),
+                        help="合成集合 content 的分词方式")
+    parser.add_argument("--provider", help="向量化后端（--synthetic 默认 local）")
+    parser.add_argument("--dimensions", type=int, default=0, help="合成集合的向量维度，0 为后端默认")
+    parser.add_argument("--keep", action="store_true", help="保留 --synthetic 创建的临时集合")
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    args = parser.parse_args()
+    args.alphas = [float(a) for a in args.alphas.split(",") if a.strip()]
+
+    results = bench(args)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+向量压缩基准：PQ / BQ（带重排）相对未压缩基线的 向量内存、p95 查询延迟、recall@k。
+默认离线运行：合成与 ada-002 同维度（1536）的聚簇向量，用 NumPy 实现与 Weaviate 相同思路的压缩检索：
+    - none：float32 暴力余弦，作为真值与基线
+    - pq：每段 256 个质心（k-means 训练），查表求近似得分，取前 --rescore 条用原始向量重排
+    - bq：符号位编码，汉明距离召回，取前 --rescore 条用原始向量重排
+离线延迟是暴力检索的耗时，只用于比较压缩带来的相对开销，不等同于 HNSW 的绝对延迟。
+指定 --url 时对真实 Weaviate 测量：
+    - --baseline / --compressed 为已有的两个集合（如 vector_compression.py --apply pq --copy 生成的副本），
+      查询向量取自基线集合中的对象并加噪声，真值为对基线全部向量的暴力检索
+    - 加 --synthetic N 时改为新建临时集合写入 N 条合成向量，测完删除（--keep 保留）
+用法示例：
+    python scripts/bench_vector_compression.py --vectors 20000 --dim 1536
+    python scripts/bench_vector_compression.py --url http://localhost:8080 --baseline Candidates --compressed CandidatesPq
+    python scripts/bench_vector_compression.py --url http://localhost:8080 --synthetic 20000 --methods pq,bq
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.bench_chunk_index import percentile
+from scripts.index_manifest import scan_collection
+from scripts.vector_compression import pq_segments, with_compression
+from scripts.weaviate_batch import BatchWriter
+from scripts.weaviate_schema import count_objects, create_class, delete_class, get_class, update_class
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+GRAPH_BYTES_PER_OBJECT = 64 * 2 * 8  # 与 bench_chunk_index 相同的 HNSW 邻居表估算
+
+
+# ========= 数据 =========
+def synth_vectors(n: int, dim: int, rng: np.random.Generator, clusters: int = 64) -> np.ndarray:
+    """聚簇分布的单位向量（真实 embedding 并非各向同性，PQ/BQ 在均匀随机向量上的表现会失真）"""
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, n)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, count: int, rng: np.random.Generator, noise: float = 0.05) -> np.ndarray:
+    picks = vectors[rng.integers(0, len(vectors), count)]
+    queries = picks + noise * rng.standard_normal(picks.shape, dtype=np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def recall_at_k(found: List[List[int]], truth: np.ndarray, k: int) -> float:
+    hits = [len(set(f[:k]) & set(t[:k].tolist())) / k for f, t in zip(found, truth)]
+    return round(float(np.mean(hits)), 4)
+
+
+# ========= 压缩实现（离线） =========
+class PQIndex:
+    def __init__(self, vectors: np.ndarray, segments: int, centroids: int = 256, training: int = 10000,
+                 iterations: int = 8, seed: int = 3):
+        n, dim = vectors.shape
+        self.segments = segments
+        self.width = dim // segments
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, training), replace=False)]
+        self.codebooks = np.empty((segments, centroids, self.width), dtype=np.float32)
+        self.codes = np.empty((n, segments), dtype=np.uint8)
+        for s in range(segments):
+            part = slice(s * self.width, (s + 1) * self.width)
+            book = self._kmeans(sample[:, part], centroids, iterations, rng)
+            self.codebooks[s] = book
+            self.codes[:, s] = self._assign(vectors[:, part], book)
+
+    @staticmethod
+    def _assign(points: np.ndarray, book: np.ndarray) -> np.ndarray:
+        dists = (points ** 2).sum(1, keepdims=True) - 2 * points @ book.T + (book ** 2).sum(1)
+        return dists.argmin(1)
+
+    def _kmeans(self, points: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        book = points[rng.choice(len(points), k, replace=len(points) < k)].copy()
+        for _ in range(iterations):
+            labels = self._assign(points, book)
+            sums = np.zeros_like(book)
+            np.add.at(sums, labels, points)
+            counts = np.bincount(labels, minlength=k)[:, None]
+            book = np.where(counts > 0, sums / np.maximum(counts, 1), book)
+        return book
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        table = np.einsum("sd,skd->sk", query.reshape(self.segments, self.width), self.codebooks)
+        return table[np.arange(self.segments), self.codes].sum(1)
+
+    def memory_bytes(self) -> int:
+        return self.codes.nbytes + self.codebooks.nbytes
+
+
+class BQIndex:
+    def __init__(self, vectors: np.ndarray):
+        self.bits = np.packbits(vectors > 0, axis=1)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        q = np.packbits(query > 0)
+        return -POPCOUNT[np.bitwise_xor(self.bits, q)].sum(1, dtype=np.int32)
+
+    def memory_bytes(self) -> int:
+        return self.bits.nbytes
+
+
+def search_compressed(index, vectors: np.ndarray, query: np.ndarray, k: int, rescore: int) -> List[int]:
+    """压缩得分召回 rescore 条，再用原始向量重排取前 k；rescore <= k 时即不重排"""
+    approx = index.scores(query)
+    limit = max(k, rescore)
+    candidates = np.argpartition(-approx, limit)[:limit]
+    if rescore <= k:
+        return candidates[np.argsort(-approx[candidates])][:k].tolist()
+    exact = vectors[candidates] @ query
+    return candidates[np.argsort(-exact)][:k].tolist()
+
+
+def bench_offline(args) -> Dict:
+    rng = np.random.default_rng(11)
+    vectors = synth_vectors(args.vectors, args.dim, rng)
+    queries = make_queries(vectors, args.queries, rng)
+    truth = exact_top_k(vectors, queries, args.top_k)
+    graph_mb = args.vectors * GRAPH_BYTES_PER_OBJECT / 1024 / 1024
+
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        np.argpartition(-(vectors @ q), args.top_k)[: args.top_k]
+        latencies.append(time.perf_counter() - t0)
+    results = {"vectors": args.vectors, "dim": args.dim, "top_k": args.top_k, "none": {
+        "vector_mb": round(vectors.nbytes / 1024 / 1024, 1), "graph_mb": round(graph_mb, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2), f"recall@{args.top_k}": 1.0}}
+
+    for method in args.methods:
+        t0 = time.perf_counter()
+        if method == "pq":
+            index = PQIndex(vectors, args.segments or pq_segments(args.dim))
+        else:
+            index = BQIndex(vectors)
+        build_s = time.perf_counter() - t0
+        row = {"vector_mb": round(index.memory_bytes() / 1024 / 1024, 1), "graph_mb": round(graph_mb, 1),
+               "build_s": round(build_s, 1)}
+        row["memory_ratio"] = round(results["none"]["vector_mb"] / max(row["vector_mb"], 1e-6), 1)
+        for label, rescore in (("no_rescore", args.top_k), ("rescore", args.rescore)):
+            found, latencies = [], []
+            for q in queries:
+                t0 = time.perf_counter()
+                found.append(search_compressed(index, vectors, q, args.top_k, rescore))
+                latencies.append(time.perf_counter() - t0)
+            row[f"recall@{args.top_k}_{label}"] = recall_at_k(found, truth, args.top_k)
+            row[f"p95_ms_{label}"] = round(percentile(latencies, 95) * 1000, 2)
+        results[method] = row
+    return results
+
+
+# ========= 真实 Weaviate =========
+def near_vector(url: str, weaviate_class: str, vector: np.ndarray, k: int) -> Tuple[List[str], float]:
+    query = {"query": f"""
+    {{ Get {{ {weaviate_class}(nearVector: {{ vector: {json.dumps([round(float(x), 6) for x in vector])} }},
+                               limit: {k}) {{ _additional {{ id }} }} }} }}"""}
+    t0 = time.perf_counter()
+    res = requests.post(f"{url}/v1/graphql", json=query, timeout=60)
+    elapsed = time.perf_counter() - t0
+    res.raise_for_status()
+    body = res.json()
+    if body.get("errors"):
+        raise RuntimeError(f"GraphQL 错误：{body['errors']}")
+    return [o["_additional"]["id"] for o in body["data"]["Get"][weaviate_class] or []], elapsed
+
+
+def shard_status(url: str, weaviate_class: str) -> Dict:
+    """从 /v1/nodes 读取分片的对象数与是否已压缩"""
+    try:
+        nodes = requests.get(f"{url}/v1/nodes", params={"output": "verbose"}, timeout=30).json().get("nodes", [])
+    except requests.RequestException:
+        return {}
+    shards = [s for node in nodes for s in node.get("shards") or [] if s.get("class") == weaviate_class]
+    return {"objects": sum(s.get("objectCount", 0) for s in shards),
+            "compressed": all(s.get("compressed", False) for s in shards) if shards else None,
+            "indexing": sorted({s.get("vectorIndexingStatus", "") for s in shards})}
+
+
+def estimate_vector_mb(definition: Dict, count: int, dim: int) -> float:
+    config = definition.get("vectorIndexConfig") or {}
+    if (config.get("pq") or {}).get("enabled"):
+        segments = config["pq"].get("segments") or pq_segments(dim)
+        return round((count * segments + segments * 256 * (dim // segments) * 4) / 1024 / 1024, 1)
+    if (config.get("bq") or {}).get("enabled"):
+        return round(count * dim / 8 / 1024 / 1024, 1)
+    return round(count * dim * 4 / 1024 / 1024, 1)
+
+
+def load_synthetic(url: str, args) -> Dict[str, str]:
+    rng = np.random.default_rng(11)
+    vectors = synth_vectors(args.synthetic, args.dim, rng)
+    base = {"vectorizer": "none", "properties": [{"name": "seq", "dataType": ["int"]}]}
+    classes = {"none": "BenchCompressionRaw"}
+    classes.update({m: f"BenchCompression{m.capitalize()}" for m in args.methods})
+    for method, name in classes.items():
+        if get_class(url, name) is not None:
+            delete_class(url, name)
+        # PQ 先以未压缩建类、写完数据后再在线开启（与线上迁移路径一致）
+        create_class(url, with_compression(dict(base, **{"class": name}), "bq" if method == "bq" else "none"))
+        with BatchWriter(weaviate_url=url, weaviate_class=name) as writer:
+            for i, vector in enumerate(vectors):
+                writer.add(str(uuid.UUID(int=i + 1)), {"seq": i}, vector.tolist())
+        if method == "pq":
+            definition = get_class(url, name)
+            config = dict(definition.get("vectorIndexConfig") or {},
+                          **with_compression({}, "pq")["vectorIndexConfig"])
+            update_class(url, dict(definition, vectorIndexConfig=config))
+            for _ in range(120):  # 等待码本训练与压缩完成
+                if shard_status(url, name).get("compressed"):
+                    break
+                time.sleep(1)
+    return classes
+
+
+def bench_weaviate(args) -> Dict:
+    url = args.url.rstrip("/")
+    if args.synthetic:
+        classes = load_synthetic(url, args)
+    else:
+        classes = {"none": args.baseline, "compressed": args.compressed}
+
+    baseline = [(obj["id"], obj["vector"]) for obj in scan_collection(url, classes["none"], include_vector=True)
+                if obj.get("vector")]
+    ids = [i for i, _ in baseline]
+    vectors = np.asarray([v for _, v in baseline], dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+    dim = vectors.shape[1]
+    rng = np.random.default_rng(5)
+    queries = make_queries(vectors, args.queries, rng)
+    truth = exact_top_k(vectors, queries, args.top_k)
+    truth_ids = [[ids[i] for i in row] for row in truth]
+
+    results = {"vectors": len(ids), "dim": dim, "top_k": args.top_k}
+    for label, name in classes.items():
+        if not name:
+            continue
+        found, latencies = [], []
+        for q in queries:
+            hits, elapsed = near_vector(url, name, q, args.top_k)
+            found.append(hits)
+            latencies.append(elapsed)
+        recall = float(np.mean([len(set(f) & set(t)) / args.top_k for f, t in zip(found, truth_ids)]))
+        results[label] = {
+            "class": name,
+            "objects": count_objects(url, name),
+            "vector_mb_estimate": estimate_vector_mb(get_class(url, name) or {}, len(ids), dim),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            f"recall@{args.top_k}": round(recall, 4),
+            "shards": shard_status(url, name),
+        }
+    if args.synthetic and not args.keep:
+        for name in classes.values():
+            delete_class(url, name)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量压缩（PQ / BQ）基准")
+    parser.add_argument("--vectors", type=int, default=20000, help="离线模式的向量数")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=200, help="重排候选数（对应 rescoreLimit）")
+    parser.add_argument("--segments", type=int, default=0, help="PQ 段数，0 为按维度自动选择")
+    parser.add_argument("--methods", default="pq,bq")
+    parser.add_argument("--url", help="对真实 Weaviate 测量")
+    parser.add_argument("--baseline", default="Candidates", help="未压缩基线集合")
+    parser.add_argument("--compressed", help="压缩后的集合")
+    parser.add_argument("--synthetic", type=int, default=0, help="在 Weaviate 中新建临时集合写入 N 条合成向量")
+    parser.add_argument("--keep", action="store_true", help="保留 --synthetic 创建的临时集合")
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    args = parser.parse_args()
+    args.methods = [m for m in args.methods.split(",") if m in ("pq", "bq")]
+
+    results = bench_weaviate(args) if args.url else bench_offline(args)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
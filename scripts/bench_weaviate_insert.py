@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Weaviate 写入吞吐基准：逐条 POST /v1/objects（旧路径，含 sleep）对比 BatchWriter 批量写入。
+默认在本地启动一个模拟 Weaviate 的 HTTP 服务（每次请求固定延迟 + 每条对象处理耗时，可注入逐条失败），
+也可以用 --url 指向真实的 Weaviate 实例（会写入 --collection 指定的集合）。
+用法示例：
+    python scripts/bench_weaviate_insert.py --objects 2000 --batch-sizes 50,100,200 --concurrency 1,2,4
+    python scripts/bench_weaviate_insert.py --fail-rate 0.05
+    python scripts/bench_weaviate_insert.py --url http://localhost:8080 --collection BenchCandidates
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.weaviate_batch import BatchWriter
+
+
+# ========= 本地模拟服务 =========
+class StandInHandler(BaseHTTPRequestHandler):
+    latency_ms = 20.0
+    per_object_ms = 0.5
+    fail_rate = 0.0
+    seen_failures = set()
+    lock = threading.Lock()
+    stored = 0
+    objects = {}  # id -> 对象（不含向量），供游标扫描 / 按 id 查询
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _should_fail(self, obj_id: str) -> bool:
+        """每个 id 至多失败一次，用来验证只重试失败项"""
+        with self.lock:
+            if obj_id in self.seen_failures or random.random() >= self.fail_rate:
+                return False
+            self.seen_failures.add(obj_id)
+            return True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.startswith("/v1/batch/objects"):
+            objects = body.get("objects", [])
+            time.sleep((self.latency_ms + self.per_object_ms * len(objects)) / 1000)
+            results = []
+            for obj in objects:
+                result = {"id": obj.get("id"), "result": {}}
+                if self._should_fail(obj.get("id")):
+                    result["result"] = {"errors": {"error": [{"message": "模拟写入失败"}]}}
+                else:
+                    self._store(obj)
+                results.append(result)
+            self._reply(200, results)
+        elif self.path.startswith("/v1/objects"):
+            time.sleep((self.latency_ms + self.per_object_ms) / 1000)
+            self._store(body)
+            self._reply(200, body)
+        else:
+            self._reply(404, {"error": self.path})
+
+    def _store(self, obj):
+        with self.lock:
+            StandInHandler.stored += 1
+            self.objects[str(obj.get("id"))] = {k: v for k, v in obj.items() if k != "vector"}
+
+    def do_DELETE(self):
+        """只支持按 id 批量删除：DELETE /v1/batch/objects，match.where 为 id ContainsAny"""
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.startswith("/v1/batch/objects"):
+            self._reply(404, {"error": self.path})
+            return
+        where = (body.get("match") or {}).get("where") or {}
+        ids = set(where.get("valueTextArray") or where.get("valueText") or [])
+        with self.lock:
+            matched = [i for i in ids if i in self.objects]
+            for obj_id in matched:
+                del self.objects[obj_id]
+        results = {"matches": len(matched), "successful": len(matched), "failed": 0}
+        if body.get("output") == "verbose":
+            results["objects"] = [{"id": obj_id, "status": "SUCCESS"} for obj_id in matched]
+        self._reply(200, {"results": results})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [p for p in parsed.path.split("/") if p]
+        with self.lock:
+            ordered = sorted(self.objects.values(), key=lambda o: o["id"])
+        if parts == ["v1", "objects"]:
+            after = query.get("after", [""])[0]
+            limit = int(query.get("limit", ["25"])[0])
+            cls = query.get("class", [""])[0]
+            page = [o for o in ordered if o["id"] > after and (not cls or o.get("class") == cls)][:limit]
+            self._reply(200, {"objects": page})
+        elif len(parts) == 4 and parts[:2] == ["v1", "objects"]:
+            obj = self.objects.get(parts[3])
+            self._reply(200 if obj else 404, obj or {})
+        else:
+            self._reply(404, {"error": self.path})
+
+
+def start_stand_in(latency_ms: float, per_object_ms: float, fail_rate: float) -> ThreadingHTTPServer:
+    StandInHandler.latency_ms = latency_ms
+    StandInHandler.per_object_ms = per_object_ms
+    StandInHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ========= 样本 =========
+def make_objects(n: int, dim: int):
+    rng = random.Random(42)
+    objects = []
+    for i in range(n):
+        vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+        properties = {"filename": f"bench_{i:06d}.txt", "content": "光学工程师 " * 60, "notes": []}
+        objects.append((str(uuid.uuid4()), properties, vector))
+    return objects
+
+
+# ========= 两种写入路径 =========
+def run_single(url: str, collection: str, objects, sleep: float) -> dict:
+    session = requests.Session()
+    start = time.perf_counter()
+    ok = 0
+    for obj_id, properties, vector in objects:
+        response = session.post(f"{url}/v1/objects",
+                                json={"class": collection, "id": obj_id, "properties": properties, "vector": vector})
+        ok += response.status_code == 200
+        if sleep:
+            time.sleep(sleep)
+    elapsed = time.perf_counter() - start
+    return {"mode": f"逐条 sleep={sleep}", "objects": len(objects), "ok": ok, "seconds": round(elapsed, 2),
+            "objects_per_sec": round(len(objects) / elapsed, 1), "requests": len(objects)}
+
+
+def run_batch(url: str, collection: str, objects, batch_size: int, concurrency: int) -> dict:
+    writer = BatchWriter(weaviate_url=url, weaviate_class=collection, batch_size=batch_size, concurrency=concurrency)
+    start = time.perf_counter()
+    with writer:
+        for obj_id, properties, vector in objects:
+            writer.add(obj_id, properties, vector)
+    elapsed = time.perf_counter() - start
+    return {"mode": f"批量 size={batch_size} conc={concurrency}", "objects": len(objects),
+            "ok": writer.stats.succeeded, "failed": writer.stats.failed, "retried": writer.stats.retried,
+            "seconds": round(elapsed, 2), "objects_per_sec": round(len(objects) / elapsed, 1),
+            "requests": writer.stats.requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate 写入吞吐基准")
+    parser.add_argument("--url", help="真实 Weaviate 地址；缺省时启动本地模拟服务")
+    parser.add_argument("--collection", default="BenchCandidates")
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--batch-sizes", default="50,100,200")
+    parser.add_argument("--concurrency", default="1,2,4")
+    parser.add_argument("--single-sample", type=int, default=50, help="逐条路径只跑前 N 条后按速率外推")
+    parser.add_argument("--single-sleep", type=float, default=0.3, help="逐条路径每条后的 sleep（旧脚本为 0.3）")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="模拟服务：每次请求固定延迟")
+    parser.add_argument("--per-object-ms", type=float, default=0.5, help="模拟服务：每条对象处理耗时")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="模拟服务：首次写入失败的对象比例")
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = start_stand_in(args.latency_ms, args.per_object_ms, args.fail_rate)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(f"🧪 本地模拟 Weaviate: {url}（延迟 {args.latency_ms}ms/请求 + {args.per_object_ms}ms/对象，"
+              f"失败率 {args.fail_rate:.0%}）")
+
+    objects = make_objects(args.objects, args.dim)
+    results = []
+    sample = objects[: min(args.single_sample, len(objects))]
+    for sleep in sorted({0.0, args.single_sleep}):
+        print(f"⏱️ 逐条写入 {len(sample)} 条（sleep={sleep}）...")
+        results.append(run_single(url, args.collection, sample, sleep))
+    for size in [int(s) for s in args.batch_sizes.split(",") if s]:
+        for conc in [int(c) for c in args.concurrency.split(",") if c]:
+            print(f"⏱️ 批量写入 {len(objects)} 条（size={size}, concurrency={conc}）...")
+            StandInHandler.seen_failures = set()
+            results.append(run_batch(url, args.collection, objects, size, conc))
+
+    print(f"\n{'模式':<26}{'对象数':>8}{'请求数':>8}{'耗时(s)':>10}{'obj/s':>10}{'10k 预计(min)':>16}")
+    for r in results:
+        eta = 10000 / r["objects_per_sec"] / 60 if r["objects_per_sec"] else 0
+        extra = f"  失败 {r['failed']} 重试 {r['retried']}" if "failed" in r else ""
+        print(f"{r['mode']:<26}{r['objects']:>8}{r['requests']:>8}{r['seconds']:>10}"
+              f"{r['objects_per_sec']:>10}{eta:>16.1f}{extra}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.json}")
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+候选人集合的结构化属性：schema 定义、从抽取结果生成属性、把检索过滤条件转换为 Weaviate where。
+    - name / position / phone / email / source_hash 为 field 分词（整值一个词）的可过滤属性，ingested_at 为 date
+    - 类型化属性（scripts/resume_attributes.py）：years_experience（number）、degree + degree_rank（int）、city、
+      recent_company；数值属性建范围索引（indexRangeFilters），“5 年以上 / 本科及以上”在向量索引内过滤
+    - 索引脚本从“=== 字段提取结果 ===”中的 JSON 取值，取不到时姓名、职位按文件名（姓名_职位_xxx.txt）兜底
+    - content 可全文检索（BM25 / 混合检索，分词方式见 scripts/hybrid_search.py）
+    - 已有集合缺少的属性在建索引时自动追加（POST /v1/schema/{class}/properties）
+    - 过滤在向量检索之前执行（Weaviate 先按倒排索引筛出允许的对象，再在其中做 HNSW 检索）
+用法示例：
+    ensure_candidate_class(WEAVIATE_URL, "Candidates")
+    attributes = candidate_attributes(parse_fields(full_text), filename, full_text)
+    where = build_where({"position": "光学", "ingested_after": "2025-01-01"})
+    query, filters = split_filter_terms("光学工程师 5年以上 本科及以上 深圳")
+    graphql = f"Candidates(nearVector: {{...}}, where: {graphql_where(where)}, limit: 5) {{ ... }}"
+"""
+
+import json
+import logging
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.hybrid_search import content_property, content_tokenization
+from scripts.index_manifest import content_hash
+from scripts.resume_attributes import (DEGREES, MAJOR_CITIES, degree_rank, normalize_city, normalize_degree,
+                                       typed_attributes)
+from scripts.vector_compression import with_compression
+from scripts.weaviate_schema import add_property, create_class, get_class
+
+
+def _filterable(name: str, data_type: str = "text", **extra) -> Dict[str, Any]:
+    prop = {"name": name, "dataType": [data_type], "indexFilterable": True}
+    if data_type == "text":
+        prop["tokenization"] = "field"
+    return dict(prop, **extra)
+
+
+CANDIDATE_PROPERTIES: List[Dict[str, Any]] = [
+    {"name": "filename", "dataType": ["text"]},
+    content_property(),  # 可做 BM25 / 混合检索，分词方式见 scripts/hybrid_search.py
+    _filterable("name"),
+    _filterable("position"),
+    _filterable("phone"),
+    _filterable("email"),
+    _filterable("source_hash"),
+    _filterable("ingested_at", "date", indexRangeFilters=True),
+    _filterable("years_experience", "number", indexRangeFilters=True),
+    _filterable("degree"),
+    _filterable("degree_rank", "int", indexRangeFilters=True),
+    _filterable("city"),
+    _filterable("recent_company"),
+    {"name": "notes", "dataType": ["text[]"]},
+]
+
+
+def _normalize_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        value = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return value.isoformat(timespec="seconds")
+    text = str(value).strip()
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+        return f"{text}T00:00:00+00:00"
+    return text
+
+
+# 过滤参数 -> (属性, 运算符, 值字段, 取值规范化；返回 None 表示无法识别)
+FILTERS: Dict[str, Tuple[str, str, str, Optional[Callable[[Any], Any]]]] = {
+    "name": ("name", "Equal", "valueText", None),
+    "position": ("position", "Like", "valueText", None),      # 包含匹配
+    "phone": ("phone", "Equal", "valueText", None),
+    "email": ("email", "Equal", "valueText", str.lower),
+    "source_hash": ("source_hash", "Equal", "valueText", None),
+    "ingested_after": ("ingested_at", "GreaterThanEqual", "valueDate", _normalize_date),
+    "ingested_before": ("ingested_at", "LessThanEqual", "valueDate", _normalize_date),
+    "min_years": ("years_experience", "GreaterThanEqual", "valueNumber", float),
+    "max_years": ("years_experience", "LessThanEqual", "valueNumber", float),
+    "degree": ("degree", "Equal", "valueText", normalize_degree),
+    "min_degree": ("degree_rank", "GreaterThanEqual", "valueInt", degree_rank),
+    "city": ("city", "Equal", "valueText", normalize_city),
+    "recent_company": ("recent_company", "Like", "valueText", None),
+}
+# 飞书 #search 中的“键:值”写法
+FILTER_KEYS = {
+    "姓名": "name", "职位": "position", "手机": "phone", "手机号": "phone", "邮箱": "email", "城市": "city",
+    "学历": "degree", "公司": "recent_company", "最近公司": "recent_company", "年限": "years", "工作年限": "years",
+    "years": "years",
+}
+
+FIELDS_BLOCK = re.compile(r"===\s*字段提取结果\s*===\s*\n(.*?)(?=\n===\s*[^=\n]+?\s*===|\Z)", re.DOTALL)
+RESUME_BODY = re.compile(r"===\s*原始简历文本\s*===\s*\n")
+FIELD_LINE = re.compile(r'"?([一-龥A-Za-z]+)"?\s*[:：]\s*"?([^"\n,，]*)')
+FILENAME_PATTERN = re.compile(r"(.+?)_(.+?)_")
+PLACEHOLDERS = {"", "null", "none", "未知", "未知姓名", "未知职位", "（未提取）"}
+
+logger = logging.getLogger(__name__)
+
+
+# ========= schema =========
+def ensure_candidate_class(weaviate_url: str, weaviate_class: str) -> bool:
+    """class 不存在时按 CANDIDATE_PROPERTIES 创建；已存在时补齐缺少的属性"""
+    definition = get_class(weaviate_url, weaviate_class)
+    if definition is None:
+        logger.info("📚 Weaviate 中未找到 %s，准备自动注册...", weaviate_class)
+        payload = {"class": weaviate_class, "vectorizer": "none", "properties": CANDIDATE_PROPERTIES}
+        return create_class(weaviate_url, with_compression(payload))  # VECTOR_COMPRESSION=pq|bq 时带上压缩配置
+    existing = {p["name"] for p in definition.get("properties") or []}
+    tokenization = content_tokenization(definition)
+    if tokenization and tokenization != content_property()["tokenization"]:
+        logger.info("ℹ️ %s 的 content 为 %s 分词，关键词 / 混合检索效果有限；可用 hybrid_search.py --retokenize 迁移",
+                    weaviate_class, tokenization)
+    return all(add_property(weaviate_url, weaviate_class, prop)
+               for prop in CANDIDATE_PROPERTIES if prop["name"] not in existing)
+
+
+def class_properties(weaviate_url: str, weaviate_class: str) -> Set[str]:
+    """集合已声明的属性名；读取失败时返回空集合"""
+    try:
+        definition = get_class(weaviate_url, weaviate_class)
+    except Exception as e:
+        logger.warning("⚠️ 读取 %s 的 schema 失败: %s", weaviate_class, e)
+        return set()
+    return {p["name"] for p in (definition or {}).get("properties") or []}
+
+
+# ========= 从抽取结果生成属性 =========
+def parse_fields(text: str) -> Dict[str, str]:
+    """解析“字段提取结果”块（JSON，旧文件为“键：值”行）；传入整份文本或只传字段块均可"""
+    match = FIELDS_BLOCK.search(text or "")
+    block = (match.group(1) if match else text or "").strip()
+    try:
+        data = json.loads(block)
+        if isinstance(data, dict):
+            return {str(k): "" if v is None else str(v) for k, v in data.items()}
+    except ValueError:
+        pass
+    return {key: value.strip() for key, value in FIELD_LINE.findall(block)}
+
+
+def _clean(value: Optional[str]) -> str:
+    value = (value or "").strip()
+    return "" if value.lower() in PLACEHOLDERS else value
+
+
+def resume_body(text: str) -> str:
+    """抽取结果文件中“原始简历文本”之后的部分；没有该标题时为全文"""
+    parts = RESUME_BODY.split(text or "", maxsplit=1)
+    return parts[-1]
+
+
+def candidate_attributes(fields: Dict[str, str], filename: str, source_text: str) -> Dict[str, Any]:
+    """写入 Weaviate 的结构化属性（不含 ingested_at，便于参与内容哈希判断是否变化）"""
+    name, position = _clean(fields.get("姓名")), _clean(fields.get("应聘职位") or fields.get("目标职位"))
+    match = FILENAME_PATTERN.match(filename)
+    if match:
+        name = name or _clean(match.group(1))
+        position = position or _clean(match.group(2))
+    phone = re.sub(r"\D", "", _clean(fields.get("手机号")))
+    if len(phone) == 13 and phone.startswith("86"):
+        phone = phone[2:]
+    return {
+        "name": name,
+        "position": position,
+        "phone": phone,
+        "email": _clean(fields.get("邮箱")).lower(),
+        "source_hash": content_hash(source_text),
+        **typed_attributes(fields, resume_body(source_text)),
+    }
+
+
+def ingestion_time() -> str:
+    """RFC3339 时间，Weaviate date 属性的格式"""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ========= 过滤条件 =========
+def build_where(filters: Optional[Dict[str, Any]], path_prefix: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    把 {过滤参数: 值} 转成 Weaviate where（多个条件 And）；值为列表时取任一匹配。
+    path_prefix 用于跨引用过滤，如段落集合按候选人属性过滤：["candidate", "Candidates"]。
+    """
+    operands = []
+    for key, value in (filters or {}).items():
+        if value is None or value == "" or value == []:
+            continue
+        if key not in FILTERS:
+            raise ValueError(f"不支持的过滤条件: {key}（可选: {', '.join(FILTERS)}）")
+        prop, operator, value_key, normalize = FILTERS[key]
+        values = value if isinstance(value, (list, tuple)) else [value]
+        clauses = []
+        for raw in values:
+            try:
+                v = normalize(raw) if normalize else raw
+            except (TypeError, ValueError):
+                v = None
+            if v is None:
+                raise ValueError(f"无法识别的过滤值: {key}={raw}")
+            if operator == "Like":
+                v = f"*{v}*"
+            clauses.append({"path": [*path_prefix, prop], "operator": operator, value_key: v})
+        operands.append(clauses[0] if len(clauses) == 1 else {"operator": "Or", "operands": clauses})
+    if not operands:
+        return None
+    return operands[0] if len(operands) == 1 else {"operator": "And", "operands": operands}
+
+
+def where_properties(where: Optional[Dict[str, Any]]) -> Set[str]:
+    """where 中引用的属性名（跨引用路径取最后一段）"""
+    if not where:
+        return set()
+    if "operands" in where:
+        return set().union(*(where_properties(o) for o in where["operands"]))
+    return {where["path"][-1]}
+
+
+def graphql_where(where: Dict[str, Any]) -> str:
+    """where dict → GraphQL 参数字面量（键不加引号，operator 为枚举）"""
+    def render(value: Any, key: Optional[str] = None) -> str:
+        if isinstance(value, dict):
+            return "{" + ", ".join(f"{k}: {render(v, k)}" for k, v in value.items()) + "}"
+        if isinstance(value, list):
+            return "[" + ", ".join(render(v, key) for v in value) + "]"
+        if key == "operator":
+            return value
+        return json.dumps(value, ensure_ascii=False)
+    return render(where)
+
+
+def years_filters(token: str) -> Dict[str, float]:
+    """5年以上 / 5+年 → min_years，10年以内 → max_years，3-5年 → 两者；无法识别时返回空 dict"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*[-~到至]\s*(\d+(?:\.\d+)?)\s*年", token)
+    if match:
+        return {"min_years": float(match.group(1)), "max_years": float(match.group(2))}
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(?:\+\s*年|年\s*(?:及?以上|\+))", token)
+    if match:
+        return {"min_years": float(match.group(1))}
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*年\s*(?:及?以下|以内)", token)
+    if match:
+        return {"max_years": float(match.group(1))}
+    return {}
+
+
+def split_filter_terms(text: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    把飞书 #search 的参数拆成 (检索词, 过滤条件)，按空白分词，识别：
+        5年以上 / 3-5年 / 10年以内、本科及以上 / 硕士以上、博士、深圳（常见城市名）、城市:深圳 学历:本科 公司:华为 年限:3-5
+    年限:5 只写一个数时按“5 年以上”处理；年限后的值无法识别时保留为过滤值，由 build_where 报错提示，不会静默丢弃。
+    其余词拼回检索词；只有过滤条件时检索词为原文。
+    """
+    query, filters = [], {}
+    for token in (text or "").split():
+        key, sep, value = re.split(r"([:：=])", token, maxsplit=1) if re.search(r"[:：=]", token) else (token, "", "")
+        key = FILTER_KEYS.get(key.lower(), key)
+        if sep and key == "years":
+            value = value.strip()
+            if re.fullmatch(r"\d+(?:\.\d+)?\s*年?", value):
+                value = value.rstrip("年").strip() + "年以上"
+            filters.update(years_filters(value if "年" in value else value + "年") or {"min_years": value})
+            continue
+        if sep and key in FILTERS:
+            if key in ("name", "city"):
+                filters.setdefault(key, []).append(value)
+            else:
+                filters[key] = value
+            continue
+
+        years = years_filters(token)
+        if years:
+            filters.update(years)
+            continue
+        match = re.fullmatch(r"(.+?)及?以上", token)
+        if match and match.group(1) in DEGREES + ["研究生", "专科"]:
+            filters["min_degree"] = normalize_degree(match.group(1))
+            continue
+        if token in DEGREES:
+            filters["degree"] = token
+            continue
+        if len(token) <= 4 and normalize_city(token) in MAJOR_CITIES:
+            filters.setdefault("city", []).append(normalize_city(token))
+            continue
+        query.append(token)
+
+    for key in ("name", "city"):
+        if len(filters.get(key) or []) == 1:
+            filters[key] = filters[key][0]
+    return " ".join(query) or (text or "").strip(), filters
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+段落级索引：每个段落单独作为一个对象写入 CandidateChunks，并通过 candidate 引用指向 Candidates 中的父对象。
+解决单向量索引只保留 chunks[:TOP_N] 导致长简历后半部分无法被检索的问题。
+    - INDEX_MODE=chunk 时索引脚本在写父对象之外额外写入全部段落（段落向量批量计算、批量写入）
+    - 搜索时先按段落召回，再按父候选人分组聚合：max（最佳段落）或 sum（前 CHUNK_SUM_TOP 段之和）
+用法示例：
+    ensure_chunk_class(WEAVIATE_URL)
+    records = chunk_records(resume_uuid, filename, chunks)
+    index_chunk_records(client, records, WEAVIATE_URL)
+    groups = search_chunks(WEAVIATE_URL, vector, limit=50, aggregation="max")
+    groups = search_chunks(WEAVIATE_URL, vector, mode="hybrid", query="Zemax 光学设计", alpha=0.5)
+"""
+
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from scripts.candidate_schema import graphql_where
+from scripts.collection_registry import active_class
+from scripts.embedding_batcher import embed_in_batches
+from scripts.hybrid_search import additional_fields, content_property, hit_score, search_clause
+from scripts.index_manifest import IndexManifest
+from scripts.pooled_embedding import embedding_signature
+from scripts.vector_compression import with_compression
+from scripts.weaviate_batch import BatchWriter
+from scripts.weaviate_schema import create_class, get_class
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+# 经集合注册表解析为当前生效的物理 class（换维度迁移后段落集合与候选人集合一起切换）
+WEAVIATE_CLASS = active_class(os.getenv("WEAVIATE_COLLECTION", "Candidates"))
+WEAVIATE_CHUNK_CLASS = active_class(os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks"))
+INDEX_MODE = os.getenv("INDEX_MODE", "single")  # single | chunk
+CHUNK_AGGREGATION = os.getenv("CHUNK_AGGREGATION", "max")  # max | sum
+CHUNK_SUM_TOP = int(os.getenv("CHUNK_SUM_TOP", "3"))
+CHUNK_SEARCH_LIMIT = int(os.getenv("CHUNK_SEARCH_LIMIT", "50"))
+NAMESPACE_CHUNK = uuid.UUID("8c1d6a8e-6f0b-4a55-9f34-2a9a4c1f7b21")
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_mode_enabled() -> bool:
+    return INDEX_MODE == "chunk"
+
+
+def chunk_uuid(parent_uuid: str, index: int) -> str:
+    return str(uuid.uuid5(NAMESPACE_CHUNK, f"{parent_uuid}:{index}"))
+
+
+def beacon(parent_class: str, parent_uuid: str) -> str:
+    return f"weaviate://localhost/{parent_class}/{parent_uuid}"
+
+
+def ensure_chunk_class(weaviate_url: str = WEAVIATE_URL, chunk_class: str = WEAVIATE_CHUNK_CLASS,
+                       parent_class: str = WEAVIATE_CLASS) -> bool:
+    """class 不存在时创建；返回集合是否可用（已存在或创建成功），Weaviate 不可达时抛 requests.RequestException"""
+    if get_class(weaviate_url, chunk_class) is not None:
+        return True
+    logger.info("📚 Weaviate 中未找到 %s，准备自动注册...", chunk_class)
+    payload = {
+        "class": chunk_class,
+        "vectorizer": "none",
+        "properties": [
+            {"name": "filename", "dataType": ["text"]},
+            content_property(),
+            {"name": "chunk_index", "dataType": ["int"]},
+            {"name": "candidate", "dataType": [parent_class]},
+        ],
+    }
+    return create_class(weaviate_url, with_compression(payload))
+
+
+def chunk_records(parent_uuid: str, filename: str, chunks: List[str],
+                  parent_class: str = WEAVIATE_CLASS) -> List[Dict[str, Any]]:
+    return [
+        {
+            "uuid": chunk_uuid(parent_uuid, i),
+            "parent_uuid": parent_uuid,
+            "filename": filename,
+            "content": chunk,
+            "properties": {
+                "filename": filename,
+                "content": chunk,
+                "chunk_index": i,
+                "candidate": [{"beacon": beacon(parent_class, parent_uuid)}],
+            },
+        }
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def index_chunk_records(client, records: List[Dict[str, Any]], weaviate_url: str = WEAVIATE_URL,
+                        chunk_class: str = WEAVIATE_CHUNK_CLASS, manifest: Optional[IndexManifest] = None,
+                        text_of: Callable[[Dict[str, Any]], str] = lambda r: r["content"],
+                        writer_factory: Callable[..., Any] = BatchWriter) -> str:
+    """批量向量化并写入段落对象，返回写入统计；writer_factory 可换成 SpoolWriter（先落盘再补写）"""
+    by_uuid = {record["uuid"]: record for record in records}
+
+    def on_indexed(chunk_id: str):
+        if manifest is not None:
+            record = by_uuid[chunk_id]
+            manifest.record(chunk_id, record["filename"], record["content"],
+                            embedding_signature(client.embedding_model, "truncate", client.dimensions))
+
+    with writer_factory(weaviate_url=weaviate_url, weaviate_class=chunk_class, on_success=on_indexed) as writer:
+        for batch, vectors in embed_in_batches(client, records, text_of):
+            for record, vector in zip(batch, vectors):
+                if vector:
+                    writer.add(record["uuid"], record["properties"], vector)
+    return writer.report()
+
+
+def aggregate(scores: List[float], aggregation: str = CHUNK_AGGREGATION, sum_top: int = CHUNK_SUM_TOP) -> float:
+    ordered = sorted(scores, reverse=True)
+    if aggregation == "sum":
+        return sum(ordered[:sum_top])
+    return ordered[0] if ordered else 0.0
+
+
+def search_chunks(weaviate_url: str, vector: Optional[List[float]], limit: int = CHUNK_SEARCH_LIMIT,
+                  certainty: Optional[float] = None, aggregation: str = CHUNK_AGGREGATION,
+                  chunk_class: str = WEAVIATE_CHUNK_CLASS, parent_class: str = WEAVIATE_CLASS,
+                  where: Optional[Dict[str, Any]] = None, mode: str = "vector", query: str = "",
+                  alpha: Optional[float] = None, parent_properties: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """按段落召回后按父候选人分组，返回按聚合得分降序的 [{uuid, filename, properties, score, chunks}]
+    mode=keyword / hybrid 时按 BM25 / 混合得分召回（keyword 不需要 vector，certainty 只对 vector 生效）；
+    parent_properties 经 candidate 引用在同一次查询中取回候选人属性（properties），不再逐个 GET 父对象"""
+    extra = {} if alpha is None else {"alpha": alpha}
+    clause = search_clause(mode, query, vector, certainty if mode == "vector" else None, **extra)
+    where_clause = f", where: {graphql_where(where)}" if where else ""
+    graphql_query = {
+        "query": f"""
+        {{
+          Get {{
+            {chunk_class}({clause}{where_clause}, limit: {limit}) {{
+              chunk_index
+              content
+              candidate {{ ... on {parent_class} {{ filename {" ".join(parent_properties)} _additional {{ id }} }} }}
+              _additional {{ {additional_fields(mode)} }}
+            }}
+          }}
+        }}
+        """
+    }
+    res = requests.post(f"{weaviate_url}/v1/graphql", json=graphql_query, timeout=60)
+    if res.status_code != 200:
+        raise Exception(f"GraphQL 请求失败：{res.status_code} - {res.text}")
+    body = res.json()
+    if body.get("errors"):
+        raise Exception(f"GraphQL 错误：{body['errors']}")
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    for obj in body["data"]["Get"][chunk_class] or []:
+        parents = obj.get("candidate") or []
+        if not parents:
+            continue
+        parent = parents[0]
+        parent_id = parent["_additional"]["id"]
+        score = hit_score(mode, obj["_additional"])
+        group = groups.setdefault(parent_id, {"uuid": parent_id, "filename": parent.get("filename", ""), "chunks": [],
+                                              "properties": {k: v for k, v in parent.items() if k != "_additional"}})
+        group["chunks"].append({"chunk_index": obj.get("chunk_index"), "content": obj.get("content", ""),
+                                "score": score})
+
+    for group in groups.values():
+        group["chunks"].sort(key=lambda c: c["score"], reverse=True)
+        group["score"] = aggregate([c["score"] for c in group["chunks"]], aggregation)
+    return sorted(groups.values(), key=lambda g: g["score"], reverse=True)
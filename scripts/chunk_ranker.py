@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+本地段落排序：替代逐段调用 LLM 打分（score_chunk），索引阶段零 LLM 调用。
+    - prototype（默认）：一份简历的全部段落一次批量向量化，与岗位原型向量做 NumPy 余弦相似度，取最大值排序
+    - heuristic：不调用任何模型，按长度与信息密度（字符多样性、数字/年份、技能关键词）打分
+岗位原型通过 CHUNK_ROLE_PROTOTYPES 配置（以 | 分隔），默认覆盖几类常见岗位，避免偏向单一职位。
+用法示例：
+    selected = select_chunks(client, chunks, top_n=5)
+"""
+
+import logging
+import os
+import re
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from scripts.provider_client import EmbeddingCacheMiss
+
+CHUNK_RANKING = os.getenv("CHUNK_RANKING", "prototype")  # prototype | heuristic
+DEFAULT_ROLE_PROTOTYPES = "|".join([
+    "工程师 研发 技术开发 项目经验 负责设计与实现",
+    "产品经理 需求分析 产品规划 用户研究",
+    "销售 市场 商务拓展 客户管理 业绩",
+    "运营 数据分析 增长 活动策划",
+    "财务 人力资源 行政 管理",
+    "工作经历 任职公司 职位 工作职责 主要成果",
+    "教育背景 学历 学校 专业",
+    "专业技能 证书 熟练掌握",
+])
+CHUNK_ROLE_PROTOTYPES = [p.strip() for p in os.getenv("CHUNK_ROLE_PROTOTYPES", DEFAULT_ROLE_PROTOTYPES).split("|")
+                         if p.strip()]
+
+logger = logging.getLogger(__name__)
+
+_prototype_cache = {}
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def prototype_matrix(client, prototypes: Sequence[str] = CHUNK_ROLE_PROTOTYPES) -> np.ndarray:
+    """岗位原型向量（每个 provider / 模型只算一次）"""
+    key = (client.provider, client.embedding_model, tuple(prototypes))
+    if key not in _prototype_cache:
+        _prototype_cache[key] = normalize_rows(np.asarray(client.embed(list(prototypes), scope="index"), dtype=np.float32))
+    return _prototype_cache[key]
+
+
+def heuristic_scores(chunks: Sequence[str]) -> List[float]:
+    """长度 + 信息密度：字符多样性、数字/年份、英文技能词"""
+    scores = []
+    for chunk in chunks:
+        text = chunk.strip()
+        if not text:
+            scores.append(0.0)
+            continue
+        length = min(len(text), 300) / 300
+        diversity = min(len(set(text)), 150) / 150  # 不同字符数，短段落和大量重复字符得分都低
+        years = len(re.findall(r"(19|20)\d{2}", text))
+        digits = len(re.findall(r"\d+", text))
+        skills = len(re.findall(r"[A-Za-z][A-Za-z+#.]{1,}", text))
+        scores.append(length * 0.2 + diversity * 0.5 + min(years, 4) * 0.05 + min(digits, 10) * 0.01
+                      + min(skills, 10) * 0.01)
+    return scores
+
+
+def prototype_scores(client, chunks: Sequence[str], prototypes: Sequence[str] = CHUNK_ROLE_PROTOTYPES) -> List[float]:
+    """全部段落一次批量向量化，与各岗位原型的余弦相似度取最大值"""
+    vectors = normalize_rows(np.asarray(client.embed(list(chunks), scope="index"), dtype=np.float32))
+    return (vectors @ prototype_matrix(client, prototypes).T).max(axis=1).tolist()
+
+
+def rank_chunks(client, chunks: Sequence[str], mode: Optional[str] = None) -> List[float]:
+    mode = mode or CHUNK_RANKING
+    if not chunks:
+        return []
+    if mode == "prototype" and client is not None:
+        try:
+            return prototype_scores(client, chunks)
+        except EmbeddingCacheMiss:
+            raise  # 只读缓存时无法排序，由调用方决定如何处理，不能静默换成启发式（选出的段落会不同）
+        except Exception as e:
+            logger.warning("⚠️ 原型排序失败，改用启发式: %s", e)
+    return heuristic_scores(chunks)
+
+
+def select_chunks(client, chunks: Sequence[str], top_n: int, mode: Optional[str] = None) -> List[str]:
+    """按得分从高到低取前 top_n 段"""
+    scored = sorted(zip(chunks, rank_chunks(client, chunks, mode)), key=lambda x: x[1], reverse=True)
+    return [chunk for chunk, _ in scored[:top_n]]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+集合注册表：逻辑集合名（WEAVIATE_COLLECTION，如 Candidates）→ 当前生效的物理 class 及其向量配置。
+Weaviate 1.30 没有集合别名：换维度、重建索引时先写入新 class，校验通过后只改这里的指针即完成切换。
+    - 注册表是一个 JSON 文件（COLLECTION_REGISTRY_PATH），没有条目时逻辑名就是物理 class（与原行为一致）
+    - 条目记录 class / provider / embedding_model / dimensions，查询向量必须与集合内向量同模型同维度
+    - ResumeSearcher 每次查询前按文件 mtime 检查指针，切换后无需重启服务
+    - 切换前的 class 记入 history，保留在 Weaviate 中以便 --rollback
+用法示例：
+    target = resolve("Candidates")        # target.class_name / target.embedding_model / target.dimensions
+    switch("Candidates", "CandidatesD256", provider="openai", embedding_model="text-embedding-3-small", dimensions=256)
+    python scripts/collection_registry.py
+    python scripts/collection_registry.py --rollback Candidates
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+COLLECTION_REGISTRY_PATH = os.getenv("COLLECTION_REGISTRY_PATH", str(root_dir / "data" / "collection_registry.json"))
+REGISTRY_HISTORY = 5
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CollectionTarget:
+    logical: str
+    class_name: str
+    provider: Optional[str] = None
+    embedding_model: Optional[str] = None
+    dimensions: int = 0            # 0：模型默认维度
+    switched_at: Optional[str] = None
+
+
+_cache: Dict[str, Any] = {"mtime": None, "data": {}}
+_lock = threading.Lock()
+
+
+def load_registry(path: str = COLLECTION_REGISTRY_PATH) -> Dict[str, Dict[str, Any]]:
+    """读取注册表；文件未变化（mtime 相同）时直接返回缓存"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    mtime = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _cache["mtime"] != mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _cache["data"] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("❌ 读取集合注册表失败 %s: %s（沿用上次内容）", path, e)
+                return dict(_cache["data"])
+            _cache["mtime"] = mtime
+        return dict(_cache["data"])
+
+
+def save_registry(data: Dict[str, Dict[str, Any]], path: str = COLLECTION_REGISTRY_PATH):
+    """先写临时文件再 os.replace，读者不会看到写了一半的 JSON"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def resolve(logical: str = WEAVIATE_CLASS, path: str = COLLECTION_REGISTRY_PATH) -> CollectionTarget:
+    entry = load_registry(path).get(logical)
+    if not entry:
+        return CollectionTarget(logical=logical, class_name=logical)
+    return CollectionTarget(logical=logical, class_name=entry["class"], provider=entry.get("provider"),
+                            embedding_model=entry.get("embedding_model"),
+                            dimensions=int(entry.get("dimensions") or 0), switched_at=entry.get("switched_at"))
+
+
+def active_class(logical: str = WEAVIATE_CLASS) -> str:
+    return resolve(logical).class_name
+
+
+def embedding_settings(provider: str, default_model: str, default_dimensions: int,
+                       logical: str = WEAVIATE_CLASS) -> Tuple[str, int]:
+    """
+    索引 / 搜索脚本使用的 (embedding 模型, 维度)：注册表登记了同一 provider 的配置时以注册表为准，
+    保证写入和查询的向量与当前集合一致；provider 不同则沿用环境变量并提示。
+    """
+    target = resolve(logical)
+    if not target.embedding_model:
+        return default_model, default_dimensions
+    if target.provider and target.provider != provider:
+        logger.warning("⚠️ 集合 %s 由 %s/%s 向量化，当前脚本使用 %s/%s，向量可能不兼容",
+                       target.class_name, target.provider, target.embedding_model, provider, default_model)
+        return default_model, default_dimensions
+    return target.embedding_model, target.dimensions
+
+
+def switch(logical: str, class_name: str, provider: Optional[str] = None, embedding_model: Optional[str] = None,
+           dimensions: int = 0, path: str = COLLECTION_REGISTRY_PATH) -> CollectionTarget:
+    """把逻辑集合指向新的物理 class，原 class 记入 history"""
+    data = load_registry(path)
+    previous = data.get(logical) or {"class": logical}
+    history = [previous["class"]] + [c for c in previous.get("history", []) if c != previous["class"]]
+    entry = {
+        "class": class_name,
+        "provider": provider,
+        "embedding_model": embedding_model,
+        "dimensions": dimensions,
+        "switched_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "history": [c for c in history if c != class_name][:REGISTRY_HISTORY],
+        "previous": {k: v for k, v in previous.items() if k not in ("history", "previous")},
+    }
+    data[logical] = entry
+    save_registry(data, path)
+    logger.info("🔀 %s 已切换: %s → %s", logical, previous["class"], class_name)
+    return resolve(logical, path)
+
+
+def rollback(logical: str, path: str = COLLECTION_REGISTRY_PATH) -> CollectionTarget:
+    """切回上一个 class（连同它的模型 / 维度配置）"""
+    entry = load_registry(path).get(logical)
+    if not entry or not entry.get("previous"):
+        raise SystemExit(f"❌ {logical} 没有可回滚的记录")
+    previous = entry["previous"]
+    return switch(logical, previous["class"], previous.get("provider"), previous.get("embedding_model"),
+                  int(previous.get("dimensions") or 0), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看 / 回滚集合注册表指针")
+    parser.add_argument("--rollback", metavar="COLLECTION", help="把逻辑集合切回上一个 class")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.rollback:
+        target = rollback(args.rollback)
+        print(f"↩️ {target.logical} → {target.class_name}")
+    data = load_registry()
+    if not data:
+        print(f"📭 注册表为空（{COLLECTION_REGISTRY_PATH}），各逻辑集合直接使用同名 class")
+        return
+    for logical in sorted(data):
+        print(json.dumps(asdict(resolve(logical)), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
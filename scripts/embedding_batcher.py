@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+批量向量化：把待索引的简历按条数和 token 数上限分批，每批一次 embeddings 请求。
+返回的向量按输入顺序与原记录一一对应；整批失败时逐条重试，只丢弃真正失败的记录。
+"""
+
+import logging
+import os
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from scripts.tokens import get_token_counter
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "100000"))
+
+logger = logging.getLogger(__name__)
+
+
+def iter_batches(items: Iterable[Any], text_of: Callable[[Any], str], max_items: int = EMBED_BATCH_SIZE,
+                 max_tokens: int = EMBED_BATCH_MAX_TOKENS, model: Optional[str] = None) -> Iterator[List[Any]]:
+    """按条数 / token 数上限切分；单条超过 token 上限时独占一批"""
+    count = get_token_counter(model)
+    batch, batch_tokens = [], 0
+    for item in items:
+        tokens = count(text_of(item))
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_batch(client, texts: List[str], model: Optional[str] = None) -> List[Optional[List[float]]]:
+    """一次请求向量化整批；失败时逐条重试，失败项返回 None"""
+    try:
+        vectors = client.embed(texts, model, scope="index")
+        if len(vectors) != len(texts):
+            raise ValueError(f"向量数量不符: {len(vectors)} != {len(texts)}")
+        return vectors
+    except Exception as e:
+        logger.warning("⚠️ 批量向量化失败（%d 条），改为逐条重试: %s", len(texts), e)
+    results: List[Optional[List[float]]] = []
+    for text in texts:
+        try:
+            results.append(client.embed_one(text, model, scope="index"))
+        except Exception as e:
+            logger.error("❌ 单条向量化失败: %s", e)
+            results.append(None)
+    return results
+
+
+def embed_in_batches(client, items: Iterable[Any], text_of: Callable[[Any], str], max_items: int = EMBED_BATCH_SIZE,
+                     max_tokens: int = EMBED_BATCH_MAX_TOKENS,
+                     model: Optional[str] = None) -> Iterator[Tuple[List[Any], List[Optional[List[float]]]]]:
+    """逐批产出 (记录列表, 对应向量列表)，方便调用方边向量化边写库"""
+    model = model or client.embedding_model
+    for batch in iter_batches(items, text_of, max_items, max_tokens, model):
+        yield batch, embed_batch(client, [text_of(item) for item in batch], model)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+向量持久化缓存（SQLite + 进程内 LRU），索引脚本与搜索共用。
+    - 缓存键：模型名 + 归一化文本（NFKC、合并空白）的 sha256
+    - 向量以 float32 BLOB 存储；同一文件可被多个进程同时读写（WAL）
+    - 进程内 LRU 挡在 SQLite 前面（EMBED_CACHE_MEMORY_ITEMS），磁盘总大小超过 EMBED_CACHE_MAX_MB 时淘汰最久未访问的条目
+    - 按使用场景（index / query）统计内存命中、磁盘命中、未命中
+    - EMBED_CACHE_MODE：on（默认）| off
+用法示例：
+    vectors = get_embedding_cache().embed(model, texts, fetch=lambda missing: backend.embed(missing, model), scope="query")
+    python scripts/embedding_cache.py            # 查看缓存统计
+    python scripts/embedding_cache.py --clear    # 清空缓存
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", str(root_dir / "data" / "cache" / "embedding_cache.sqlite3"))
+EMBED_CACHE_MODE = os.getenv("EMBED_CACHE_MODE", "on")
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "1024"))
+EMBED_CACHE_MEMORY_ITEMS = int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "2000"))
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def make_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = EMBED_CACHE_PATH, mode: str = EMBED_CACHE_MODE,
+                 max_mb: float = EMBED_CACHE_MAX_MB, memory_items: int = EMBED_CACHE_MEMORY_ITEMS):
+        self.path = path
+        self.mode = mode
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        self._writes_since_evict = 0
+        if self.mode != "off":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._init_db()
+
+    # ========= SQLite =========
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                dim INTEGER,
+                vector BLOB,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)")
+        conn.commit()
+
+    # ========= 进程内 LRU =========
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _memory_put(self, key: str, vector: List[float]):
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    # ========= 读写 =========
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        conn = self._conn()
+        found = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        if found:
+            conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                             [(time.time(), key) for key in found])
+            conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]):
+        now = time.time()
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, model, len(vec), np.asarray(vec, dtype=np.float32).tobytes(), now, now)
+             for key, vec in items.items()],
+        )
+        conn.commit()
+        self._writes_since_evict += len(items)
+        if self._writes_since_evict >= 200:
+            self._writes_since_evict = 0
+            self.evict()
+
+    def evict(self):
+        """总大小超过上限时，按最久未访问淘汰到上限的 90%"""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access ASC"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        conn = self._conn()
+        conn.execute("DELETE FROM embeddings")
+        conn.commit()
+
+    # ========= 统计 =========
+    def _count(self, scope: str, field: str, n: int = 1):
+        if n:
+            with self._lock:
+                self._stats[scope][field] += n
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for scope, s in self._stats.items():
+                lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+                hits = s["memory_hits"] + s["disk_hits"]
+                result[scope] = dict(s, hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+            return result
+
+    def disk_usage(self) -> Dict[str, Any]:
+        if self.mode == "off":
+            return {"entries": 0, "bytes": 0}
+        rows = self._conn().execute(
+            "SELECT model, COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings GROUP BY model"
+        ).fetchall()
+        return {
+            "entries": sum(r[1] for r in rows),
+            "bytes": sum(r[2] for r in rows),
+            "memory_entries": len(self._memory),
+            "by_model": {r[0]: {"entries": r[1], "bytes": r[2]} for r in rows},
+        }
+
+    # ========= 主入口 =========
+    def embed(self, model: str, texts: List[str], fetch: Callable[[List[str]], List[List[float]]],
+              scope: str = "default") -> List[List[float]]:
+        """先查内存 LRU，再查 SQLite，只对未命中的文本调用 fetch；返回顺序与 texts 一致"""
+        if self.mode == "off" or not texts:
+            return fetch(texts)
+
+        keys = [make_key(model, text) for text in texts]
+        results: Dict[str, List[float]] = {}
+        for key in keys:
+            vector = self._memory_get(key)
+            if vector is not None:
+                results[key] = vector
+        self._count(scope, "memory_hits", len(results))
+
+        missing_keys = [k for k in dict.fromkeys(keys) if k not in results]
+        if missing_keys:
+            disk = self.get_many(missing_keys)
+            self._count(scope, "disk_hits", len(disk))
+            for key, vector in disk.items():
+                results[key] = vector
+                self._memory_put(key, vector)
+
+        to_fetch = {}
+        for key, text in zip(keys, texts):
+            if key not in results and key not in to_fetch:
+                to_fetch[key] = text
+        if to_fetch:
+            self._count(scope, "misses", len(to_fetch))
+            fetched = fetch(list(to_fetch.values()))
+            stored = dict(zip(to_fetch.keys(), fetched))
+            self.put_many(model, stored)
+            for key, vector in stored.items():
+                results[key] = vector
+                self._memory_put(key, vector)
+        return [results[key] for key in keys]
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
+
+
+def main():
+    cache = get_embedding_cache()
+    if "--clear" in sys.argv[1:]:
+        cache.clear()
+        print("🧹 已清空向量缓存")
+        return
+    print(f"📦 向量缓存: {cache.path}（模式: {cache.mode}）")
+    print(json.dumps(cache.disk_usage(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
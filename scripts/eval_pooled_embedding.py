@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+对比简历向量策略在人工标注查询集上的召回：
+    - truncate：前 TOP_N 段拼接后向量化（index_resumes.py --chunk-strategy head）
+    - ranked：本地排序选出的 TOP_N 段（index_resumes.py --chunk-strategy ranked）
+    - pooled：全部段落向量按长度加权池化
+标注文件为 JSONL，每行一个查询，relevant 为应被召回的简历文件名（提取后的 .txt）：
+    {"query": "光学工程师 镜头设计 Zemax", "relevant": ["张三_光学工程师_2023.txt"]}
+向量在内存中用 NumPy 余弦检索，不依赖 Weaviate；输出 recall@1/5/10 与 MRR。
+用法示例：
+    python scripts/eval_pooled_embedding.py data/labelled_queries.jsonl --resumes-dir data/resumes_extract_enhanced
+    python scripts/eval_pooled_embedding.py data/labelled_queries.jsonl --provider tongyi
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts.chunk_ranker import select_chunks
+from scripts.embedding_batcher import embed_in_batches
+from scripts.index_resumes import build_vector_text, load_resume_text, split_txt_sections
+from scripts.pooled_embedding import pooled_in_batches
+from scripts.provider_client import get_client
+from scripts.text_chunker import chunk_text
+
+STRATEGIES = ["truncate", "ranked", "pooled"]
+KS = [1, 5, 10]
+TOP_N = 5
+
+
+def load_corpus(resumes_dir: str) -> Dict[str, List[str]]:
+    """文件名 -> 段落列表（与索引脚本相同的拼接与切分）"""
+    corpus = {}
+    for filename in sorted(os.listdir(resumes_dir)):
+        if not filename.endswith(".txt"):
+            continue
+        full_text = load_resume_text(os.path.join(resumes_dir, filename))
+        fields, sections, raw = split_txt_sections(full_text)
+        chunks = chunk_text(build_vector_text(fields, sections, raw))
+        if chunks:
+            corpus[filename] = chunks
+    return corpus
+
+
+def load_queries(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def doc_matrix(client, corpus: Dict[str, List[str]], strategy: str) -> np.ndarray:
+    names = list(corpus)
+    if strategy == "pooled":
+        vectors = {}
+        for batch, pooled in pooled_in_batches(client, names, lambda n: corpus[n]):
+            vectors.update(zip(batch, pooled))
+        rows = [vectors.get(n) for n in names]
+    else:
+        if strategy == "truncate":
+            texts = {n: "\n".join(corpus[n][:TOP_N]) for n in names}
+        else:
+            texts = {n: "\n".join(select_chunks(client, corpus[n], TOP_N)) for n in names}
+        rows = []
+        for batch, vectors in embed_in_batches(client, names, lambda n: texts[n]):
+            rows.extend(vectors)
+    dim = len(next(r for r in rows if r))
+    matrix = np.asarray([r if r else [0.0] * dim for r in rows], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def evaluate(doc_vectors: np.ndarray, names: List[str], query_vectors: np.ndarray, queries: List[Dict]) -> Dict:
+    scores = query_vectors @ doc_vectors.T
+    ranking = np.argsort(-scores, axis=1)
+    recall = {k: [] for k in KS}
+    reciprocal = []
+    for row, query in zip(ranking, queries):
+        relevant = {r for r in query.get("relevant", []) if r in names}
+        if not relevant:
+            continue
+        ranked_names = [names[i] for i in row]
+        for k in KS:
+            recall[k].append(len(relevant & set(ranked_names[:k])) / len(relevant))
+        first = next((i for i, n in enumerate(ranked_names) if n in relevant), None)
+        reciprocal.append(1.0 / (first + 1) if first is not None else 0.0)
+    result = {f"recall@{k}": round(float(np.mean(v)), 3) if v else 0.0 for k, v in recall.items()}
+    result["MRR"] = round(float(np.mean(reciprocal)), 3) if reciprocal else 0.0
+    result["queries"] = len(reciprocal)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历向量策略召回评估")
+    parser.add_argument("labels", help="标注查询 JSONL")
+    parser.add_argument("--resumes-dir", default=os.getenv("EXTRACTED_DIR", "data/resumes_extract_enhanced"))
+    parser.add_argument("--provider", choices=["openai", "tongyi", "fake"], default="openai")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    args = parser.parse_args()
+
+    client = get_client(args.provider)
+    corpus = load_corpus(args.resumes_dir)
+    queries = load_queries(args.labels)
+    names = list(corpus)
+    print(f"📄 简历 {len(names)} 份，查询 {len(queries)} 条，provider={client.provider}")
+    if not names or not queries:
+        return
+
+    query_vectors = np.asarray(client.embed([q["query"] for q in queries]), dtype=np.float32)
+    query_vectors /= np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-6)
+
+    print(f"\n{'策略':<10}" + "".join(f"{f'recall@{k}':>12}" for k in KS) + f"{'MRR':>8}")
+    for strategy in [s for s in args.strategies.split(",") if s]:
+        result = evaluate(doc_matrix(client, corpus, strategy), names, query_vectors, queries)
+        print(f"{strategy:<10}" + "".join(f"{result[f'recall@{k}']:>12}" for k in KS) + f"{result['MRR']:>8}")
+
+
+if __name__ == "__main__":
+    main()
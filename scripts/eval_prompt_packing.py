@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+对比「前 3000 字符截断」与「prompt 打包」两种字段抽取方式：
+    - 每份简历的 prompt token 数（打包前 / 打包后）
+    - 在人工标注样本上的字段准确率
+标注文件为 JSONL，每行一个样本，text 与 file 二选一：
+    {"file": "data/resumes/张三.pdf", "fields": {"姓名": "张三", "应聘职位": "产品经理", "手机号": "13812345678", "邮箱": "a@b.com"}}
+    {"text": "……简历正文……", "fields": {...}}
+用法示例：
+    python scripts/eval_prompt_packing.py data/labelled_fields.jsonl
+    python scripts/eval_prompt_packing.py data/labelled_fields.jsonl --provider tongyi --tokens-only
+"""
+
+import argparse
+import importlib
+import json
+import re
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts.prompt_packer import pack_for_fields
+
+FIELDS = ["姓名", "应聘职位", "手机号", "邮箱"]
+MODES = ["head", "packed"]
+EXTRACTORS = {"openai": "scripts.extract_text_openai", "tongyi": "scripts.extract_text_tongyi"}
+
+
+def normalize(field: str, value) -> str:
+    if value is None:
+        return ""
+    value = str(value).strip()
+    if value.lower() == "null":
+        return ""
+    if field == "手机号":
+        return re.sub(r"\D", "", value)
+    if field == "邮箱":
+        return value.lower()
+    return re.sub(r"\s+", "", value)
+
+
+def load_samples(path: str, extractor):
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            text = item.get("text")
+            if not text and item.get("file"):
+                text = extractor.extract_text(item["file"]) or ""
+            samples.append({"id": item.get("file") or f"sample-{len(samples) + 1}",
+                            "text": extractor.enhance_text(text), "fields": item.get("fields", {})})
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="prompt 打包效果评估")
+    parser.add_argument("labels", help="标注样本 JSONL")
+    parser.add_argument("--provider", choices=sorted(EXTRACTORS), default="openai")
+    parser.add_argument("--tokens-only", action="store_true", help="只统计 token，不调用 LLM")
+    args = parser.parse_args()
+
+    extractor = importlib.import_module(EXTRACTORS[args.provider])
+    samples = load_samples(args.labels, extractor)
+    if not samples:
+        print("⚠️ 没有样本")
+        return
+
+    totals = {mode: 0 for mode in MODES}
+    hits = {mode: {f: 0 for f in FIELDS} for mode in MODES}
+    labelled = {f: 0 for f in FIELDS}
+
+    print("📊 每份简历 prompt token 数（字段抽取）")
+    for sample in samples:
+        counts = {}
+        for mode in MODES:
+            packed = pack_for_fields(sample["text"], extractor.llm_model, mode)
+            counts[mode] = packed.tokens_after
+            totals[mode] += packed.tokens_after
+        print(f"  - {sample['id']}: 原文 {packed.tokens_before} | head {counts['head']} | packed {counts['packed']}")
+
+        if args.tokens_only:
+            continue
+        for f in FIELDS:
+            if f in sample["fields"]:
+                labelled[f] += 1
+        for mode in MODES:
+            result = extractor.extract_fields(sample["text"], packing=mode)
+            for f in FIELDS:
+                if f in sample["fields"] and normalize(f, result.get(f)) == normalize(f, sample["fields"][f]):
+                    hits[mode][f] += 1
+
+    n = len(samples)
+    print(f"\n🧮 平均 token：head {totals['head'] / n:.0f} | packed {totals['packed'] / n:.0f}")
+    if args.tokens_only:
+        return
+    print("\n🎯 字段准确率")
+    for f in FIELDS:
+        if not labelled[f]:
+            continue
+        row = " | ".join(f"{mode} {hits[mode][f] / labelled[f]:.1%}" for mode in MODES)
+        print(f"  - {f}（{labelled[f]} 条）: {row}")
+
+
+if __name__ == "__main__":
+    main()
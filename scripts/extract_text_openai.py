@@ -12,9 +12,10 @@ from tqdm import tqdm
 from pdf2image import convert_from_path
 import pytesseract
 from dotenv import load_dotenv
-from openai import OpenAI
 from pathlib import Path
 from dotenv import dotenv_values
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
 
 # ✅ 初始化
 load_dotenv()
@@ -33,14 +34,22 @@ BLACKLIST = [
     "个人简历", "简历", "求职", "BOSS直聘", "猎聘", "客户名称", "项目名称",
     "original", "standard", "的", "doc", "pdf", "docx", "附件"
 ]
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "4"))
 
-openai_client = OpenAI(api_key=api_key)
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.pdf_splitter import split_pdf_resumes
+from scripts.prompt_packer import pack_for_fields, pack_for_sections
+from scripts.llm_cache import is_json
+from scripts.provider_client import get_client
+
+client = get_client("openai", api_key=api_key, chat_model=llm_model)
 
 # ========= OCR 兜底 =========
-def extract_via_ocr(file_path):
+def extract_via_ocr(file_path, first_page=None, last_page=None):
     try:
         print(f"📸 OCR 识别中：{os.path.basename(file_path)}")
-        images = convert_from_path(file_path, dpi=300)
+        images = convert_from_path(file_path, dpi=300, first_page=first_page, last_page=last_page)
         results = [pytesseract.image_to_string(img, lang='chi_sim', config='--psm 6 --oem 3') for img in images]
         text_result = "\n".join([t.strip() for t in results if t.strip()])
         return text_result if len(text_result.strip()) >= 30 else None
@@ -128,7 +137,9 @@ def enhance_text(text):
     return text.strip()
 
 # ========= 字段提取 =========
-def extract_fields(text):
+def extract_fields(text, packing=None):
+    packed = pack_for_fields(text, llm_model, packing)
+    print(f"🧮 字段抽取 prompt tokens: {packed.tokens_before} → {packed.tokens_after}")
     prompt = f"""
 你是一位信息抽取专家，请从以下中文简历文本中提取出候选人的基础信息，严格按照如下字段输出 JSON（无则写 null）：
 
@@ -136,6 +147,10 @@ def extract_fields(text):
 - 应聘职位：如"销售总监""运营经理"等角色职称。
 - 手机号：中国大陆手机号，11位纯数字。
 - 邮箱：包含 @ 字符，常见邮箱格式。
+- 工作年限：全职工作总年数，数字（如 5 或 3.5），按各段工作经历起止时间计算。
+- 最高学历：只能是 初中 / 高中 / 中专 / 大专 / 本科 / 硕士 / 博士 之一。
+- 所在城市：现居住城市（无则取期望工作城市），只写城市名，如"深圳"。
+- 最近公司：最近一段工作经历的单位全称。
 
 请你只输出标准 JSON 格式，不添加注释或解释。
 
@@ -144,20 +159,25 @@ def extract_fields(text):
   "姓名": "张三",
   "应聘职位": "产品经理",
   "手机号": "13812345678",
-  "邮箱": "zhangsan@example.com"
+  "邮箱": "zhangsan@example.com",
+  "工作年限": 6,
+  "最高学历": "本科",
+  "所在城市": "深圳",
+  "最近公司": "深圳市某某科技有限公司"
 }}
 
 以下是简历正文：
-{text[:3000]}
+{packed.text}
 """
     try:
-        response = openai_client.chat.completions.create(
+        content = client.cached_chat(
+            "extract_fields",
+            [{"role": "user", "content": prompt}],
             model=llm_model,
-            messages=[{"role": "user", "content": prompt}],
+            validate=is_json,
             temperature=0,
-            max_tokens=300
-        )
-        content = response.choices[0].message.content.strip()
+            max_tokens=400
+        ).strip()
         content = re.sub(r"^```(json)?|```$", "", content)
         return json.loads(content)
     except Exception as e:
@@ -165,7 +185,9 @@ def extract_fields(text):
         return {}
 
 # ========= 模块结构分类提取 =========
-def classify_resume_sections(text):
+def classify_resume_sections(text, packing=None):
+    packed = pack_for_sections(text, llm_model, packing)
+    print(f"🧮 模块分类 prompt tokens: {packed.tokens_before} → {packed.tokens_after}")
     prompt = f"""
 你是一位结构分析助手，请对以下简历内容进行分类整理，将其拆分为如下模块：
 
@@ -195,16 +217,17 @@ def classify_resume_sections(text):
 ]
 
 以下是简历内容：
-{text[:3000]}
+{packed.text}
 """
     try:
-        response = openai_client.chat.completions.create(
+        content = client.cached_chat(
+            "classify_resume_sections",
+            [{"role": "user", "content": prompt}],
             model=llm_model,
-            messages=[{"role": "user", "content": prompt}],
+            validate=is_json,
             temperature=0,
             max_tokens=1000
-        )
-        content = response.choices[0].message.content.strip()
+        ).strip()
         content = re.sub(r"^```(json)?|```$", "", content)
         return json.loads(content)
     except Exception as e:
@@ -233,52 +256,88 @@ def extract_name_fallback(filename, text):
             return name
     return "未知姓名"
 
+# ========= 合并 PDF 拆分 =========
+def build_jobs(filename, path):
+    """每份简历一个提取任务；合并导出的 PDF 按候选人拆成多个任务"""
+    if filename.lower().endswith(".pdf"):
+        try:
+            segments = split_pdf_resumes(path)
+        except Exception as e:
+            print(f"⚠️ PDF 拆分失败，按单份处理：{filename} | {e}")
+            segments = []
+        if len(segments) > 1:
+            print(f"✂️ {filename} 检测到 {len(segments)} 份简历")
+            return [(filename, path, seg) for seg in segments]
+    return [(filename, path, None)]
+
+def load_job_text(path, segment):
+    if segment is None:
+        return extract_text(path)
+    if len(segment.text.strip()) < 300:
+        return extract_via_ocr(path, first_page=segment.start + 1, last_page=segment.end)
+    return segment.text
+
+# ========= 单份简历处理 =========
+def process_job(job):
+    filename, path, segment = job
+    text = load_job_text(path, segment)
+    if not text or len(text.strip()) < 10:
+        text = "[文件读取失败或内容为空]"
+
+    text = enhance_text(text)
+    fields = extract_fields(text)
+
+    # fallback: 姓名不能为空
+    if not fields.get("姓名") or fields["姓名"] == "null":
+        fields["姓名"] = extract_name_fallback(filename, text) if segment is None else extract_name_fallback("", text)
+
+    if not fields.get("应聘职位"):
+        fields["应聘职位"] = "未知职位"
+
+    if segment is None:
+        name = re.findall(r'[\u4e00-\u9fa5]{2,4}', filename)[0] if re.findall(r'[\u4e00-\u9fa5]{2,4}', filename) else "未知姓名"
+    else:
+        # 合并文件的文件名不代表候选人，使用抽取到的姓名
+        name = fields["姓名"]
+    position = fields.get("应聘职位", "未知职位")
+    name_clean = re.sub(r'[\\/:*?"<>|]', '_', name)
+    position_clean = re.sub(r'[\\/:*?"<>|]', '_', position)
+    output_name = f"{name_clean}_{position_clean}_{str(uuid.uuid4())[:8]}.txt"
+    output_path = os.path.join(OUTPUT_DIR, output_name)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("=== 字段提取结果 ===\n")
+        f.write(json.dumps(fields, ensure_ascii=False, indent=2))
+        f.write("\n\n=== 原始简历文本 ===\n")
+        f.write(text)
+
+    return output_name
+
 # ========= 主流程 =========
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     files = [f for f in os.listdir(INPUT_DIR) if f.lower().endswith(('.pdf', '.doc', '.docx'))]
+    jobs = []
+    for filename in files:
+        jobs.extend(build_jobs(filename, os.path.join(INPUT_DIR, filename)))
     success, fail = 0, 0
 
-    for filename in tqdm(files, desc="📄 正在提取简历"):
-        try:
-            path = os.path.join(INPUT_DIR, filename)
-            text = extract_text(path)
-            if not text or len(text.strip()) < 10:
-                text = "[文件读取失败或内容为空]"
-
-            text = enhance_text(text)
-            fields = extract_fields(text)
-
-            # fallback: 姓名不能为空
-            if not fields.get("姓名") or fields["姓名"] == "null":
-                fields["姓名"] = extract_name_fallback(filename, text)
-
-            if not fields.get("应聘职位"):
-                fields["应聘职位"] = "未知职位"
-
-            name = re.findall(r'[\u4e00-\u9fa5]{2,4}', filename)[0] if re.findall(r'[\u4e00-\u9fa5]{2,4}', filename) else "未知姓名"
-            position = fields.get("应聘职位", "未知职位")
-            name_clean = re.sub(r'[\\/:*?"<>|]', '_', name)
-            position_clean = re.sub(r'[\\/:*?"<>|]', '_', position)
-            output_name = f"{name_clean}_{position_clean}_{str(uuid.uuid4())[:8]}.txt"
-            output_path = os.path.join(OUTPUT_DIR, output_name)
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write("=== 字段提取结果 ===\n")
-                f.write(json.dumps(fields, ensure_ascii=False, indent=2))
-                f.write("\n\n=== 原始简历文本 ===\n")
-                f.write(text)
-
-            print(f"✅ 输出完成：{output_name}")
-            success += 1
-
-        except Exception as e:
-            print(f"❌ 处理失败：{filename} | {e}")
-            with open("failures.log", "a") as log:
-                log.write(f"处理失败: {filename} | {e}\n")
-            fail += 1
-
-    print(f"\n🎯 总数：{len(files)} | 成功：{success} | 失败：{fail}")
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor:
+        futures = {executor.submit(process_job, job): job for job in jobs}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="📄 正在提取简历"):
+            filename, _, segment = futures[future]
+            label = filename if segment is None else f"{filename} [{segment.label}]"
+            try:
+                output_name = future.result()
+                print(f"✅ 输出完成：{output_name}")
+                success += 1
+            except Exception as e:
+                print(f"❌ 处理失败：{label} | {e}")
+                with open("failures.log", "a") as log:
+                    log.write(f"处理失败: {label} | {e}\n")
+                fail += 1
+
+    print(f"\n🎯 文件数：{len(files)} | 简历数：{len(jobs)} | 成功：{success} | 失败：{fail}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+关键词 / 混合检索：纯向量检索经常漏掉精确的技能词（Zemax、CODE V、LightTools），BM25 能命中但不懂语义，混合检索兼顾两者。
+    - SEARCH_MODE=vector（默认，nearVector）| keyword（bm25）| hybrid（BM25 与向量得分按 alpha 融合）
+    - HYBRID_ALPHA：1 为纯向量，0 为纯 BM25（默认 0.5）；融合方式 relativeScoreFusion（两路得分各自归一化后加权）
+    - content 属性的分词方式 CONTENT_TOKENIZATION：gse（中文分词，需 Weaviate 设置 ENABLE_TOKENIZER_GSE=true，
+      compose.yaml 已开启）| trigram | word（Weaviate 默认，中文整句成为一个词，BM25 基本无效）
+    - 分词方式建类后不能修改：已有集合用 --retokenize 复制到新 class（沿用向量，不重新向量化），校验数量后切换集合注册表，
+      再补齐复制期间写入旧集合的对象与沟通记录
+用法示例：
+    clause = search_clause("hybrid", "Zemax 光学设计", vector, alpha=0.5)
+    graphql = f"Candidates({clause}, limit: 5) {{ filename _additional {{ id score }} }}"
+    python scripts/hybrid_search.py --show
+    python scripts/hybrid_search.py --retokenize gse
+    python scripts/hybrid_search.py --retokenize gse --chunks --no-switch
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.collection_registry import resolve, switch
+from scripts.weaviate_schema import (catch_up, clone_definition, copy_collection, count_objects, create_class,
+                                     get_class)
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_CHUNK_COLLECTION = os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks")
+SEARCH_MODE = os.getenv("SEARCH_MODE", "vector")  # vector | keyword | hybrid
+HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", "0.5"))
+CONTENT_TOKENIZATION = os.getenv("CONTENT_TOKENIZATION", "gse")  # gse | trigram | word
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+KEYWORD_PROPERTIES = ["content"]
+
+logger = logging.getLogger(__name__)
+
+
+def content_property(tokenization: str = CONTENT_TOKENIZATION) -> Dict[str, Any]:
+    """建类时 content 属性的定义（可全文检索）"""
+    return {"name": "content", "dataType": ["text"], "tokenization": tokenization, "indexSearchable": True}
+
+
+def content_tokenization(definition: Optional[Dict[str, Any]]) -> Optional[str]:
+    for prop in (definition or {}).get("properties") or []:
+        if prop["name"] == "content":
+            return prop.get("tokenization", "word")
+    return None
+
+
+def search_clause(mode: str, query: str, vector: Optional[List[float]] = None, certainty: Optional[float] = None,
+                  alpha: float = HYBRID_ALPHA, properties: Sequence[str] = KEYWORD_PROPERTIES) -> str:
+    """GraphQL Get 的检索参数；keyword 模式不需要向量"""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"不支持的检索模式: {mode}（可选: {', '.join(SEARCH_MODES)}）")
+    if not 0 <= alpha <= 1:
+        raise ValueError(f"alpha 须在 0 到 1 之间: {alpha}")
+    fields = json.dumps(list(properties))
+    if mode == "keyword":
+        return f"bm25: {{ query: {json.dumps(query, ensure_ascii=False)}, properties: {fields} }}"
+    if mode == "hybrid":
+        return (f"hybrid: {{ query: {json.dumps(query, ensure_ascii=False)}, vector: {json.dumps(vector)}, "
+                f"alpha: {alpha}, properties: {fields}, fusionType: relativeScoreFusion }}")
+    near = f"vector: {json.dumps(vector)}"
+    if certainty is not None:
+        near += f", certainty: {certainty}"
+    return f"nearVector: {{ {near} }}"
+
+
+def additional_fields(mode: str) -> str:
+    """向量检索返回 distance，BM25 / 混合检索返回 score"""
+    return "id distance" if mode == "vector" else "id score"
+
+
+def hit_score(mode: str, additional: Dict[str, Any]) -> float:
+    """统一为越大越相关：向量为 1 - distance，BM25 / 混合为 score（GraphQL 中是字符串）"""
+    if mode == "vector":
+        return 1 - float(additional.get("distance", 1.0))
+    return float(additional.get("score") or 0.0)
+
+
+# ========= 分词迁移 =========
+def rewrite_references(obj: Dict[str, Any], references: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """把对象中指向 references 的键（旧 class）的引用改为指向对应的新 class"""
+    if references:
+        for value in (obj.get("properties") or {}).values():
+            if isinstance(value, list) and value and isinstance(value[0], dict) and "beacon" in value[0]:
+                for ref in value:
+                    parent_class, parent_id = ref["beacon"].rsplit("/", 2)[-2:]
+                    ref["beacon"] = f"weaviate://localhost/{references.get(parent_class, parent_class)}/{parent_id}"
+    return obj
+
+
+def retokenize(weaviate_url: str, logical: str, tokenization: str, target: Optional[str] = None,
+               references: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """把逻辑集合当前生效的 class 复制到 content 分词为 tokenization 的新 class（对象、向量、UUID 不变）"""
+    current = resolve(logical)
+    source = current.class_name
+    definition = get_class(weaviate_url, source)
+    if definition is None:
+        raise SystemExit(f"❌ 集合不存在: {source}")
+    before = content_tokenization(definition)
+    if before == tokenization:
+        print(f"✅ {source} 的 content 已是 {tokenization} 分词，无需迁移")
+        return {"collection": logical, "source": source, "target": source, "ok": True, "unchanged": True}
+
+    target = target or f"{logical}{tokenization.capitalize()}"
+    if get_class(weaviate_url, target) is not None:
+        raise SystemExit(f"❌ 目标集合已存在: {target}（先删除或换一个 --target）")
+    new_definition = clone_definition(definition, target)
+    for prop in new_definition.get("properties") or []:
+        if prop["name"] == "content":
+            prop.update(content_property(tokenization))
+        elif references and prop["dataType"][0] in references:
+            prop["dataType"] = [references[prop["dataType"][0]]]  # 段落集合的 candidate 引用指向迁移后的候选人集合
+    if not create_class(weaviate_url, new_definition):
+        raise SystemExit(1)
+
+    total = count_objects(weaviate_url, source)
+    print(f"📚 {source} → {target}: {total} 条，content 分词 {before} → {tokenization}")
+    stats = copy_collection(weaviate_url, source, target, transform=lambda obj: rewrite_references(obj, references))
+    copied = count_objects(weaviate_url, target)
+    ok = copied == total and stats["failed"] == 0
+    print(f"{'✅' if ok else '❌'} {logical}: 源 {total} 条，目标 {copied} 条，失败 {stats['failed']} 条")
+    return {"collection": logical, "source": source, "target": target, "ok": ok, "provider": current.provider,
+            "embedding_model": current.embedding_model, "dimensions": current.dimensions,
+            "references": references, "source_count": total, "target_count": copied}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词 / 混合检索：查看与迁移 content 分词方式")
+    parser.add_argument("--show", action="store_true", help="查看当前集合 content 的分词方式")
+    parser.add_argument("--retokenize", choices=("gse", "trigram", "word"), help="复制到新分词方式的集合")
+    parser.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    parser.add_argument("--target", help="目标 class 名（默认 <Collection><Tokenization>，如 CandidatesGse）")
+    parser.add_argument("--chunks", action="store_true", help="段落集合（INDEX_MODE=chunk）一并迁移")
+    parser.add_argument("--chunk-collection", default=WEAVIATE_CHUNK_COLLECTION)
+    parser.add_argument("--no-switch", action="store_true", help="只复制和校验，不切换注册表指针")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if not args.retokenize:
+        for logical in (args.collection, args.chunk_collection):
+            class_name = resolve(logical).class_name
+            tokenization = content_tokenization(get_class(WEAVIATE_URL, class_name))
+            print(f"🔤 {logical} → {class_name}: content 分词 {tokenization or '（集合不存在）'}")
+        return
+
+    results = [retokenize(WEAVIATE_URL, args.collection, args.retokenize, args.target)]
+    if args.chunks:
+        parent = results[0]
+        references = {parent["source"]: parent["target"]} if parent["target"] != parent["source"] else None
+        results.append(retokenize(WEAVIATE_URL, args.chunk_collection, args.retokenize, references=references))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if not all(r["ok"] for r in results):
+        print("❌ 校验未通过，未切换")
+        sys.exit(1)
+    if args.no_switch:
+        print("👉 校验通过；确认后可用 collection_registry.py 切换，或去掉 --no-switch 重新迁移")
+        return
+    for result in results:
+        if result.get("unchanged"):
+            continue
+        switch(result["collection"], result["target"], result["provider"], result["embedding_model"],
+               result["dimensions"])
+        # 复制与切换之间写入旧集合的对象和沟通记录
+        references = result["references"]
+        catch_up(WEAVIATE_URL, result["source"], result["target"],
+                 transform=lambda obj, references=references: rewrite_references(obj, references))
+        print(f"🔀 {result['collection']}: {result['source']} → {result['target']}"
+              f"（回滚：python scripts/collection_registry.py --rollback {result['collection']}）")
+
+
+if __name__ == "__main__":
+    main()
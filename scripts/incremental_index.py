@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+增量索引：候选人 UUID 只由文件名决定（稳定 ID），写入一律 upsert，只重新向量化内容或向量标识有变化的简历。
+    - 对比本地索引清单中的内容哈希与向量标识，把每份简历归为 新增 / 更新 / 未变
+    - 更新与替换时先批量取回旧对象的 notes（沟通记录），写入新对象时带上，不会丢失
+    - 同一文件名下其他 UUID 的旧对象（如旧版按“文件名 + 内容哈希”生成的 ID）在新对象写入成功后批量删除
+    - INDEX_PRUNE_MISSING=1 时，清单中源目录已不存在的文件对应的对象也一并删除（默认关闭：v1 脚本会把已索引文件移走）
+    - 段落级索引（INDEX_MODE=chunk）中，被删除或段落数变少的候选人多余的段落对象同样删除
+    - 每次运行结束输出 新增 / 更新 / 未变 / 删除 的数量
+用法示例：
+    changes = IncrementalIndex(manifest, signature, chunk_manifest=chunk_manifest)
+    if not changes.unchanged_source(filename, source):           # 源摘要相同：无需选段即判定未变
+        status = changes.classify(filename, final_text, attributes)  # "added" | "updated" | "unchanged"
+    notes = changes.notes_for(filenames)                     # 写入前批量取回旧对象的沟通记录
+    changes.finalize(files)                                  # 写入完成后删除被替换的旧对象
+    print(changes.report())
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+
+from scripts.chunk_index import WEAVIATE_CHUNK_CLASS
+from scripts.index_manifest import IndexManifest, content_hash
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+INDEX_PRUNE_MISSING = os.getenv("INDEX_PRUNE_MISSING", "0") == "1"
+NAMESPACE_UUID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+FETCH_PAGE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_uuid(filename: str) -> str:
+    """稳定的候选人 ID：只由文件名决定，与内容无关"""
+    return str(uuid.uuid5(NAMESPACE_UUID, filename))
+
+
+def id_filter(ids: List[str]) -> Dict:
+    return {"path": ["id"], "operator": "ContainsAny", "valueTextArray": ids}
+
+
+def fetch_notes(weaviate_url: str, weaviate_class: str, ids: List[str]) -> Dict[str, List[str]]:
+    """按 id 批量取回 notes；GraphQL 不可用时逐个 GET 兜底。不存在的对象不出现在结果中"""
+    notes: Dict[str, List[str]] = {}
+    for i in range(0, len(ids), FETCH_PAGE):
+        page = ids[i:i + FETCH_PAGE]
+        query = {"query": f"""
+        {{
+          Get {{
+            {weaviate_class}(where: {{ path: ["id"], operator: ContainsAny, valueText: {json.dumps(page)} }},
+                             limit: {len(page)}) {{
+              notes
+              _additional {{ id }}
+            }}
+          }}
+        }}
+        """}
+        try:
+            res = requests.post(f"{weaviate_url}/v1/graphql", json=query, timeout=30)
+            body = res.json() if res.status_code == 200 else {}
+            if body.get("errors") or "data" not in body:
+                raise ValueError(body.get("errors") or f"HTTP {res.status_code}")
+            for obj in body["data"]["Get"][weaviate_class] or []:
+                notes[obj["_additional"]["id"]] = obj.get("notes") or []
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("⚠️ 批量读取 notes 失败，改为逐个读取: %s", e)
+            for obj_id in page:
+                res = requests.get(f"{weaviate_url}/v1/objects/{weaviate_class}/{obj_id}", timeout=30)
+                if res.status_code == 200:
+                    notes[obj_id] = (res.json().get("properties") or {}).get("notes") or []
+    return notes
+
+
+def delete_objects(weaviate_url: str, weaviate_class: str, ids: List[str]) -> List[str]:
+    """
+    DELETE /v1/batch/objects 按 id 批量删除，返回已从 Weaviate 删除的 id（本就不存在的也算在内）。
+    请求失败、或 Weaviate 报告删除失败的 id 不在结果中，调用方应保留其清单条目，下次运行再删
+    """
+    deleted: List[str] = []
+    for i in range(0, len(ids), FETCH_PAGE):
+        page = ids[i:i + FETCH_PAGE]
+        payload = {"match": {"class": weaviate_class, "where": id_filter(page)}, "output": "verbose"}
+        try:
+            res = requests.delete(f"{weaviate_url}/v1/batch/objects", json=payload, timeout=60)
+        except requests.RequestException as e:
+            logger.error("❌ 批量删除失败 %s: %s", weaviate_class, e)
+            continue
+        if res.status_code != 200:
+            logger.error("❌ 批量删除失败 %s: %s %s", weaviate_class, res.status_code, res.text[:200])
+            continue
+        results = res.json().get("results") or {}
+        failed = {obj.get("id") for obj in results.get("objects") or [] if obj.get("status") == "FAILED"}
+        if results.get("failed") and not failed:
+            # 没有逐个对象的结果，无法区分哪些删除失败：整页保留
+            logger.warning("⚠️ %s 有 %s 个对象删除失败", weaviate_class, results["failed"])
+            continue
+        if failed:
+            logger.warning("⚠️ %s 有 %d 个对象删除失败", weaviate_class, len(failed))
+        deleted.extend(obj_id for obj_id in page if obj_id not in failed)
+    return deleted
+
+
+class IncrementalIndex:
+    def __init__(self, manifest: IndexManifest, embedding_signature: str, weaviate_url: str = WEAVIATE_URL,
+                 weaviate_class: str = WEAVIATE_CLASS, chunk_manifest: Optional[IndexManifest] = None,
+                 chunk_class: str = WEAVIATE_CHUNK_CLASS, prune_missing: bool = INDEX_PRUNE_MISSING):
+        self.manifest = manifest
+        self.signature = embedding_signature
+        self.weaviate_url = weaviate_url.rstrip("/")
+        self.weaviate_class = weaviate_class
+        self.chunk_manifest = chunk_manifest
+        self.chunk_class = chunk_class
+        self.prune_missing = prune_missing
+        self.counts = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        self._lock = threading.Lock()
+        self._written: Set[str] = set()           # 本次写入成功的文件名
+        self._chunks_written: Dict[str, Set[str]] = defaultdict(set)  # 本次重写段落的文件名 -> 段落 ID
+
+        # 文件名 -> 清单中的 UUID（含旧 ID 方案留下的对象）
+        self._by_filename: Dict[str, Set[str]] = defaultdict(set)
+        for obj_id, entry in manifest.entries().items():
+            self._by_filename[entry["filename"]].add(obj_id)
+
+    # ========= 分类 =========
+    def unchanged_source(self, filename: str, source_digest: str) -> bool:
+        """清单中的源摘要与向量标识都一致时计为未变并返回 True；否则不计数，由调用方选段后再 classify()"""
+        entry = self.manifest.get(candidate_uuid(filename))
+        if (entry is None or entry.get("source_digest") != source_digest
+                or (entry["embedding_model"] and entry["embedding_model"] != self.signature)):
+            return False
+        with self._lock:
+            self.counts["unchanged"] += 1
+        return True
+
+    def classify(self, filename: str, content: str, attributes: Optional[Dict] = None) -> str:
+        entry = self.manifest.get(candidate_uuid(filename))
+        if entry is None:
+            status = "added"
+        elif entry["content_hash"] != content_hash(content, attributes):
+            status = "updated"
+        elif entry["embedding_model"] and entry["embedding_model"] != self.signature:
+            status = "updated"  # 换了模型或向量策略，需要重新向量化
+        else:
+            status = "unchanged"
+        with self._lock:
+            self.counts[status] += 1
+        return status
+
+    def superseded(self, filename: str) -> List[str]:
+        """同一文件名下、不是稳定 ID 的旧对象"""
+        stable = candidate_uuid(filename)
+        return sorted(u for u in self._by_filename.get(filename, ()) if u != stable)
+
+    def notes_for(self, filenames: Iterable[str]) -> Dict[str, List[str]]:
+        """返回每个文件应写入的 notes：合并稳定 ID 及同名旧对象上已有的沟通记录（去重、保持顺序）"""
+        filenames = list(filenames)
+        lookup = set()
+        for filename in filenames:
+            if candidate_uuid(filename) in self.manifest:
+                lookup.add(candidate_uuid(filename))
+            lookup.update(self.superseded(filename))
+        existing = fetch_notes(self.weaviate_url, self.weaviate_class, sorted(lookup)) if lookup else {}
+        result = {}
+        for filename in filenames:
+            merged = list(existing.get(candidate_uuid(filename), []))
+            for old_id in self.superseded(filename):
+                merged.extend(n for n in existing.get(old_id, []) if n not in merged)
+            result[filename] = merged
+        return result
+
+    # ========= 写入回调 =========
+    def mark_written(self, filename: str):
+        with self._lock:
+            self._written.add(filename)
+
+    def expect_chunks(self, filename: str, chunk_ids: Iterable[str]):
+        """登记本次为该文件重写的段落 ID，清单中该文件的其他段落在收尾时删除"""
+        with self._lock:
+            self._chunks_written[filename].update(chunk_ids)
+
+    # ========= 收尾：删除被替换 / 已消失的对象 =========
+    def finalize(self, source_files: Iterable[str]) -> Dict[str, int]:
+        doomed: List[str] = []
+        gone: List[str] = []
+        for filename in sorted(self._written):
+            doomed.extend(self.superseded(filename))
+        if self.prune_missing:
+            present = set(source_files)
+            gone = [f for f in self._by_filename if f not in present]
+            for filename in gone:
+                doomed.extend(self._by_filename[filename])
+
+        if doomed:
+            deleted = delete_objects(self.weaviate_url, self.weaviate_class, doomed)
+            for obj_id in deleted:  # 删除失败的保留在清单中，下次运行重试
+                self.manifest.forget(obj_id)
+            with self._lock:
+                self.counts["deleted"] += len(deleted)
+            logger.info("🗑️ 已删除被替换或已移除的对象: %d 个", len(deleted))
+
+        if self.chunk_manifest is not None:
+            self._prune_chunks(gone)
+        return dict(self.counts)
+
+    def _prune_chunks(self, gone: List[str]):
+        """删除：已删除候选人的全部段落、本次重写后多出来的旧段落"""
+        by_filename: Dict[str, Set[str]] = defaultdict(set)
+        for chunk_id, entry in self.chunk_manifest.entries().items():
+            by_filename[entry["filename"]].add(chunk_id)
+        stale = []
+        for filename in gone:
+            stale.extend(by_filename.get(filename, ()))
+        for filename, written in self._chunks_written.items():
+            stale.extend(by_filename.get(filename, set()) - written)
+        if stale:
+            deleted = delete_objects(self.weaviate_url, self.chunk_class, stale)
+            for chunk_id in deleted:
+                self.chunk_manifest.forget(chunk_id)
+            logger.info("🗑️ 已删除过期段落: %d 个", len(deleted))
+
+    def report(self) -> str:
+        c = self.counts
+        return f"🧾 新增 {c['added']} | 更新 {c['updated']} | 未变 {c['unchanged']} | 删除 {c['deleted']}"
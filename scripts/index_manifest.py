@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+本地索引清单（SQLite）：记录已写入 Weaviate 的对象 UUID、内容哈希、源摘要和 embedding 模型。
+索引脚本启动时一次性载入内存，查重在本地完成，不再对每个文件发 GET /v1/objects/{id}。
+    - 首次使用某个集合时，通过游标分页（GET /v1/objects?class=...&after=...）扫描全量对象建立清单
+    - 写入成功后由 BatchWriter 回调 record()
+    - source_digest 为选段前的源摘要（抽取文本 + 属性 + 选段参数），相同的文件无需重新选段即可判定未变
+    - reconcile() 按需与 Weaviate 对账：补录缺失、删除已不存在的条目（INDEX_MANIFEST_RECONCILE=1 时索引前自动执行）
+用法示例：
+    python scripts/index_manifest.py               # 查看清单统计
+    python scripts/index_manifest.py --reconcile   # 与 Weaviate 对账
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+
+INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", str(root_dir / "data" / "cache" / "index_manifest.sqlite3"))
+INDEX_MANIFEST_RECONCILE = os.getenv("INDEX_MANIFEST_RECONCILE", "0") == "1"
+MANIFEST_SCAN_PAGE = int(os.getenv("MANIFEST_SCAN_PAGE", "500"))
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+
+logger = logging.getLogger(__name__)
+
+
+# 不参与内容哈希的属性：沟通记录、入库时间由写入时决定，filename / content 单独处理
+UNHASHED_PROPERTIES = ("filename", "content", "notes", "ingested_at")
+# 随时间变化的派生属性（“至今”的工作年限按索引时的月份计）：不参与哈希，否则在职候选人每月都会被重新向量化。
+# 其依据的起止时间在原文中，已由 content / source_hash 覆盖；库中的值由 index_resumes.py refresh-years 定期刷新
+TIME_RELATIVE_PROPERTIES = ("years_experience",)
+
+
+def content_hash(content: str, attributes: Optional[Dict] = None) -> str:
+    """内容哈希；带上结构化属性时属性变化（或旧对象尚无属性）也会被判定为需要更新"""
+    digest = hashlib.sha256((content or "").encode("utf-8"))
+    attributes = {k: v for k, v in (attributes or {}).items() if k not in TIME_RELATIVE_PROPERTIES}
+    if attributes:
+        # Weaviate 返回的 number 属性整数值不带小数点（5.0 → 5），统一后再序列化
+        canonical = {k: int(v) if isinstance(v, float) and v.is_integer() else v for k, v in attributes.items()}
+        digest.update(json.dumps(canonical, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def object_attributes(properties: Dict) -> Dict:
+    """Weaviate 对象中参与内容哈希的结构化属性（与索引脚本写入时的 attributes 一致）"""
+    return {k: v for k, v in properties.items() if k not in UNHASHED_PROPERTIES and v is not None}
+
+
+def scan_collection(weaviate_url: str, weaviate_class: str, page_size: int = MANIFEST_SCAN_PAGE,
+                    include_vector: bool = False) -> Iterator[Dict]:
+    """游标分页遍历集合中的全部对象（默认不取向量）"""
+    after = None
+    while True:
+        params = {"class": weaviate_class, "limit": page_size}
+        if include_vector:
+            params["include"] = "vector"
+        if after:
+            params["after"] = after
+        response = requests.get(f"{weaviate_url}/v1/objects", params=params, timeout=60)
+        response.raise_for_status()
+        objects = response.json().get("objects") or []
+        if not objects:
+            return
+        yield from objects
+        after = objects[-1]["id"]
+
+
+class IndexManifest:
+    def __init__(self, weaviate_url: str = WEAVIATE_URL, weaviate_class: str = WEAVIATE_CLASS,
+                 path: str = INDEX_MANIFEST_PATH):
+        self.weaviate_url = weaviate_url.rstrip("/")
+        self.weaviate_class = weaviate_class
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    # ========= SQLite =========
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifest (
+                collection TEXT,
+                uuid TEXT,
+                filename TEXT,
+                content_hash TEXT,
+                embedding_model TEXT,
+                indexed_at REAL,
+                source_digest TEXT,
+                PRIMARY KEY (collection, uuid)
+            )
+        """)
+        if "source_digest" not in {row[1] for row in conn.execute("PRAGMA table_info(manifest)")}:
+            conn.execute("ALTER TABLE manifest ADD COLUMN source_digest TEXT")  # 旧版清单
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifest_sync (
+                collection TEXT PRIMARY KEY,
+                synced_at REAL,
+                objects INTEGER
+            )
+        """)
+        conn.commit()
+
+    # ========= 载入 / 查询 =========
+    def load(self, seed: bool = True) -> "IndexManifest":
+        """载入内存；该集合从未同步过时先做一次游标扫描建立清单"""
+        conn = self._conn()
+        synced = conn.execute("SELECT synced_at FROM manifest_sync WHERE collection = ?",
+                              (self.weaviate_class,)).fetchone()
+        if seed and (synced is None or INDEX_MANIFEST_RECONCILE):
+            self.reconcile()
+        rows = conn.execute(
+            "SELECT uuid, filename, content_hash, embedding_model, indexed_at, source_digest FROM manifest "
+            "WHERE collection = ?",
+            (self.weaviate_class,),
+        ).fetchall()
+        with self._lock:
+            self._entries = {
+                row[0]: {"filename": row[1], "content_hash": row[2], "embedding_model": row[3], "indexed_at": row[4],
+                         "source_digest": row[5]}
+                for row in rows
+            }
+        logger.info("📒 索引清单已载入: %s 共 %d 条", self.weaviate_class, len(self._entries))
+        return self
+
+    def get(self, resume_uuid: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get(resume_uuid)
+
+    def __contains__(self, resume_uuid: str) -> bool:
+        return self.get(resume_uuid) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def entries(self) -> Dict[str, Dict]:
+        """uuid -> 条目 的快照副本"""
+        with self._lock:
+            return dict(self._entries)
+
+    # ========= 写入 =========
+    def record(self, resume_uuid: str, filename: str = "", content: Optional[str] = None,
+               embedding_model: str = "", digest: Optional[str] = None, source_digest: Optional[str] = None):
+        """写入成功后登记（可在 BatchWriter 的回调线程中调用）"""
+        digest = digest if digest is not None else (content_hash(content) if content is not None else "")
+        entry = {"filename": filename, "content_hash": digest, "embedding_model": embedding_model,
+                 "indexed_at": time.time(), "source_digest": source_digest}
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO manifest "
+            "(collection, uuid, filename, content_hash, embedding_model, indexed_at, source_digest) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.weaviate_class, resume_uuid, filename, digest, embedding_model, entry["indexed_at"], source_digest),
+        )
+        conn.commit()
+        with self._lock:
+            self._entries[resume_uuid] = entry
+
+    def record_source(self, resume_uuid: str, source_digest: str):
+        """为已有条目补记源摘要（旧条目或对账补录的条目没有，首次判定未变时补上）"""
+        conn = self._conn()
+        conn.execute("UPDATE manifest SET source_digest = ? WHERE collection = ? AND uuid = ?",
+                     (source_digest, self.weaviate_class, resume_uuid))
+        conn.commit()
+        with self._lock:
+            if resume_uuid in self._entries:
+                self._entries[resume_uuid] = {**self._entries[resume_uuid], "source_digest": source_digest}
+
+    def forget(self, resume_uuid: str):
+        conn = self._conn()
+        conn.execute("DELETE FROM manifest WHERE collection = ? AND uuid = ?", (self.weaviate_class, resume_uuid))
+        conn.commit()
+        with self._lock:
+            self._entries.pop(resume_uuid, None)
+
+    # ========= 对账 =========
+    def reconcile(self) -> Dict[str, int]:
+        """以 Weaviate 为准：补录清单中缺失的对象，删除 Weaviate 中已不存在的条目；已有条目的模型信息保留"""
+        conn = self._conn()
+        known = {
+            row[0]: row[1]
+            for row in conn.execute("SELECT uuid, content_hash FROM manifest WHERE collection = ?",
+                                    (self.weaviate_class,))
+        }
+        remote = set()
+        added = updated = 0
+        now = time.time()
+        try:
+            for obj in scan_collection(self.weaviate_url, self.weaviate_class):
+                obj_id = obj["id"]
+                props = obj.get("properties") or {}
+                # 与索引脚本写入清单时一致：内容 + 结构化属性，否则对账后的未变对象会被判为“更新”
+                digest = content_hash(props.get("content", ""), object_attributes(props))
+                remote.add(obj_id)
+                if obj_id not in known:
+                    conn.execute(
+                        "INSERT INTO manifest (collection, uuid, filename, content_hash, embedding_model, indexed_at) "
+                        "VALUES (?, ?, ?, ?, '', ?)",
+                        (self.weaviate_class, obj_id, props.get("filename", ""), digest, now),
+                    )
+                    added += 1
+                elif known[obj_id] not in (digest, content_hash(props.get("content", ""))):
+                    # 远端内容与清单不一致：源摘要随之作废，下次索引重新选段比对
+                    conn.execute("UPDATE manifest SET content_hash = ?, filename = ?, source_digest = NULL "
+                                 "WHERE collection = ? AND uuid = ?",
+                                 (digest, props.get("filename", ""), self.weaviate_class, obj_id))
+                    updated += 1
+        except requests.RequestException as e:
+            conn.rollback()
+            logger.error("❌ 扫描 Weaviate 失败，清单保持不变: %s", e)
+            return {"added": 0, "updated": 0, "removed": 0, "remote": 0}
+
+        stale = [u for u in known if u not in remote]
+        conn.executemany("DELETE FROM manifest WHERE collection = ? AND uuid = ?",
+                         [(self.weaviate_class, u) for u in stale])
+        conn.execute("INSERT OR REPLACE INTO manifest_sync (collection, synced_at, objects) VALUES (?, ?, ?)",
+                     (self.weaviate_class, now, len(remote)))
+        conn.commit()
+        summary = {"added": added, "updated": updated, "removed": len(stale), "remote": len(remote)}
+        logger.info("🔄 清单对账完成 %s: 新增 %d，更新 %d，移除 %d，Weaviate 共 %d 条",
+                    self.weaviate_class, added, updated, len(stale), len(remote))
+        return summary
+
+    def summary(self) -> Dict:
+        conn = self._conn()
+        row = conn.execute("SELECT synced_at, objects FROM manifest_sync WHERE collection = ?",
+                           (self.weaviate_class,)).fetchone()
+        models = conn.execute(
+            "SELECT embedding_model, COUNT(*) FROM manifest WHERE collection = ? GROUP BY embedding_model",
+            (self.weaviate_class,),
+        ).fetchall()
+        return {
+            "collection": self.weaviate_class,
+            "entries": sum(count for _, count in models),
+            "by_model": {model or "（未知）": count for model, count in models},
+            "synced_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0])) if row else None,
+            "remote_at_sync": row[1] if row else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地索引清单")
+    parser.add_argument("--collection", default=WEAVIATE_CLASS)
+    parser.add_argument("--reconcile", action="store_true", help="与 Weaviate 对账")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    manifest = IndexManifest(weaviate_class=args.collection)
+    if args.reconcile:
+        manifest.reconcile()
+    for key, value in manifest.summary().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+异步流水线索引：读取/切分、向量化、写入 Weaviate 三个阶段并行，阶段之间用有界队列连接。
+    - 读取并发 INDEX_READ_CONCURRENCY、向量化并发 INDEX_EMBED_CONCURRENCY、写入并发 INDEX_WRITE_CONCURRENCY
+    - 队列有界（INDEX_QUEUE_SIZE）：向量化或写入变慢时上游自动等待（背压）
+    - 每 INDEX_STATS_INTERVAL 秒打印一次吞吐、队列深度与模型服务当前的并发 / 速率（scripts/rate_controller.py）
+    - Ctrl-C 第一次：停止读取新文件，排空队列中已有任务后退出；第二次：立即取消
+各阶段的具体逻辑由索引脚本传入的同步函数实现，流水线在线程池中调用它们。
+用法示例：
+    stats = run_pipeline(files, prepare=prepare_resume, embed=embed_records, write=write_records)
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from scripts.rate_controller import limiter_summary
+
+INDEX_READ_CONCURRENCY = int(os.getenv("INDEX_READ_CONCURRENCY", "4"))
+INDEX_EMBED_CONCURRENCY = int(os.getenv("INDEX_EMBED_CONCURRENCY", "2"))
+INDEX_WRITE_CONCURRENCY = int(os.getenv("INDEX_WRITE_CONCURRENCY", "2"))
+INDEX_QUEUE_SIZE = int(os.getenv("INDEX_QUEUE_SIZE", "256"))
+INDEX_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+INDEX_BATCH_LINGER = float(os.getenv("INDEX_BATCH_LINGER", "0.2"))
+INDEX_STATS_INTERVAL = float(os.getenv("INDEX_STATS_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    started: float = field(default_factory=time.time)
+    read: int = 0
+    skipped: int = 0
+    embedded: int = 0
+    embed_failed: int = 0
+    written: int = 0
+    errors: int = 0
+    interrupted: bool = False
+
+    def line(self, embed_q: int = 0, write_q: int = 0) -> str:
+        elapsed = max(time.time() - self.started, 1e-6)
+        limits = limiter_summary()
+        return (f"📈 读取 {self.read} | 跳过 {self.skipped} | 向量化 {self.embedded} | 提交写入 {self.written} | "
+                f"失败 {self.embed_failed + self.errors} | 队列 {embed_q}/{write_q} | {self.written / elapsed:.1f} 份/s"
+                + (f" | {limits}" if limits else ""))
+
+
+class IndexPipeline:
+    def __init__(self, prepare: Callable[[Any], Optional[Any]],
+                 embed: Callable[[List[Any]], List[Optional[List[float]]]],
+                 write: Callable[[List[Any], List[List[float]]], None],
+                 read_concurrency: int = INDEX_READ_CONCURRENCY, embed_concurrency: int = INDEX_EMBED_CONCURRENCY,
+                 write_concurrency: int = INDEX_WRITE_CONCURRENCY, queue_size: int = INDEX_QUEUE_SIZE,
+                 batch_size: int = INDEX_BATCH_SIZE, linger: float = INDEX_BATCH_LINGER,
+                 stats_interval: float = INDEX_STATS_INTERVAL, report: Callable[[str], None] = print):
+        self.prepare = prepare
+        self.embed = embed
+        self.write = write
+        self.read_concurrency = max(1, read_concurrency)
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.write_concurrency = max(1, write_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.stats_interval = stats_interval
+        self.report = report
+        self.stats = PipelineStats()
+
+    # ========= 各阶段 =========
+    async def _reader(self, sources, embed_q: asyncio.Queue, stop: asyncio.Event):
+        for source in sources:  # 多个 reader 共享同一个迭代器
+            if stop.is_set():
+                return
+            self.stats.read += 1
+            try:
+                record = await asyncio.to_thread(self.prepare, source)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error("❌ 预处理失败: %s | %s", source, e)
+                continue
+            if record is None:
+                self.stats.skipped += 1
+                continue
+            await embed_q.put(record)
+
+    async def _next_batch(self, embed_q: asyncio.Queue) -> Tuple[List[Any], bool]:
+        """攒一批：拿到第一条后最多再等 linger 秒凑满 batch_size；遇到结束标记返回 done=True"""
+        first = await embed_q.get()
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = embed_q.get_nowait() if timeout <= 0 else await asyncio.wait_for(embed_q.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is _DONE:
+                await embed_q.put(_DONE)  # 留给其他 embedder
+                break
+            batch.append(item)
+        return batch, False
+
+    async def _embedder(self, embed_q: asyncio.Queue, write_q: asyncio.Queue):
+        while True:
+            batch, done = await self._next_batch(embed_q)
+            if batch:
+                try:
+                    vectors = await asyncio.to_thread(self.embed, batch)
+                except Exception as e:
+                    logger.error("❌ 向量化失败（%d 条）: %s", len(batch), e)
+                    vectors = [None] * len(batch)
+                ok = [(r, v) for r, v in zip(batch, vectors) if v]
+                self.stats.embedded += len(ok)
+                self.stats.embed_failed += len(batch) - len(ok)
+                if ok:
+                    await write_q.put(([r for r, _ in ok], [v for _, v in ok]))
+            if done:
+                await embed_q.put(_DONE)
+                return
+
+    async def _writer(self, write_q: asyncio.Queue):
+        while True:
+            item = await write_q.get()
+            if item is _DONE:
+                return
+            records, vectors = item
+            try:
+                await asyncio.to_thread(self.write, records, vectors)
+                self.stats.written += len(records)
+            except Exception as e:
+                self.stats.errors += len(records)
+                logger.error("❌ 写入失败（%d 条）: %s", len(records), e)
+
+    async def _reporter(self, embed_q: asyncio.Queue, write_q: asyncio.Queue):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.report(self.stats.line(embed_q.qsize(), write_q.qsize()))
+
+    # ========= 调度 =========
+    async def run_async(self, sources: Iterable[Any]) -> PipelineStats:
+        embed_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        write_q: asyncio.Queue = asyncio.Queue(max(1, self.queue_size // self.batch_size))
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        iterator = iter(sources)
+
+        readers = [asyncio.create_task(self._reader(iterator, embed_q, stop)) for _ in range(self.read_concurrency)]
+        embedders = [asyncio.create_task(self._embedder(embed_q, write_q)) for _ in range(self.embed_concurrency)]
+        writers = [asyncio.create_task(self._writer(write_q)) for _ in range(self.write_concurrency)]
+        reporter = asyncio.create_task(self._reporter(embed_q, write_q))
+        all_tasks = readers + embedders + writers
+
+        def on_interrupt():
+            if not stop.is_set():
+                stop.set()
+                self.stats.interrupted = True
+                self.report("🛑 收到中断：停止读取新文件，等待队列中的任务完成（再按一次 Ctrl-C 立即退出）")
+            else:
+                for task in all_tasks:
+                    task.cancel()
+
+        try:
+            loop.add_signal_handler(signal.SIGINT, on_interrupt)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows / 非主线程：不支持信号处理，Ctrl-C 直接中断
+
+        try:
+            await asyncio.gather(*readers)
+            await embed_q.put(_DONE)
+            await asyncio.gather(*embedders)
+            for _ in writers:
+                await write_q.put(_DONE)
+            await asyncio.gather(*writers)
+        except asyncio.CancelledError:
+            self.report("⚠️ 已强制取消，队列中未完成的任务被丢弃")
+        finally:
+            reporter.cancel()
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+        self.report(self.stats.line())
+        return self.stats
+
+    def run(self, sources: Iterable[Any]) -> PipelineStats:
+        return asyncio.run(self.run_async(sources))
+
+
+def run_pipeline(sources: Iterable[Any], prepare, embed, write, **kwargs) -> PipelineStats:
+    return IndexPipeline(prepare, embed, write, **kwargs).run(sources)
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+统一的简历索引入口：原 index_resumes_openai / _openai_v1 / _tongyi / _tongyi_v1 四个脚本合并为一套引擎，
+读取 / 切分、批量向量化、批量写入 Weaviate 经同一条异步流水线（scripts/index_pipeline.py），
+稳定 UUID、增量清单、沟通记录保留、段落级索引等逻辑只有一份。
+    - index：索引 EXTRACTED_DIR 下的 .txt 简历
+        --variant 选择旧脚本的默认行为（见 VARIANTS），其余参数可逐项覆盖：
+        --provider / --model / --dimensions       向量化后端、模型与维度（默认以集合注册表登记的为准）
+        --batch-size / --concurrency               每批向量化的简历数、同时进行的向量化批次数
+        --chunk-strategy head | ranked             写入 content 的 TOP_N 段：取前 N 段 / 本地排序选段
+        --embed-strategy truncate | pooled         文档向量：TOP_N 段拼接 / 全部段落池化
+        --index-mode single | chunk                chunk 时额外写入段落级集合
+        --since                                    只处理修改时间晚于该时刻的文件（2025-06-01、ISO 时间、时间戳或 12h / 7d）
+        --dry-run                                  只分类 新增 / 更新 / 未变，不向量化、不写库、不删除；
+                                                   ranked 选段只用向量缓存，未命中的已索引简历记为“未知”
+        --move-done                                写入成功后把源文件移到 data/resumes_index_done（原 openai_v1 行为）
+        --no-spool                                 不经本地 spool 直接写 Weaviate（默认先落盘再后台补写，Weaviate 不可达时照常索引，
+                                                   结束时仍有未补写的对象则退出码为 1）
+    - status：集合注册表指向、索引清单条数与 Weaviate 中的对象数
+    - refresh-years：按源文件刷新工作年限（“至今”的年限随时间增长且不触发重新索引，建议每月定时运行）
+用法示例：
+    python scripts/index_resumes.py index --provider dashscope --batch-size 32 --concurrency 4
+    python scripts/index_resumes.py index --variant tongyi --since 24h --dry-run
+    python scripts/index_resumes.py status
+    python scripts/index_resumes.py refresh-years
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.candidate_schema import candidate_attributes, ensure_candidate_class, ingestion_time, parse_fields
+from scripts.chunk_index import INDEX_MODE, chunk_records, chunk_uuid, ensure_chunk_class, index_chunk_records
+from scripts.chunk_ranker import select_chunks
+from scripts.collection_registry import active_class, embedding_settings, resolve
+from scripts.incremental_index import IncrementalIndex, candidate_uuid
+from scripts.index_manifest import IndexManifest, content_hash, scan_collection
+from scripts.index_pipeline import INDEX_BATCH_SIZE, INDEX_EMBED_CONCURRENCY, run_pipeline
+from scripts.pooled_embedding import EMBED_STRATEGY, embed_aligned, embedding_signature
+from scripts.provider_client import (DEFAULT_MODELS, EMBEDDING_DIMENSIONS, CacheOnlyClient, EmbeddingCacheMiss,
+                                     get_client, require_api_key)
+from scripts.text_chunker import chunk_text
+from scripts.weaviate_schema import count_objects, get_class
+from scripts.write_spool import WRITE_SPOOL, get_spool, make_writer
+
+load_dotenv()
+
+RESUMES_DIR = os.getenv("EXTRACTED_DIR", "data/resumes_extract_enhanced")
+INDEX_DONE_DIR = os.path.join("data", "resumes_index_done")
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_CHUNK_COLLECTION = os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks")
+TOP_N = 5
+PROVIDERS = ("openai", "dashscope", "local", "fake")
+# 旧脚本 → 默认参数：provider、选段方式、是否清洗空白、写入后是否移走源文件
+VARIANTS = {
+    "openai": {"provider": "openai", "chunk_strategy": "ranked", "clean_text": False, "move_done": False},
+    "openai_v1": {"provider": "openai", "chunk_strategy": "ranked", "clean_text": False, "move_done": True},
+    "tongyi": {"provider": "dashscope", "chunk_strategy": "head", "clean_text": True, "move_done": False},
+    "tongyi_v1": {"provider": "dashscope", "chunk_strategy": "head", "clean_text": True, "move_done": False},
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexOptions:
+    provider: str = "openai"
+    model: Optional[str] = None
+    dimensions: Optional[int] = None
+    collection: str = WEAVIATE_COLLECTION
+    chunk_collection: str = WEAVIATE_CHUNK_COLLECTION
+    resumes_dir: str = RESUMES_DIR
+    batch_size: int = INDEX_BATCH_SIZE
+    concurrency: int = INDEX_EMBED_CONCURRENCY
+    top_n: int = TOP_N
+    chunk_strategy: str = "ranked"     # head | ranked
+    embed_strategy: str = EMBED_STRATEGY  # truncate | pooled
+    index_mode: str = INDEX_MODE       # single | chunk
+    clean_text: bool = False
+    move_done: bool = False
+    since: Optional[float] = None      # 文件修改时间下限（时间戳）
+    dry_run: bool = False
+    spool: bool = WRITE_SPOOL          # 先写本地 spool，后台补写 Weaviate（scripts/write_spool.py）
+
+
+def variant_options(variant: str = "openai", **overrides) -> IndexOptions:
+    settings = dict(VARIANTS[variant])
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return IndexOptions(**settings)
+
+
+# ========= 文本处理 =========
+def clean_text_for_embedding(text: str) -> str:
+    """向量前文本清洗（不截断，仅合并空行与连续空白）"""
+    text = re.sub(r"\n{2,}", "\n", text)
+    text = re.sub(r"[^\S\r\n]+", " ", text)
+    return text.strip()
+
+
+def load_resume_text(file_path: str) -> str:
+    if not file_path.endswith(".txt"):
+        return ""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning("⚠️ 读取失败: %s | %s", file_path, e)
+        return ""
+
+
+def split_txt_sections(full_text: str):
+    """拆出 字段提取结果 / 模块结构分类结果 / 原始简历文本 三部分；格式不符时整篇作为原文"""
+    pattern = r"===\s*字段提取结果\s*===\n(.*?)\n+===\s*模块结构分类结果\s*===\n(.*?)\n+===\s*原始简历文本\s*===\n(.*)"
+    match = re.search(pattern, full_text, re.DOTALL)
+    if match:
+        fields_str, sections_str, raw_text = match.groups()
+        return fields_str.strip(), sections_str.strip(), raw_text.strip()
+    return "", "", full_text.strip()
+
+
+def build_vector_text(fields_str: str, sections_str: str, raw_text: str) -> str:
+    return f"【字段信息】\n{fields_str}\n\n【模块结构分类】\n{sections_str}\n\n【原文补充】\n{raw_text}"
+
+
+def parse_since(value: str) -> float:
+    """--since：12h / 7d / 30m、Unix 时间戳、2025-06-01 或 2025-06-01T08:00:00"""
+    value = value.strip()
+    relative = re.fullmatch(r"(\d+(?:\.\d+)?)([mhd])", value)
+    if relative:
+        seconds = {"m": 60, "h": 3600, "d": 86400}[relative.group(2)]
+        return time.time() - float(relative.group(1)) * seconds
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析的时间: {value}（示例：24h、7d、2025-06-01、2025-06-01T08:00）")
+
+
+def list_resumes(resumes_dir: str, since: Optional[float] = None):
+    """返回 (目录下全部 .txt, 需要处理的 .txt)；since 只过滤后者，清理已删除文件时仍按全部文件判断"""
+    files = sorted(f for f in os.listdir(resumes_dir) if f.endswith(".txt"))
+    if since is None:
+        return files, files
+    return files, [f for f in files if os.path.getmtime(os.path.join(resumes_dir, f)) >= since]
+
+
+def move_to_done(file_path: str, done_dir: str = INDEX_DONE_DIR):
+    """写入成功后移动源文件，同名文件已存在时加 _bak 后缀"""
+    os.makedirs(done_dir, exist_ok=True)
+    filename = os.path.basename(file_path)
+    dst_path = os.path.join(done_dir, filename)
+    if os.path.exists(dst_path):
+        dst_path = os.path.join(done_dir, f"{Path(filename).stem}_bak{Path(filename).suffix}")
+    try:
+        shutil.move(file_path, dst_path)
+        logger.info("📂 已移动简历至: %s", dst_path)
+    except OSError as e:
+        logger.warning("⚠️ 移动文件失败: %s | %s", filename, e)
+
+
+# ========= 索引 =========
+def index_resumes(options: IndexOptions) -> Dict[str, int]:
+    """按 options 索引一遍简历目录，返回 新增 / 更新 / 未变 / 删除 计数（dry-run 时删除恒为 0，另含 unknown）；
+    spool_pending 为本次写入但尚未补写到 Weaviate 的对象数"""
+    weaviate_class = active_class(options.collection)
+    # 注册表登记了模型 / 维度时以注册表为准，保证写入的向量与集合一致；命令行显式指定时以命令行为准
+    model, dimensions = embedding_settings(options.provider, DEFAULT_MODELS[options.provider][0](),
+                                           EMBEDDING_DIMENSIONS, options.collection)
+    model = options.model or model
+    dimensions = dimensions if options.dimensions is None else options.dimensions
+    if not options.dry_run:
+        require_api_key(options.provider)  # dry-run 只读向量缓存，不需要 Key
+    client = get_client(options.provider, embedding_model=model, dimensions=dimensions)
+    logger.info("🔧 %s / %s%s → %s%s", client.provider, client.embedding_model,
+                f"（{dimensions} 维）" if dimensions else "", weaviate_class, "（dry-run）" if options.dry_run else "")
+
+    if not os.path.exists(options.resumes_dir):
+        logger.error("❌ 简历目录不存在: %s", options.resumes_dir)
+        return {}
+    all_files, files = list_resumes(options.resumes_dir, options.since)
+    if not all_files:
+        logger.warning("⚠️ 没有发现简历文件")
+        return {}
+    if options.since is not None:
+        logger.info("🕒 修改时间晚于 %s 的文件: %d / %d",
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(options.since)), len(files), len(all_files))
+
+    try:
+        exists = get_class(WEAVIATE_URL, weaviate_class) is not None
+        if not options.dry_run:
+            # class 不存在时创建；已存在时补齐可过滤的结构化属性
+            ensure_candidate_class(WEAVIATE_URL, weaviate_class)
+    except requests.RequestException as e:
+        if options.dry_run or not options.spool:
+            raise
+        # 清单已同步过时索引不依赖 Weaviate：向量化照常进行，对象落盘到 spool，恢复后先建类再补写
+        logger.warning("⚠️ Weaviate 不可达，对象先写入 spool: %s", e)
+        get_spool(weaviate_url=WEAVIATE_URL)[0].require(
+            weaviate_class, lambda: ensure_candidate_class(WEAVIATE_URL, weaviate_class))
+        exists = True
+    # 已索引对象从本地清单判断，不再逐个 GET Weaviate
+    manifest = IndexManifest(weaviate_url=WEAVIATE_URL, weaviate_class=weaviate_class).load(
+        seed=exists or not options.dry_run)
+    chunk_class = active_class(options.chunk_collection)
+    chunk_manifest = None
+    if options.index_mode == "chunk":
+        try:
+            chunk_exists = get_class(WEAVIATE_URL, chunk_class) is not None
+            if not options.dry_run:
+                ensure_chunk_class(WEAVIATE_URL, chunk_class, weaviate_class)
+        except requests.RequestException:
+            if options.dry_run or not options.spool:
+                raise
+            # 段落集合引用候选人集合：补写前先确认候选人集合
+            get_spool(weaviate_url=WEAVIATE_URL)[0].require(
+                chunk_class, lambda: ensure_candidate_class(WEAVIATE_URL, weaviate_class)
+                and ensure_chunk_class(WEAVIATE_URL, chunk_class, weaviate_class))
+            chunk_exists = True
+        chunk_manifest = IndexManifest(weaviate_url=WEAVIATE_URL, weaviate_class=chunk_class).load(
+            seed=chunk_exists or not options.dry_run)
+    signature = embedding_signature(client.embedding_model, options.embed_strategy, client.dimensions)
+    changes = IncrementalIndex(manifest, signature, WEAVIATE_URL, weaviate_class, chunk_manifest=chunk_manifest,
+                               chunk_class=chunk_class)
+    text_of = clean_text_for_embedding if options.clean_text else (lambda text: text)
+
+    logger.info("📄 开始处理简历: %d 个文件", len(files))
+    start = time.time()
+    chunk_pending = []
+    pending_names = {"added": [], "updated": [], "unknown": []}
+    # dry-run 不发起任何 embedding 请求：ranked 选段只查向量缓存，未命中时无法确定写入 content 的段落，记为“未知”
+    ranker = CacheOnlyClient(client) if options.dry_run else client
+
+    # 1️⃣ 读取阶段：解析字段、切分、选段、查重
+    def prepare_resume(filename: str):
+        file_path = os.path.join(options.resumes_dir, filename)
+        full_text = load_resume_text(file_path)
+        if not full_text.strip():
+            logger.warning("⚠️ 跳过空文件: %s", filename)
+            return None
+
+        fields, sections, raw = split_txt_sections(full_text)
+        vector_text = build_vector_text(fields, sections, raw)
+        chunks = chunk_text(vector_text, model=client.embedding_model)
+        # UUID 只由文件名决定；是否需要重新向量化由清单中的内容哈希与向量标识判断
+        resume_uuid = candidate_uuid(filename)
+        attributes = candidate_attributes(parse_fields(full_text), filename, full_text)
+        # 先比对源摘要：源文本、属性、选段参数都没变时选出的 content 也不变，跳过选段（ranked 要为每段取向量）
+        source = content_hash(f"{options.chunk_strategy}:{options.top_n}\n{vector_text}", attributes)
+        if changes.unchanged_source(filename, source):
+            status = "unchanged"
+        else:
+            if options.chunk_strategy == "ranked":
+                try:
+                    selected_chunks = select_chunks(ranker, chunks, options.top_n)
+                except EmbeddingCacheMiss:
+                    if resume_uuid in manifest:
+                        pending_names["unknown"].append(filename)
+                        return None
+                    selected_chunks = chunks[:options.top_n]  # 清单中没有的文件选哪几段都是新增
+            else:
+                selected_chunks = chunks[:options.top_n]
+            final_text = "\n".join(selected_chunks)
+            if not final_text.strip():
+                logger.warning("⚠️ 无有效段落: %s", filename)
+                return None
+            status = changes.classify(filename, final_text, attributes)
+            if status == "unchanged" and not options.dry_run:
+                manifest.record_source(resume_uuid, source)  # 旧条目补记源摘要，下次运行直接跳过选段
+
+        if chunk_manifest is not None and (status != "unchanged" or chunk_uuid(resume_uuid, 0) not in chunk_manifest):
+            # 段落级索引：全部段落都写入，不受 TOP_N 限制
+            resume_chunks = chunk_records(resume_uuid, filename, chunks, weaviate_class)
+            chunk_pending.extend(resume_chunks)
+            changes.expect_chunks(filename, [r["uuid"] for r in resume_chunks])
+
+        if status == "unchanged":
+            logger.info("⏩ 未变化: %s", filename)
+            return None
+        if options.dry_run:
+            pending_names[status].append(filename)
+            return None
+        return {"filename": filename, "file_path": file_path, "content": final_text, "uuid": resume_uuid,
+                "attributes": attributes, "chunks": chunks, "source_digest": source}
+
+    if options.dry_run:
+        for filename in files:
+            prepare_resume(filename)
+        for status, label in (("added", "新增"), ("updated", "更新")):
+            for filename in pending_names[status]:
+                logger.info("📝 将%s: %s", label, filename)
+        for filename in pending_names["unknown"]:
+            logger.info("❔ 未知（选段所需向量不在缓存中）: %s", filename)
+        if chunk_pending:
+            logger.info("🧩 将写入段落: %d 段", len(chunk_pending))
+        unknown = len(pending_names["unknown"])
+        logger.info("%s%s（dry-run，未写入）", changes.report(), f" | 未知 {unknown}" if unknown else "")
+        return {**changes.counts, "unknown": unknown}
+
+    # 2️⃣ 向量化阶段：每批一次 embeddings 请求
+    def embed_records(batch):
+        vectors = embed_aligned(client, batch, lambda r: text_of(r["content"]),
+                                lambda r: [text_of(c) for c in r["chunks"]], options.embed_strategy,
+                                max_items=options.batch_size)
+        for record, vector in zip(batch, vectors):
+            if not vector:
+                logger.warning("❌ 向量化失败: %s", record["filename"])
+        logger.debug("📐 本批向量化完成: %d 份", len(batch))
+        return vectors
+
+    # 3️⃣ 写入阶段：经 /v1/batch/objects 批量写入 Weaviate（spool 开启时先落盘，由后台线程补写）
+    records = {}
+    writer_factory = make_writer(options.spool)
+
+    def on_indexed(filename: str):
+        logger.info("✅ 插入成功: %s", filename)
+        record = records[filename]
+        manifest.record(record["uuid"], filename, embedding_model=signature,
+                        digest=content_hash(record["content"], record["attributes"]),
+                        source_digest=record["source_digest"])
+        changes.mark_written(filename)
+        if options.move_done:
+            move_to_done(record["file_path"])
+
+    def write_records(batch, vectors):
+        # upsert 会整体替换对象：直接写入时先批量取回已有的沟通记录；经 spool 时由补写线程在写入前合并
+        notes = {} if options.spool else changes.notes_for([record["filename"] for record in batch])
+        for record, vector in zip(batch, vectors):
+            records[record["filename"]] = record
+            properties = {
+                "filename": record["filename"],
+                "content": record["content"],
+                **record["attributes"],
+                "ingested_at": ingestion_time(),
+                "notes": notes.get(record["filename"], []),
+            }
+            if options.spool:
+                writer.add(record["uuid"], properties, vector, key=record["filename"],
+                           merge_notes=[record["uuid"], *changes.superseded(record["filename"])])
+            else:
+                writer.add(record["uuid"], properties, vector, key=record["filename"])
+
+    with writer_factory(weaviate_url=WEAVIATE_URL, weaviate_class=weaviate_class, on_success=on_indexed) as writer:
+        run_pipeline(files, prepare_resume, embed_records, write_records, batch_size=options.batch_size,
+                     embed_concurrency=options.concurrency, report=logger.info)
+    logger.info("📊 %s", writer.report())
+
+    # 4️⃣ 段落级索引：父对象写完后再写段落
+    if chunk_pending:
+        logger.info("🧩 段落级索引: %d 段", len(chunk_pending))
+        report = index_chunk_records(client, chunk_pending, WEAVIATE_URL, chunk_class, chunk_manifest,
+                                     text_of=lambda r: text_of(r["content"]), writer_factory=writer_factory)
+        logger.info("📊 %s", report)
+
+    # 5️⃣ 删除被替换的旧对象与过期段落：spool 未补写完时跳过（旧对象的沟通记录要在补写时合并），下次运行再删
+    spool_pending = get_spool(weaviate_url=WEAVIATE_URL)[0].backlog(own_only=True) if options.spool else 0
+    if spool_pending:
+        logger.warning("📦 spool 尚未全部写入 Weaviate，本次不删除被替换的旧对象")
+    else:
+        changes.finalize(all_files)
+    logger.info(changes.report())
+    logger.info("✅ 所有简历处理完成，总耗时 %.2fs", time.time() - start)
+    return {**changes.counts, "spool_pending": spool_pending}
+
+
+def index_status(collection: str = WEAVIATE_COLLECTION) -> Dict:
+    target = resolve(collection)
+    exists = get_class(WEAVIATE_URL, target.class_name) is not None
+    summary = IndexManifest(weaviate_url=WEAVIATE_URL, weaviate_class=target.class_name).load(seed=False).summary()
+    return {
+        "collection": collection,
+        "class": target.class_name,
+        "provider": target.provider,
+        "embedding_model": target.embedding_model,
+        "dimensions": target.dimensions,
+        "weaviate_objects": count_objects(WEAVIATE_URL, target.class_name) if exists else None,
+        "manifest": summary,
+    }
+
+
+def refresh_years(collection: str = WEAVIATE_COLLECTION, resumes_dirs: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    按源文件重新计算工作年限，只 PATCH 值有变化的对象（不重新向量化）。
+    含“至今”的工作经历年限随时间增长，但不参与内容哈希（index_manifest.TIME_RELATIVE_PROPERTIES），
+    增量索引不会因此重写对象，库中的值会逐月变旧：建议每月定时运行一次。
+    """
+    weaviate_class = active_class(collection)
+    stored = {obj["id"]: (obj.get("properties") or {}).get("years_experience")
+              for obj in scan_collection(WEAVIATE_URL, weaviate_class)}
+    counts = {"patched": 0, "unchanged": 0, "failed": 0}
+    for resumes_dir in resumes_dirs or [RESUMES_DIR, INDEX_DONE_DIR]:
+        if not os.path.isdir(resumes_dir):
+            continue
+        for filename in list_resumes(resumes_dir)[0]:
+            resume_uuid = candidate_uuid(filename)
+            if resume_uuid not in stored:
+                continue
+            full_text = load_resume_text(os.path.join(resumes_dir, filename))
+            years = candidate_attributes(parse_fields(full_text), filename, full_text).get("years_experience")
+            if years is None or stored[resume_uuid] == years:
+                counts["unchanged"] += 1
+                continue
+            res = requests.patch(f"{WEAVIATE_URL}/v1/objects/{weaviate_class}/{resume_uuid}",
+                                 json={"class": weaviate_class, "properties": {"years_experience": years}}, timeout=30)
+            if res.status_code in (200, 204):
+                counts["patched"] += 1
+                stored[resume_uuid] = years
+            else:
+                counts["failed"] += 1
+                logger.warning("⚠️ 更新工作年限失败: %s | %s %s", filename, res.status_code, res.text[:200])
+    logger.info("🗓️ 工作年限已刷新 %s: 更新 %d，未变 %d，失败 %d", weaviate_class, counts["patched"],
+                counts["unchanged"], counts["failed"])
+    return counts
+
+
+# ========= 命令行 =========
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="简历索引")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出逐文件 / 逐批次的调试日志")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index = sub.add_parser("index", help="索引简历目录")
+    index.add_argument("--variant", choices=sorted(VARIANTS), default="openai", help="沿用旧脚本的默认参数")
+    index.add_argument("--provider", choices=PROVIDERS, help="向量化后端（默认取 --variant）")
+    index.add_argument("--model", help="embedding 模型（默认以集合注册表为准，其次为环境变量）")
+    index.add_argument("--dimensions", type=int, help="向量维度，0 为模型默认")
+    index.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    index.add_argument("--chunk-collection", default=WEAVIATE_CHUNK_COLLECTION, help="段落级逻辑集合名")
+    index.add_argument("--dir", dest="resumes_dir", default=RESUMES_DIR, help="简历 .txt 目录")
+    index.add_argument("--batch-size", type=int, default=INDEX_BATCH_SIZE, help="每批向量化的简历数")
+    index.add_argument("--concurrency", type=int, default=INDEX_EMBED_CONCURRENCY, help="同时进行的向量化批次数")
+    index.add_argument("--top-n", type=int, default=TOP_N, help="写入 content 的段落数")
+    index.add_argument("--chunk-strategy", choices=("head", "ranked"), help="TOP_N 段的选取方式（默认取 --variant）")
+    index.add_argument("--embed-strategy", choices=("truncate", "pooled"), default=EMBED_STRATEGY,
+                       help="文档向量：TOP_N 段拼接 / 全部段落池化")
+    index.add_argument("--index-mode", choices=("single", "chunk"), default=INDEX_MODE, help="chunk 时同时写段落级集合")
+    index.add_argument("--since", type=parse_since, help="只处理修改时间晚于该时刻的文件，如 24h、7d、2025-06-01")
+    index.add_argument("--dry-run", action="store_true",
+                       help="只统计 新增 / 更新 / 未变，不向量化、不写库（ranked 选段只用向量缓存，未命中记为未知）")
+    index.add_argument("--move-done", action="store_const", const=True, help="写入成功后移走源文件（默认取 --variant）")
+    index.add_argument("--no-spool", dest="spool", action="store_const", const=False,
+                       help="直接写 Weaviate，不经本地 spool")
+    index.add_argument("--clean-text", action="store_const", const=True, help="向量化前合并空行与空白（默认取 --variant）")
+
+    status = sub.add_parser("status", help="查看集合与索引清单状态")
+    status.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+
+    refresh = sub.add_parser("refresh-years", help="按源文件刷新工作年限（不重新向量化，建议每月运行）")
+    refresh.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    refresh.add_argument("--dir", dest="resumes_dirs", action="append",
+                         help="简历 .txt 目录，可重复（默认 EXTRACTED_DIR 与 data/resumes_index_done）")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.command == "status":
+        print(json.dumps(index_status(args.collection), ensure_ascii=False, indent=2))
+        return
+    if args.command == "refresh-years":
+        counts = refresh_years(args.collection, args.resumes_dirs)
+        if counts["failed"]:
+            raise SystemExit(1)
+        return
+
+    options = variant_options(
+        args.variant, provider=args.provider, model=args.model, dimensions=args.dimensions,
+        collection=args.collection, chunk_collection=args.chunk_collection, resumes_dir=args.resumes_dir,
+        batch_size=args.batch_size, concurrency=args.concurrency, top_n=args.top_n,
+        chunk_strategy=args.chunk_strategy, embed_strategy=args.embed_strategy, index_mode=args.index_mode,
+        clean_text=args.clean_text, move_done=args.move_done, since=args.since, dry_run=args.dry_run,
+        spool=args.spool)
+    counts = index_resumes(options)
+    if counts.get("spool_pending"):
+        # 对象已安全落盘，但集合尚不完整：以非零退出码告知调用方（如 rebuild_collection.py 不应据此切换指针）
+        raise SystemExit(f"📦 {counts['spool_pending']} 条对象尚未写入 Weaviate，"
+                         "补写完成前集合不完整（python scripts/write_spool.py flush）")
+
+
+if __name__ == "__main__":
+    main()
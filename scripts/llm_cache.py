@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+LLM 响应磁盘缓存（SQLite），供 temperature=0 的抽取类 prompt 共用（对话式回复不缓存，直接调用模型）。
+    - 缓存键：模型 + 消息内容 + 生成参数 的 sha256
+    - TTL 过期、按总大小淘汰最久未访问的条目
+    - 按调用点（call_site）统计命中率
+    - LLM_CACHE_MODE：on（默认，读写）| off（不使用）| refresh（只写不读）| replay（只读，未命中即报错，用于离线测试）
+用法示例：
+    content = cached_completion("extract_fields", model, messages, {"temperature": 0}, lambda: call_llm())
+    python scripts/llm_cache.py            # 查看缓存统计
+    python scripts/llm_cache.py --clear    # 清空缓存
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+root_dir = Path(__file__).resolve().parent.parent
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(root_dir / "data" / "cache" / "llm_cache.sqlite3"))
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "on")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+
+class CacheMiss(Exception):
+    """replay 模式下缓存未命中"""
+
+
+def make_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_json(content: str) -> bool:
+    """与各抽取函数一致：去掉 ``` 代码块标记后能解析为 JSON"""
+    try:
+        json.loads(re.sub(r"^```(json)?|```$", "", content.strip()))
+        return True
+    except Exception:
+        return False
+
+
+class LLMCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, mode: str = LLM_CACHE_MODE,
+                 ttl: int = LLM_CACHE_TTL, max_mb: float = LLM_CACHE_MAX_MB):
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "stores": 0})
+        if self.mode != "off":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._init_db()
+
+    # ========= SQLite =========
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                call_site TEXT,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_access ON completions(last_access)")
+        conn.commit()
+
+    # ========= 读写 =========
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        row = conn.execute("SELECT response, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        response, created_at = row
+        if self.ttl > 0 and time.time() - created_at > self.ttl:
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        return response
+
+    def put(self, key: str, call_site: str, model: str, response: str):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO completions (key, call_site, model, response, size, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, call_site, model, response, len(response.encode("utf-8")), now, now),
+        )
+        conn.commit()
+        self.evict()
+
+    def evict(self):
+        """总大小超过上限时，按最久未访问淘汰到上限的 90%"""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY last_access ASC"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM completions")
+        conn.commit()
+
+    # ========= 统计 =========
+    def _count(self, call_site: str, field: str):
+        with self._lock:
+            self._stats[call_site][field] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for site, s in self._stats.items():
+                lookups = s["hits"] + s["misses"]
+                result[site] = dict(s, hit_rate=round(s["hits"] / lookups, 4) if lookups else 0.0)
+            return result
+
+    def disk_usage(self) -> Dict[str, Any]:
+        if self.mode == "off":
+            return {"entries": 0, "bytes": 0}
+        rows = self._conn().execute(
+            "SELECT call_site, COUNT(*), COALESCE(SUM(size), 0) FROM completions GROUP BY call_site"
+        ).fetchall()
+        return {
+            "entries": sum(r[1] for r in rows),
+            "bytes": sum(r[2] for r in rows),
+            "by_call_site": {r[0]: {"entries": r[1], "bytes": r[2]} for r in rows},
+        }
+
+    # ========= 主入口 =========
+    def completion(self, call_site: str, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any],
+                   fetch: Callable[[], str], validate: Optional[Callable[[str], bool]] = None) -> str:
+        if self.mode == "off":
+            return fetch()
+
+        key = make_key(model, messages, params)
+        if self.mode in ("on", "replay"):
+            cached = self.get(key)
+            if cached is not None:
+                self._count(call_site, "hits")
+                return cached
+            self._count(call_site, "misses")
+            if self.mode == "replay":
+                raise CacheMiss(f"[{call_site}] 缓存未命中（replay 模式）: {key[:12]}")
+        else:
+            self._count(call_site, "misses")
+
+        content = fetch()
+        # 只缓存有效结果，避免把一次偶发的格式错误永久固化
+        if content and (validate is None or validate(content)):
+            self.put(key, call_site, model, content)
+            self._count(call_site, "stores")
+        return content
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def cached_completion(call_site: str, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any],
+                      fetch: Callable[[], str], validate: Optional[Callable[[str], bool]] = None) -> str:
+    return get_cache().completion(call_site, model, messages, params, fetch, validate)
+
+
+def main():
+    cache = get_cache()
+    if "--clear" in sys.argv[1:]:
+        cache.clear()
+        print("🧹 已清空 LLM 缓存")
+        return
+    print(f"📦 LLM 缓存: {cache.path}（模式: {cache.mode}）")
+    print(json.dumps(cache.disk_usage(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+合并简历 PDF 拆分器：把招聘网站批量导出的「一个 PDF 多份简历」拆成单人片段。
+边界判定依据页面级线索：
+    1. PyMuPDF 目录（outline）中的一级条目；
+    2. 页面尺寸突变（不同来源的简历拼接在一起时常见）；
+    3. 页面顶部出现新的姓名 + 联系方式抬头（且与当前片段的联系方式不同）；
+       姓名行不能是“工作经历”“教育背景”等模块标题，且前后 NAME_CONTACT_DISTANCE 行内要有手机号或邮箱。
+用法示例：
+    python scripts/pdf_splitter.py data/resumes/bulk_export.pdf
+"""
+
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+import fitz
+
+PHONE_PATTERN = re.compile(r'(?<!\d)1[3-9]\d{9}(?!\d)')
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+NAME_LINE_PATTERN = re.compile(r'^(姓\s*名[:：]?\s*)?[\u4e00-\u9fa5]{2,4}(先生|女士)?$')
+# 同样是 2~4 个汉字的模块标题（工作经历、教育背景、项目经验、个人简历……）
+SECTION_HEADING_PATTERN = re.compile(r'(经历|经验|背景|技能|评价|信息|意向|证书|荣誉|特长|爱好|能力|情况|简介|简历|概况|'
+                                     r'总结|亮点|成果|作品|优势)$')
+NAME_CONTACT_DISTANCE = 3    # 姓名行与手机号 / 邮箱所在行的最大行距
+HEADER_REGION_RATIO = 0.25   # 页面顶部 25% 视为抬头区域
+MIN_SPAN_SIZE = 8            # 与 extract_pdf_text 一致：忽略过小字号
+SIZE_TOLERANCE = 2.0         # 页面尺寸差异容忍度（pt）
+
+
+@dataclass
+class PdfSegment:
+    """单份简历在合并 PDF 中的页码区间（start 含，end 不含，0 起始）"""
+    start: int
+    end: int
+    text: str = ""
+    cues: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"p{self.start + 1}-{self.end}"
+
+
+# ========= 页面文本 =========
+def page_lines(page) -> List[str]:
+    lines = []
+    for b in page.get_text("dict")["blocks"]:
+        if "lines" in b:
+            for line in b["lines"]:
+                span_text = " ".join([span["text"] for span in line["spans"] if span.get("size", 0) > MIN_SPAN_SIZE])
+                if span_text.strip():
+                    lines.append(span_text.strip())
+    return lines
+
+
+def header_lines(page) -> List[str]:
+    """页面顶部区域的文本行"""
+    limit = page.rect.y0 + page.rect.height * HEADER_REGION_RATIO
+    lines = []
+    for b in page.get_text("dict")["blocks"]:
+        if "lines" not in b or b["bbox"][1] > limit:
+            continue
+        for line in b["lines"]:
+            text = " ".join([span["text"] for span in line["spans"]]).strip()
+            if text:
+                lines.append(text)
+    return lines
+
+
+def header_contacts(lines: List[str]) -> Set[str]:
+    joined = "\n".join(lines)
+    return set(PHONE_PATTERN.findall(joined)) | {e.lower() for e in EMAIL_PATTERN.findall(joined)}
+
+
+def has_name_line(lines: List[str]) -> bool:
+    """前 5 行中有姓名行（排除模块标题），且其附近有联系方式"""
+    for i, line in enumerate(lines[:5]):
+        text = line.replace(" ", "")
+        if not NAME_LINE_PATTERN.match(text) or SECTION_HEADING_PATTERN.search(text):
+            continue
+        if header_contacts(lines[max(0, i - NAME_CONTACT_DISTANCE):i + NAME_CONTACT_DISTANCE + 1]):
+            return True
+    return False
+
+
+# ========= 边界检测 =========
+def outline_starts(doc) -> Set[int]:
+    """目录中一级条目所在页（0 起始）"""
+    starts = set()
+    for level, _title, page_no in doc.get_toc(simple=True):
+        if level == 1 and page_no >= 1:
+            starts.add(page_no - 1)
+    return starts if len(starts) >= 2 else set()
+
+
+def detect_resume_boundaries(doc) -> List[PdfSegment]:
+    """返回按页码切分的简历片段；无法判定时整份文件为一个片段"""
+    page_count = len(doc)
+    if page_count == 0:
+        return []
+
+    outline = outline_starts(doc)
+    segments = [PdfSegment(start=0, end=page_count, cues=["first_page"])]
+    current_contacts: Set[str] = set()
+    prev_size = None
+
+    for idx in range(page_count):
+        page = doc[idx]
+        size = (round(page.rect.width, 1), round(page.rect.height, 1))
+        head = header_lines(page)
+        contacts = header_contacts(head)
+
+        cues = []
+        if idx > 0:
+            if idx in outline:
+                cues.append("outline")
+            if prev_size and (abs(size[0] - prev_size[0]) > SIZE_TOLERANCE or abs(size[1] - prev_size[1]) > SIZE_TOLERANCE):
+                cues.append("page_size")
+            # 抬头出现联系方式且与当前片段不同，才视为新候选人（避免每页页眉重复联系方式导致误拆）
+            if contacts and not (contacts & current_contacts) and has_name_line(head):
+                cues.append("contact_header")
+
+        if cues:
+            segments[-1].end = idx
+            segments.append(PdfSegment(start=idx, end=page_count, cues=cues))
+            current_contacts = set()
+
+        current_contacts |= contacts
+        prev_size = size
+
+    return segments
+
+
+def split_pdf_resumes(file_path: str) -> List[PdfSegment]:
+    """打开 PDF，检测边界并填充每个片段的文本"""
+    doc = fitz.open(file_path)
+    try:
+        segments = detect_resume_boundaries(doc)
+        for seg in segments:
+            lines = []
+            for idx in range(seg.start, seg.end):
+                lines.extend(page_lines(doc[idx]))
+            seg.text = "\n".join(lines)
+        return segments
+    finally:
+        doc.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if not argv:
+        print(__doc__)
+        return
+    for path in argv:
+        segments = split_pdf_resumes(path)
+        print(f"📄 {path}: 检测到 {len(segments)} 份简历")
+        for seg in segments:
+            print(f"  - {seg.label} | 线索: {','.join(seg.cues)} | 字数: {len(seg.text)}")
+
+
+if __name__ == "__main__":
+    main()
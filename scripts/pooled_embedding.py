@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+整份简历的池化向量：全部段落批量向量化后，按段落长度加权求均值并做 L2 归一化，作为简历的文档向量。
+解决只对 chunks[:TOP_N]（前约 1500 字）向量化、后半段工作经历不影响向量的问题。
+    - EMBED_STRATEGY=truncate（默认，沿用原逻辑）| pooled
+    - 多份简历的段落合并进同一批请求，池化用 NumPy 分段求和一次完成
+用法示例：
+    for batch, vectors in embed_resumes(client, pending, lambda r: r["content"], lambda r: r["chunks"]):
+        ...
+"""
+
+import os
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.embedding_batcher import (EMBED_BATCH_MAX_TOKENS, EMBED_BATCH_SIZE, embed_batch, embed_in_batches,
+                                       iter_batches)
+
+EMBED_STRATEGY = os.getenv("EMBED_STRATEGY", "truncate")  # truncate | pooled
+
+
+def embedding_signature(model: str, strategy: Optional[str] = None, dimensions: int = 0) -> str:
+    """写入索引清单的向量标识：模型名，指定输出维度时追加 @维度，池化策略时追加 :pooled"""
+    signature = f"{model}@{dimensions}" if dimensions else model
+    return f"{signature}:pooled" if (strategy or EMBED_STRATEGY) == "pooled" else signature
+
+
+def pool_vectors(vectors: np.ndarray, lengths: Sequence[int], offsets: Sequence[int]) -> np.ndarray:
+    """
+    vectors: 全部段落向量 (n_chunks, dim)；lengths: 每段字符数；offsets: 每份简历第一段在 vectors 中的下标。
+    返回 (n_docs, dim)：按长度加权的均值向量，L2 归一化。
+    """
+    weights = np.asarray(lengths, dtype=np.float32)[:, None]
+    sums = np.add.reduceat(vectors * weights, offsets, axis=0)
+    totals = np.add.reduceat(weights, offsets, axis=0)
+    pooled = sums / np.maximum(totals, 1e-6)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return pooled / norms
+
+
+def pooled_in_batches(client, items: Iterable[Any], chunks_of: Callable[[Any], List[str]],
+                      max_items: int = EMBED_BATCH_SIZE, max_tokens: int = EMBED_BATCH_MAX_TOKENS,
+                      model: Optional[str] = None) -> Iterator[Tuple[List[Any], List[Optional[List[float]]]]]:
+    """按段落总 token 数分批（一份简历的段落不会被拆到两批），逐批产出 (记录列表, 池化向量列表)"""
+    model = model or client.embedding_model
+    docs = [item for item in items if chunks_of(item)]
+    for batch in iter_batches(docs, lambda item: "\n".join(chunks_of(item)), max_items, max_tokens, model):
+        chunk_lists = [chunks_of(item) for item in batch]
+        texts = [chunk for chunks in chunk_lists for chunk in chunks]
+        raw = embed_batch(client, texts, model)
+
+        # 单段失败时剔除该段，整份简历的段落全部失败才返回 None
+        results: List[Optional[List[float]]] = [None] * len(batch)
+        keep_vectors, keep_lengths, offsets, owners = [], [], [], []
+        pos = 0
+        for doc_idx, chunks in enumerate(chunk_lists):
+            doc_vectors = [(v, len(c)) for v, c in zip(raw[pos:pos + len(chunks)], chunks) if v]
+            pos += len(chunks)
+            if not doc_vectors:
+                continue
+            offsets.append(len(keep_vectors))
+            owners.append(doc_idx)
+            keep_vectors.extend(v for v, _ in doc_vectors)
+            keep_lengths.extend(n for _, n in doc_vectors)
+        if keep_vectors:
+            pooled = pool_vectors(np.asarray(keep_vectors, dtype=np.float32), keep_lengths, offsets)
+            for doc_idx, vector in zip(owners, pooled):
+                results[doc_idx] = vector.tolist()
+        yield batch, results
+
+
+def embed_resumes(client, items: List[Any], text_of: Callable[[Any], str], chunks_of: Callable[[Any], List[str]],
+                  strategy: Optional[str] = None,
+                  max_items: int = EMBED_BATCH_SIZE) -> Iterator[Tuple[List[Any], List[Optional[List[float]]]]]:
+    """按 EMBED_STRATEGY 选择截断文本向量或整份简历池化向量"""
+    if (strategy or EMBED_STRATEGY) == "pooled":
+        return pooled_in_batches(client, items, chunks_of, max_items=max_items)
+    return embed_in_batches(client, items, text_of, max_items=max_items)
+
+
+def embed_aligned(client, items: List[Any], text_of: Callable[[Any], str], chunks_of: Callable[[Any], List[str]],
+                  strategy: Optional[str] = None, max_items: int = EMBED_BATCH_SIZE) -> List[Optional[List[float]]]:
+    """一次性向量化 items，返回与 items 一一对应的向量列表（失败为 None），供流水线的向量化阶段使用"""
+    vectors = {}
+    for batch, batch_vectors in embed_resumes(client, items, text_of, chunks_of, strategy, max_items):
+        for item, vector in zip(batch, batch_vectors):
+            vectors[id(item)] = vector
+    return [vectors.get(id(item)) for item in items]
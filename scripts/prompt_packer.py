@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+LLM 抽取提示词打包：替代盲目的 text[:3000]。
+在 token 预算内优先保留：
+    1. 简历顶部区域（姓名、求职意向通常在此）；
+    2. 含联系方式的行（很多模板把电话/邮箱放在页脚）；
+    3. 信息量最高的模块（工作/项目/教育等），模板化的声明类文字降权。
+选中的片段按原文顺序拼接，保证 LLM 看到的上下文仍然连贯。
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from scripts.tokens import get_token_counter
+
+PROMPT_PACKING = os.getenv("PROMPT_PACKING", "packed")  # packed | head
+FIELD_PROMPT_TOKEN_BUDGET = int(os.getenv("FIELD_PROMPT_TOKEN_BUDGET", "800"))
+SECTION_PROMPT_TOKEN_BUDGET = int(os.getenv("SECTION_PROMPT_TOKEN_BUDGET", "2400"))
+HEAD_CHARS = 3000   # 旧逻辑：截取前 3000 字符
+TOP_LINES = 8       # 顶部区域固定保留的行数
+
+CONTACT_PATTERN = re.compile(
+    r'(?<!\d)1[3-9]\d{9}(?!\d)|[\w.+-]+@[\w-]+(?:\.[\w-]+)+|电话|手机|邮箱|E-?mail|微信|联系方式',
+    re.IGNORECASE,
+)
+SECTION_HEADER_PATTERN = re.compile(
+    r'^\s*[【\[]?\s*(基本信息|个人信息|求职意向|工作经历|工作经验|实习经历|项目经历|项目经验|教育背景|教育经历|'
+    r'专业技能|技能特长|技能亮点|证书|培训经历|获奖|荣誉|自我评价|个人评价|优势亮点|语言能力)\s*[】\]]?\s*[:：]?\s*$'
+)
+SECTION_WEIGHTS = {
+    "工作": 3.0, "实习": 2.0, "项目": 2.5, "教育": 2.0, "技能": 2.0, "证书": 1.2, "培训": 1.0,
+    "获奖": 1.0, "荣誉": 1.0, "求职": 1.5, "基本": 1.5, "个人信息": 1.5, "优势": 1.2, "评价": 0.6, "语言": 0.8,
+}
+BOILERPLATE_PATTERN = re.compile(r'简历来自|仅供|隐私|请勿|第\s*\d+\s*页|共\s*\d+\s*页|Page\s*\d+|扫码|二维码|下载')
+DATE_PATTERN = re.compile(r'(19|20)\d{2}\s*[./年-]')
+
+
+@dataclass
+class Block:
+    index: int
+    title: str
+    lines: List[str]
+    pinned: bool = False
+    score: float = 0.0
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+@dataclass
+class PackedText:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    kept_blocks: List[str] = field(default_factory=list)
+
+
+# ========= 切块 =========
+def split_blocks(text: str) -> List[Block]:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    blocks: List[Block] = []
+    top = lines[:TOP_LINES]
+    if top:
+        blocks.append(Block(index=0, title="顶部", lines=top, pinned=True))
+
+    current = Block(index=len(blocks), title="正文", lines=[])
+    for line in lines[TOP_LINES:]:
+        if SECTION_HEADER_PATTERN.match(line):
+            if current.lines:
+                blocks.append(current)
+            current = Block(index=len(blocks), title=SECTION_HEADER_PATTERN.match(line).group(1), lines=[line])
+            continue
+        if CONTACT_PATTERN.search(line):
+            # 联系方式单独成块并固定保留
+            if current.lines:
+                blocks.append(current)
+            blocks.append(Block(index=len(blocks), title="联系方式", lines=[line], pinned=True))
+            current = Block(index=len(blocks), title=current.title, lines=[])
+            continue
+        current.lines.append(line)
+    if current.lines:
+        blocks.append(current)
+    return blocks
+
+
+def score_block(block: Block) -> float:
+    """信息量评分：去重字符占比 × 模块权重 + 日期/数字加成，模板声明降权"""
+    text = block.text
+    if not text:
+        return 0.0
+    distinct_ratio = len(set(text)) / len(text)
+    weight = next((w for k, w in SECTION_WEIGHTS.items() if k in block.title), 1.0)
+    dates = len(DATE_PATTERN.findall(text))
+    boilerplate = len(BOILERPLATE_PATTERN.findall(text))
+    return weight * (0.5 + distinct_ratio) + 0.3 * min(dates, 5) - 1.5 * boilerplate
+
+
+# ========= 打包 =========
+def pack_text(text: str, budget_tokens: int, model: Optional[str] = None, mode: Optional[str] = None) -> PackedText:
+    mode = mode or PROMPT_PACKING
+    count = get_token_counter(model)
+    tokens_before = count(text)
+
+    if mode == "head":
+        head = text[:HEAD_CHARS]
+        return PackedText(text=head, tokens_before=tokens_before, tokens_after=count(head), kept_blocks=["head"])
+
+    if tokens_before <= budget_tokens:
+        return PackedText(text=text, tokens_before=tokens_before, tokens_after=tokens_before, kept_blocks=["全文"])
+
+    blocks = split_blocks(text)
+    for b in blocks:
+        b.tokens = count(b.text)
+        b.score = score_block(b)
+
+    chosen, used = [], 0
+    for b in [b for b in blocks if b.pinned]:
+        if used + b.tokens <= budget_tokens:
+            chosen.append(b)
+            used += b.tokens
+
+    # 按「单位 token 信息量」贪心选择剩余模块；放不下的模块截取前若干行
+    rest = sorted([b for b in blocks if not b.pinned], key=lambda b: b.score / max(b.tokens, 1) ** 0.5, reverse=True)
+    for b in rest:
+        if used >= budget_tokens:
+            break
+        if used + b.tokens <= budget_tokens:
+            chosen.append(b)
+            used += b.tokens
+            continue
+        partial, partial_tokens = [], 0
+        for line in b.lines:
+            t = count(line)
+            if used + partial_tokens + t > budget_tokens:
+                break
+            partial.append(line)
+            partial_tokens += t
+        if partial:
+            chosen.append(Block(index=b.index, title=b.title, lines=partial, score=b.score, tokens=partial_tokens))
+            used += partial_tokens
+
+    chosen.sort(key=lambda b: b.index)
+    packed = "\n".join(b.text for b in chosen)
+    return PackedText(text=packed, tokens_before=tokens_before, tokens_after=count(packed), kept_blocks=[b.title for b in chosen])
+
+
+def pack_for_fields(text: str, model: Optional[str] = None, mode: Optional[str] = None) -> PackedText:
+    return pack_text(text, FIELD_PROMPT_TOKEN_BUDGET, model, mode)
+
+
+def pack_for_sections(text: str, model: Optional[str] = None, mode: Optional[str] = None) -> PackedText:
+    return pack_text(text, SECTION_PROMPT_TOKEN_BUDGET, model, mode)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+统一的模型服务客户端：OpenAI / 通义 DashScope / 本地离线向量（local）/ 测试用 fake 共用一套接口。
+    - 每个进程共享一个带连接池的 requests.Session（keep-alive）
+    - 统一的超时与重试策略：连接层只重试连接失败与带 Retry-After 的 429 / 503；
+      其余 429 / 5xx / 超时经 scripts/rate_controller.py 按 provider 自适应降速（AIMD）后重试
+    - embed(texts) 批量向量化（经向量缓存）、chat(messages) 对话补全、cached_chat() 走 LLM 缓存（仅 temperature=0）
+    - EMBEDDING_OVERRIDE=local 只把向量化换成本地后端（对话仍走原服务），用于离线环境与测试
+    - EMBEDDING_DIMENSIONS 指定输出维度（text-embedding-3-*、text-embedding-v3 等支持降维的模型），0 为模型默认
+用法示例：
+    client = get_client("openai")
+    vectors = client.embed(["光学工程师", "销售总监"])
+    content = client.cached_chat("extract_fields", messages, temperature=0, max_tokens=300)
+"""
+
+import hashlib
+import os
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scripts.embedding_cache import get_embedding_cache
+from scripts.llm_cache import cached_completion
+from scripts.rate_controller import get_limiter
+
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "60"))
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+PROVIDER_POOL_SIZE = int(os.getenv("PROVIDER_POOL_SIZE", "16"))
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+DASHSCOPE_BASE_URL = os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/api/v1")
+DASHSCOPE_EMBED_BATCH = int(os.getenv("DASHSCOPE_EMBED_BATCH", "10"))
+FAKE_EMBEDDING_DIM = int(os.getenv("FAKE_EMBEDDING_DIM", "1536"))
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "0"))
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))  # 0：使用模型默认维度
+PROVIDER_OVERRIDE = os.getenv("PROVIDER_OVERRIDE", "")  # 如 fake：测试 / 基准时强制所有调用走指定后端
+EMBEDDING_OVERRIDE = os.getenv("EMBEDDING_OVERRIDE", "")  # 如 local：只替换向量化后端
+
+
+class EmbeddingCacheMiss(Exception):
+    """只读缓存的客户端（CacheOnlyClient）遇到向量缓存中没有的文本"""
+
+
+class ProviderError(Exception):
+    """服务端返回非 2xx（重试耗尽后）或响应结构异常"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# ========= 共享连接池 =========
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class _ConnectRetry(Retry):
+    """只在 429 / 503 且带 Retry-After 时按状态码重试（服务明确给出了等待时间）；其余状态码交给限流器"""
+    RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            # 连接层只重试连接失败（请求尚未发出）和带 Retry-After 的 429 / 503；
+            # 读超时等错误时 POST 可能已被服务端处理，不自动重放，其他 429 / 5xx 由限流器降速后重试
+            retry = _ConnectRetry(
+                total=PROVIDER_MAX_RETRIES,
+                connect=PROVIDER_MAX_RETRIES,
+                read=0,
+                other=0,
+                status=PROVIDER_MAX_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=[],
+                allowed_methods=["GET", "POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=PROVIDER_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 可以是秒数或 HTTP 日期"""
+    if not value:
+        return None
+    if value.replace(".", "", 1).isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def post_json(url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    response = get_session().post(url, json=payload, headers=headers,
+                                  timeout=(PROVIDER_CONNECT_TIMEOUT, PROVIDER_TIMEOUT))
+    if response.status_code >= 400:
+        raise ProviderError(
+            f"{url} 返回 {response.status_code}: {response.text[:300]}",
+            status=response.status_code,
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+        )
+    return response.json()
+
+
+# ========= 后端实现 =========
+class OpenAIBackend:
+    name = "openai"
+    max_batch = 2048
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = OPENAI_BASE_URL):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.base_url = base_url.rstrip("/")
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        payload: Dict[str, Any] = {"model": model, "input": texts}
+        if dimensions:
+            if not supports_dimensions(model):
+                raise ProviderError(f"{model} 不支持 dimensions 参数（请改用 text-embedding-3-small / -large）")
+            payload["dimensions"] = dimensions
+        data = post_json(f"{self.base_url}/embeddings", payload, self._headers())
+        items = sorted(data.get("data", []), key=lambda d: d["index"])
+        if len(items) != len(texts):
+            raise ProviderError(f"OpenAI 返回向量数量不符: {len(items)} != {len(texts)}")
+        return [item["embedding"] for item in items]
+
+    def chat(self, messages: List[Dict[str, Any]], model: str, **params) -> str:
+        payload = dict(params, model=model, messages=messages)
+        data = post_json(f"{self.base_url}/chat/completions", payload, self._headers())
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"OpenAI 响应结构异常: {data}") from e
+
+
+class DashScopeBackend:
+    name = "dashscope"
+    max_batch = DASHSCOPE_EMBED_BATCH
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = DASHSCOPE_BASE_URL):
+        self.api_key = api_key or os.getenv("DASHSCOPE_API_KEY", "")
+        self.base_url = base_url.rstrip("/")
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        url = f"{self.base_url}/services/embeddings/text-embedding/text-embedding"
+        parameters: Dict[str, Any] = {"text_type": "document"}
+        if dimensions:
+            if not supports_dimensions(model):
+                raise ProviderError(f"{model} 不支持 dimension 参数（请改用 text-embedding-v3 及以上）")
+            parameters["dimension"] = dimensions
+        payload = {"model": model, "input": {"texts": texts}, "parameters": parameters}
+        data = post_json(url, payload, self._headers())
+        items = sorted(data.get("output", {}).get("embeddings", []), key=lambda d: d["text_index"])
+        if len(items) != len(texts):
+            raise ProviderError(f"DashScope 返回向量数量不符: {data}")
+        return [item["embedding"] for item in items]
+
+    def chat(self, messages: List[Dict[str, Any]], model: str, **params) -> str:
+        url = f"{self.base_url}/services/aigc/text-generation/generation"
+        payload = {"model": model, "input": {"messages": messages}, "parameters": params}
+        data = post_json(url, payload, self._headers())
+        output = data.get("output", {})
+        if "text" in output:
+            return output["text"] or ""
+        try:
+            return output["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"DashScope 响应结构异常: {data}") from e
+
+
+class FakeBackend:
+    """离线 / 测试 / 基准用：向量由文本哈希确定，对话按提示词类型返回固定内容"""
+    name = "fake"
+    max_batch = 2048
+
+    def __init__(self, dim: int = FAKE_EMBEDDING_DIM, latency_ms: float = FAKE_LATENCY_MS,
+                 responder: Optional[Callable[[List[Dict[str, Any]]], str]] = None):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.responder = responder or self.default_response
+        self.embed_calls = 0
+        self.chat_calls = 0
+
+    def _sleep(self):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        self._sleep()
+        self.embed_calls += 1
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(f"{model}:{text}".encode("utf-8")).digest()[:8], "big")
+            rng = random.Random(seed)
+            # 与真实模型一致：降维结果是完整向量的前 N 维再归一化
+            vec = [rng.gauss(0.0, 1.0) for _ in range(self.dim)][:dimensions or self.dim]
+            norm = sum(v * v for v in vec) ** 0.5 or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+    def chat(self, messages: List[Dict[str, Any]], model: str, **params) -> str:
+        self._sleep()
+        self.chat_calls += 1
+        return self.responder(messages)
+
+    @staticmethod
+    def default_response(messages: List[Dict[str, Any]]) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        if "打分" in prompt:
+            return "50"
+        if "JSON 数组" in prompt:
+            return "[]"
+        if "JSON" in prompt:
+            return '{"姓名": null, "应聘职位": null, "手机号": null, "邮箱": null}'
+        return prompt[:200]
+
+
+class LocalBackend:
+    """离线向量化（scripts/local_embedding.py）：TF-IDF + 随机投影，不支持对话"""
+    name = "local"
+    max_batch = 256
+    remote = False  # 不经过限流器
+
+    def __init__(self, api_key: Optional[str] = None):
+        from scripts.local_embedding import get_local_embedder
+        self.embedder = get_local_embedder()
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        return self.embedder.embed(texts, dimensions).tolist()
+
+    def chat(self, messages: List[Dict[str, Any]], model: str, **params) -> str:
+        raise ProviderError("本地向量后端不支持对话补全")
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "dashscope": DashScopeBackend,
+    "tongyi": DashScopeBackend,
+    "local": LocalBackend,
+    "fake": FakeBackend,
+}
+
+DEFAULT_MODELS = {
+    "openai": (lambda: os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+               lambda: os.getenv("OPENAI_LLM_FIELD_EXTRACT_MODEL", "gpt-3.5-turbo")),
+    "dashscope": (lambda: os.getenv("DASHSCOPE_EMBEDDING_MODEL", "text-embedding-v1"),
+                  lambda: os.getenv("DASHSCOPE_LLM_FIELD_EXTRACT_MODEL", "qwen-plus")),
+    "local": (lambda: os.getenv("LOCAL_EMBEDDING_MODEL", "local-tfidf"), lambda: ""),
+    "fake": (lambda: "fake-embedding", lambda: "fake-chat"),
+}
+
+
+# 支持自定义输出维度的模型前缀（ada-002、text-embedding-v1/v2 输出维度固定）
+DIMENSIONS_MODEL_PREFIXES = ("text-embedding-3", "text-embedding-v3", "text-embedding-v4", "local", "fake")
+
+
+def supports_dimensions(model: str) -> bool:
+    return model.startswith(DIMENSIONS_MODEL_PREFIXES)
+
+
+# ========= 统一客户端 =========
+class ProviderClient:
+    def __init__(self, backend, embedding_model: Optional[str] = None, chat_model: Optional[str] = None,
+                 dimensions: Optional[int] = None, embed_backend=None):
+        self.backend = backend
+        self.embed_backend = embed_backend or backend  # EMBEDDING_OVERRIDE 时与对话后端不同
+        self.provider = self.embed_backend.name
+        self.embedding_model = embedding_model or DEFAULT_MODELS[self.provider][0]()
+        self.chat_model = chat_model or DEFAULT_MODELS[backend.name][1]()
+        self.dimensions = EMBEDDING_DIMENSIONS if dimensions is None else dimensions
+
+    def cache_model_key(self, model: str) -> str:
+        """向量缓存的模型键：不同输出维度的向量分开缓存"""
+        key = f"{self.provider}:{model}"
+        return f"{key}@{self.dimensions}" if self.dimensions else key
+
+    def embed(self, texts: List[str], model: Optional[str] = None, scope: str = "default") -> List[List[float]]:
+        """批量向量化：先查向量缓存，未命中的按后端单次上限自动分批请求，返回顺序与输入一致"""
+        model = model or self.embedding_model
+        return get_embedding_cache().embed(self.cache_model_key(model), texts,
+                                           lambda missing: self._embed_uncached(missing, model), scope=scope)
+
+    def _embed_uncached(self, texts: List[str], model: str) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        step = max(1, self.embed_backend.max_batch)
+        limiter = get_limiter(self.provider, getattr(self.embed_backend, "remote", True))
+        for i in range(0, len(texts), step):
+            batch = texts[i:i + step]
+            vectors.extend(limiter.call(lambda: self.embed_backend.embed(batch, model, self.dimensions or None)))
+        return vectors
+
+    def embed_one(self, text: str, model: Optional[str] = None, scope: str = "default") -> List[float]:
+        return self.embed([text], model, scope)[0]
+
+    def chat(self, messages: List[Dict[str, Any]], model: Optional[str] = None, **params) -> str:
+        limiter = get_limiter(self.backend.name, getattr(self.backend, "remote", True))
+        return limiter.call(lambda: self.backend.chat(messages, model or self.chat_model, **params))
+
+    def cached_chat(self, call_site: str, messages: List[Dict[str, Any]], model: Optional[str] = None,
+                    validate: Optional[Callable[[str], bool]] = None, **params) -> str:
+        model = model or self.chat_model
+        if params.get("temperature", 1) != 0:
+            # 只缓存 temperature=0 的确定性调用；有随机性的回复缓存后会被原样重放
+            return self.chat(messages, model, **params)
+        return cached_completion(call_site, model, messages, params,
+                                 lambda: self.chat(messages, model, **params), validate=validate)
+
+
+# 需要 API Key 的 provider → 环境变量名（local / fake 不需要）
+API_KEY_ENV = {"openai": "OPENAI_API_KEY", "dashscope": "DASHSCOPE_API_KEY", "tongyi": "DASHSCOPE_API_KEY"}
+
+
+def api_key_for(provider: str) -> str:
+    return os.getenv(API_KEY_ENV.get(provider.lower(), ""), "")
+
+
+def missing_credentials(provider: str) -> Optional[str]:
+    """该 provider 实际使用的向量化后端（考虑 PROVIDER_OVERRIDE / EMBEDDING_OVERRIDE）缺少 API Key 时返回环境变量名"""
+    backend = (EMBEDDING_OVERRIDE or PROVIDER_OVERRIDE or provider).lower()
+    env = API_KEY_ENV.get(backend)
+    return env if env and not os.getenv(env) else None
+
+
+def require_api_key(provider: str) -> str:
+    """脚本入口用：只从环境变量读取 API Key，未配置时直接退出并给出变量名（不提供任何写死的默认值）"""
+    missing = missing_credentials(provider)
+    if missing:
+        raise SystemExit(f"❌ 未配置 {missing}：请在环境变量或 .env 中设置后重试")
+    return api_key_for(provider)
+
+
+class CacheOnlyClient:
+    """
+    只读向量缓存的客户端视图：embed() 不请求服务，有未命中的文本时抛 EmbeddingCacheMiss。
+    索引脚本 --dry-run 用它做本地选段，保证预估过程零 embedding 调用。
+    """
+
+    def __init__(self, client: ProviderClient):
+        self.client = client
+        self.provider = client.provider
+        self.embedding_model = client.embedding_model
+        self.dimensions = client.dimensions
+
+    def embed(self, texts: List[str], model: Optional[str] = None, scope: str = "default") -> List[List[float]]:
+        def refuse(missing: List[str]) -> List[List[float]]:
+            raise EmbeddingCacheMiss(f"{len(missing)} 段文本不在向量缓存中")
+
+        model = model or self.embedding_model
+        return get_embedding_cache().embed(self.client.cache_model_key(model), texts, refuse, scope=scope)
+
+    def embed_one(self, text: str, model: Optional[str] = None, scope: str = "default") -> List[float]:
+        return self.embed([text], model, scope)[0]
+
+
+def _make_backend(provider: str, api_key: Optional[str] = None):
+    backend_cls = BACKENDS[provider]
+    return backend_cls() if backend_cls is FakeBackend else backend_cls(api_key=api_key)
+
+
+_clients: Dict[tuple, ProviderClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(provider: Optional[str] = None, api_key: Optional[str] = None,
+               embedding_model: Optional[str] = None, chat_model: Optional[str] = None,
+               dimensions: Optional[int] = None) -> ProviderClient:
+    """
+    按 provider 复用客户端实例；provider 缺省取 EMBEDDING_PROVIDER（默认 openai），PROVIDER_OVERRIDE 优先。
+    dimensions 缺省取 EMBEDDING_DIMENSIONS；设置 EMBEDDING_OVERRIDE 时向量化改走该后端（忽略 embedding_model）。
+    """
+    provider = (PROVIDER_OVERRIDE or provider or os.getenv("EMBEDDING_PROVIDER", "openai")).lower()
+    if provider not in BACKENDS:
+        raise ValueError(f"未知的 provider: {provider}（可选: {', '.join(sorted(BACKENDS))}）")
+    dimensions = EMBEDDING_DIMENSIONS if dimensions is None else dimensions
+    embed_override = EMBEDDING_OVERRIDE.lower()
+    if embed_override:
+        if embed_override not in BACKENDS:
+            raise ValueError(f"未知的 EMBEDDING_OVERRIDE: {embed_override}（可选: {', '.join(sorted(BACKENDS))}）")
+        embedding_model = None
+    key = (provider, api_key, embedding_model, chat_model, dimensions, embed_override)
+    with _clients_lock:
+        if key not in _clients:
+            backend = _make_backend(provider, api_key)
+            embed_backend = _make_backend(embed_override) if embed_override else None
+            _clients[key] = ProviderClient(backend, embedding_model, chat_model, dimensions, embed_backend)
+        return _clients[key]
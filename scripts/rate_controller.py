@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+模型服务的自适应限流（AIMD）：每个 provider 一份并发与速率预算，所有向量化 / 对话请求（索引、抽取、搜索）都经过它。
+    - 成功：并发每轮（约 concurrency 次成功）加 AIMD_INCREASE，速率每秒加 AIMD_RATE_STEP 次/秒，不超过上限
+    - 429 / 5xx / 超时：并发与速率乘以 AIMD_DECREASE（同一波失败只减一次），再按指数退避重试
+    - 响应带 Retry-After 时，该 provider 的所有请求暂停到指定时间之后再发
+    - 起始预算 <PROVIDER>_CONCURRENCY / <PROVIDER>_RPS（如 OPENAI_CONCURRENCY=8、DASHSCOPE_RPS=5），
+      上限为起始值的 RATE_MAX_FACTOR 倍；RATE_CONTROL=off 关闭（只保留重试）
+    - 并发 / 速率的变化写日志，当前值见 /metrics 的 providers 与索引流水线的进度行
+用法示例：
+    vectors = get_limiter("openai").call(lambda: backend.embed(texts, model))
+    limiter_stats()     # {"openai": {"concurrency": 6.0, "rate": 18.2, "in_flight": 3, "throttled": 2, ...}}
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import requests
+
+RATE_CONTROL = os.getenv("RATE_CONTROL", "on").lower() not in ("off", "0", "false")
+RATE_MAX_FACTOR = float(os.getenv("RATE_MAX_FACTOR", "4"))
+RATE_MIN = float(os.getenv("RATE_MIN", "0.2"))  # 次/秒
+AIMD_INCREASE = float(os.getenv("AIMD_INCREASE", "1"))
+AIMD_RATE_STEP = float(os.getenv("AIMD_RATE_STEP", "0.5"))
+AIMD_DECREASE = float(os.getenv("AIMD_DECREASE", "0.5"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# provider → (起始并发, 起始速率 次/秒)
+DEFAULT_BUDGETS = {"openai": (8, 20.0), "dashscope": (4, 5.0), "fake": (64, 1000.0)}
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+def _budget(provider: str):
+    concurrency, rate = DEFAULT_BUDGETS.get(provider, (4, 5.0))
+    prefix = provider.upper()
+    return int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)), float(os.getenv(f"{prefix}_RPS", rate))
+
+
+def is_throttle(error: Exception) -> bool:
+    return getattr(error, "status", None) in RETRY_STATUSES or isinstance(error, requests.Timeout)
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, concurrency: int, rate: float, max_concurrency: Optional[int] = None,
+                 max_rate: Optional[float] = None, retries: int = PROVIDER_MAX_RETRIES):
+        self.name = name
+        self.concurrency = float(max(1, concurrency))
+        self.rate = max(RATE_MIN, rate)
+        self.max_concurrency = max_concurrency or max(1, int(concurrency * RATE_MAX_FACTOR))
+        self.max_rate = max_rate or self.rate * RATE_MAX_FACTOR
+        self.retries = retries
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._next_start = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self.counters = {"requests": 0, "succeeded": 0, "throttled": 0, "failed": 0, "retried": 0, "wait_s": 0.0}
+
+    # ========= 许可 =========
+    def acquire(self):
+        """等待并发名额、速率间隔与 Retry-After 暂停"""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(self.blocked_until - now, self._next_start - now, 0.0)
+                if self.in_flight < int(self.concurrency) and wait <= 0:
+                    self.in_flight += 1
+                    self._next_start = max(now, self._next_start) + 1 / self.rate
+                    self.counters["requests"] += 1
+                    self.counters["wait_s"] += now - started
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, ok: bool, throttled: bool = False, retry_after: Optional[float] = None):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if ok:
+                self.counters["succeeded"] += 1
+                self._increase()
+            elif throttled:
+                self.counters["throttled"] += 1
+                self._decrease(now)
+            else:
+                self.counters["failed"] += 1
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                logger.warning("⏸️ %s 要求 Retry-After %.1fs，暂停发送", self.name, retry_after)
+            self._cond.notify_all()
+
+    def _increase(self):
+        before = int(self.concurrency)
+        self.concurrency = min(self.max_concurrency, self.concurrency + AIMD_INCREASE / self.concurrency)
+        self.rate = min(self.max_rate, self.rate + AIMD_RATE_STEP / self.rate)
+        if int(self.concurrency) > before:
+            logger.info("📈 %s 并发 → %d，速率 %.1f 次/s", self.name, int(self.concurrency), self.rate)
+
+    def _decrease(self, now: float):
+        # 并发请求往往同时失败：距上次减小不足一个请求间隔（至少 1 秒）时只计数不再减
+        if now - self._last_decrease < max(1.0, 1 / self.rate):
+            return
+        self._last_decrease = now
+        before = (self.concurrency, self.rate)
+        self.concurrency = max(1.0, self.concurrency * AIMD_DECREASE)
+        self.rate = max(RATE_MIN, self.rate * AIMD_DECREASE)
+        logger.warning("⚠️ %s 限流 / 服务端错误：并发 %.1f → %.1f，速率 %.1f → %.1f 次/s",
+                       self.name, before[0], self.concurrency, before[1], self.rate)
+
+    # ========= 调用 =========
+    def call(self, fn: Callable[[], T]) -> T:
+        """在预算内执行 fn；429 / 5xx / 超时按 AIMD 降速后重试（有 Retry-After 时按其等待），其他错误直接抛出"""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_throttle(e)
+                retry_after = getattr(e, "retry_after", None)
+                self.release(False, throttled, retry_after)
+                if not throttled or attempt >= self.retries:
+                    raise
+                attempt += 1
+                self.counters["retried"] += 1
+                if not retry_after:
+                    time.sleep(min(0.5 * 2 ** (attempt - 1), 8) * random.uniform(0.8, 1.2))
+                continue
+            self.release(True)
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "concurrency": round(self.concurrency, 2),
+                "max_concurrency": self.max_concurrency,
+                "rate": round(self.rate, 2),
+                "max_rate": round(self.max_rate, 2),
+                "in_flight": self.in_flight,
+                "paused_s": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+                **{k: round(v, 1) if isinstance(v, float) else v for k, v in self.counters.items()},
+            }
+
+
+class UnlimitedLimiter:
+    """本地后端或 RATE_CONTROL=off：不限流，仍按原策略重试 429 / 5xx"""
+
+    def __init__(self, name: str, retries: int = PROVIDER_MAX_RETRIES):
+        self.name = name
+        self.retries = retries
+
+    def call(self, fn: Callable[[], T]) -> T:
+        for attempt in range(self.retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if not is_throttle(e) or attempt >= self.retries:
+                    raise
+                time.sleep(getattr(e, "retry_after", None) or min(0.5 * 2 ** attempt, 8))
+        raise AssertionError("unreachable")
+
+
+_limiters: Dict[str, Any] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, remote: bool = True):
+    """同一进程内每个 provider 共用一个限流器（索引、抽取、搜索共享预算）"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            if remote and RATE_CONTROL:
+                _limiters[provider] = AdaptiveLimiter(provider, *_budget(provider))
+            else:
+                _limiters[provider] = UnlimitedLimiter(provider)
+        return _limiters[provider]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.snapshot() for name, limiter in limiters.items() if isinstance(limiter, AdaptiveLimiter)}
+
+
+def limiter_summary() -> str:
+    """进度行用的简短描述，如“openai 并发 6.0/32 速率 18.2/s 限流 3”；没有限流器时为空"""
+    return " | ".join(f"{name} 并发 {s['concurrency']}/{s['max_concurrency']} 速率 {s['rate']}/s 限流 {s['throttled']}"
+                      for name, s in limiter_stats().items())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+蓝绿重建：换 embedding 模型 / 切分方式 / schema 时，从简历文件完整重建到一个带版本号的新 class，线上集合照常提供搜索，
+校验通过后切换集合注册表指针（scripts/collection_registry.py），ResumeSearcher 下一次查询起使用新集合，不需要删库重灌。
+    1. 目标 class 默认 <Collection>V<年月日时分>（如 CandidatesV202506171530），段落集合同理
+    2. 以子进程运行 index_resumes.py index --variant <indexer>，--collection 指向目标 class（批量写入、增量清单均按目标 class 独立记录），
+       模型 / 维度 / 其他配置经 --model / --dimensions / --set KEY=VALUE 传入；同一集合只由一个 provider 写入，
+       不会出现 OpenAI 与通义向量混在一个 class 中；spool 中还有未补写的对象时索引脚本退出码非零，不做切换
+    3. 校验：线上集合中的每个对象（UUID 由文件名决定）都应出现在目标集合中（允许 --max-missing 个缺失）；
+       随机抽取 --samples 个目标对象，以其内容开头作为查询，自身应出现在前 --top-k 条中（比例不低于 --min-recall）；
+       --query 指定的查询在目标集合中应有结果
+    4. 切换：先把线上集合的沟通记录（notes）合并到目标集合，再切换指针，最后从旧集合补一次切换窗口内新写入的记录
+旧集合保留在 Weaviate 中，可用 collection_registry.py --rollback 切回；确认无误后再用 delete_collections.py 删除。
+用法示例：
+    python scripts/rebuild_collection.py --indexer openai --model text-embedding-3-small --dimensions 512
+    python scripts/rebuild_collection.py --indexer tongyi --chunks --set CHUNK_SIZE=400 --query "光学工程师 Zemax"
+    python scripts/rebuild_collection.py --target CandidatesV202506171530 --skip-index   # 已建好的集合只做校验与切换
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.collection_registry import resolve, switch
+from scripts.index_manifest import scan_collection
+from scripts.provider_client import EMBEDDING_DIMENSIONS, get_client
+from scripts.weaviate_schema import carry_notes, count_objects, get_class
+from scripts.write_spool import WRITE_SPOOL_DIR, WriteSpool
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_CHUNK_COLLECTION = os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks")
+INDEX_SCRIPT = "scripts/index_resumes.py"
+# 索引变体（index_resumes.py --variant）→ (provider, 模型环境变量, 默认模型)
+INDEXERS = {
+    "openai": ("openai", "OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+    "openai_v1": ("openai", "OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+    "tongyi": ("dashscope", "DASHSCOPE_EMBEDDING_MODEL", "text-embedding-v1"),
+    "tongyi_v1": ("dashscope", "DASHSCOPE_EMBEDDING_MODEL", "text-embedding-v1"),
+}
+SAMPLE_QUERY_CHARS = 300
+
+logger = logging.getLogger(__name__)
+
+
+def version_name(logical: str) -> str:
+    return f"{logical}V{time.strftime('%Y%m%d%H%M')}"
+
+
+# ========= 重建 =========
+def run_indexer(indexer: str, target: str, chunk_target: Optional[str], model: str, dimensions: int,
+                overrides: Dict[str, str]) -> int:
+    _, model_env, _ = INDEXERS[indexer]
+    env = dict(os.environ, WEAVIATE_COLLECTION=target, EMBEDDING_DIMENSIONS=str(dimensions), **{model_env: model})
+    command = [sys.executable, str(root_dir / INDEX_SCRIPT), "index", "--variant", indexer, "--collection", target,
+               "--model", model, "--dimensions", str(dimensions)]
+    if chunk_target:
+        env.update(INDEX_MODE="chunk", WEAVIATE_CHUNK_COLLECTION=chunk_target)
+        command += ["--index-mode", "chunk", "--chunk-collection", chunk_target]
+    env.update(overrides)
+    print(f"🏗️ 重建 {target}{f' + {chunk_target}' if chunk_target else ''}: {INDEX_SCRIPT} --variant {indexer}（{model}，"
+          f"{f'{dimensions} 维' if dimensions else '默认维度'}）")
+    return subprocess.run(command, env=env, cwd=str(root_dir)).returncode
+
+
+# ========= 校验 =========
+def object_ids(weaviate_url: str, weaviate_class: str) -> set:
+    if get_class(weaviate_url, weaviate_class) is None:
+        return set()
+    return {obj["id"] for obj in scan_collection(weaviate_url, weaviate_class)}
+
+
+def near_ids(weaviate_url: str, weaviate_class: str, vector: List[float], limit: int) -> List[str]:
+    query = {"query": f"""
+    {{ Get {{ {weaviate_class}(nearVector: {{ vector: {json.dumps(vector)} }}, limit: {limit}) {{
+        _additional {{ id }} }} }} }}"""}
+    res = requests.post(f"{weaviate_url}/v1/graphql", json=query, timeout=60)
+    res.raise_for_status()
+    body = res.json()
+    if body.get("errors"):
+        raise RuntimeError(f"GraphQL 错误：{body['errors']}")
+    return [o["_additional"]["id"] for o in body["data"]["Get"][weaviate_class] or []]
+
+
+def validate(weaviate_url: str, live: str, target: str, client, samples: int = 20, top_k: int = 5,
+             min_recall: float = 0.9, max_missing: int = 0, queries: Optional[List[str]] = None) -> Dict[str, Any]:
+    """数量 + 抽样查询校验，返回报告（ok 为是否可以切换）"""
+    live_ids, target_ids = object_ids(weaviate_url, live), object_ids(weaviate_url, target)
+    missing = live_ids - target_ids
+    report = {"live": live, "target": target, "live_count": len(live_ids), "target_count": len(target_ids),
+              "missing": len(missing), "missing_sample": sorted(missing)[:10], "added": len(target_ids - live_ids)}
+
+    # 自召回：目标对象内容开头作为查询，检验向量与内容对应、索引可用
+    picked = random.Random(len(target_ids)).sample(sorted(target_ids), min(samples, len(target_ids)))
+    hits = 0
+    for obj_id in picked:
+        res = requests.get(f"{weaviate_url}/v1/objects/{target}/{obj_id}", timeout=30)
+        content = (res.json().get("properties") or {}).get("content", "") if res.status_code == 200 else ""
+        if content and obj_id in near_ids(weaviate_url, target, client.embed_one(content[:SAMPLE_QUERY_CHARS],
+                                                                                 scope="query"), top_k):
+            hits += 1
+    report["self_recall"] = round(hits / len(picked), 4) if picked else 0.0
+
+    empty = [q for q in queries or [] if not near_ids(weaviate_url, target, client.embed_one(q, scope="query"), top_k)]
+    report["empty_queries"] = empty
+    report["ok"] = bool(target_ids) and len(missing) <= max_missing and report["self_recall"] >= min_recall \
+        and not empty
+    return report
+
+
+# ========= 沟通记录 =========
+def main():
+    parser = argparse.ArgumentParser(description="蓝绿重建：写入带版本号的新集合，校验后切换注册表指针")
+    parser.add_argument("--indexer", choices=sorted(INDEXERS), default="openai",
+                        help="重建使用的索引变体（index_resumes.py --variant）")
+    parser.add_argument("--model", help="embedding 模型（默认取索引脚本对应的环境变量）")
+    parser.add_argument("--dimensions", type=int, default=EMBEDDING_DIMENSIONS, help="输出维度，0 为模型默认")
+    parser.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    parser.add_argument("--target", help="目标 class 名（默认 <Collection>V<年月日时分>）")
+    parser.add_argument("--chunks", action="store_true", help="同时重建段落集合（INDEX_MODE=chunk）")
+    parser.add_argument("--chunk-collection", default=WEAVIATE_CHUNK_COLLECTION)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="传给索引脚本的环境变量")
+    parser.add_argument("--skip-index", action="store_true", help="目标集合已建好，只做校验与切换")
+    parser.add_argument("--samples", type=int, default=20, help="自召回抽样数")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-recall", type=float, default=0.9, help="自召回比例下限")
+    parser.add_argument("--max-missing", type=int, default=0, help="允许线上集合中有多少对象未出现在目标集合")
+    parser.add_argument("--query", action="append", default=[], help="校验查询（目标集合中应有结果）")
+    parser.add_argument("--no-switch", action="store_true", help="只重建和校验，不切换注册表指针")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    provider, model_env, default_model = INDEXERS[args.indexer]
+    model = args.model or os.getenv(model_env, default_model)
+    overrides = dict(item.split("=", 1) for item in args.set)
+    live = resolve(args.collection)
+    target = args.target or version_name(args.collection)
+    if target == live.class_name:
+        raise SystemExit(f"❌ 目标集合与线上集合相同: {target}")
+    chunk_live = resolve(args.chunk_collection) if args.chunks else None
+    suffix = target[len(args.collection):] if target.startswith(args.collection) else time.strftime("V%Y%m%d%H%M")
+    chunk_target = f"{args.chunk_collection}{suffix}" if args.chunks else None
+
+    if not args.skip_index:
+        if get_class(WEAVIATE_URL, target) is not None:
+            raise SystemExit(f"❌ 目标集合已存在: {target}（只做校验与切换请加 --skip-index，或换一个 --target）")
+        code = run_indexer(args.indexer, target, chunk_target, model, args.dimensions, overrides)
+        if code != 0:
+            raise SystemExit(f"❌ 索引脚本退出码 {code}，线上集合 {live.class_name} 未受影响")
+    else:
+        # 已建好的集合可能还有对象在 spool 中等待补写，补写完之前集合不完整
+        backlog = WriteSpool(overrides.get("WRITE_SPOOL_DIR", WRITE_SPOOL_DIR)).backlog()
+        if backlog and not args.no_switch:
+            raise SystemExit(f"❌ spool 中还有 {backlog} 条对象未写入 Weaviate，先运行 python scripts/write_spool.py flush，"
+                             f"线上集合 {live.class_name} 未受影响")
+
+    client = get_client(provider, embedding_model=model, dimensions=args.dimensions)
+    report = validate(WEAVIATE_URL, live.class_name, target, client, args.samples, args.top_k, args.min_recall,
+                      args.max_missing, args.query)
+    if chunk_target:
+        report["chunk_target"] = chunk_target
+        report["chunk_count"] = count_objects(WEAVIATE_URL, chunk_target) if get_class(WEAVIATE_URL, chunk_target) \
+            else 0
+        report["ok"] = report["ok"] and report["chunk_count"] > 0
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if not report["ok"]:
+        print(f"❌ 校验未通过，未切换；线上仍为 {live.class_name}，目标集合 {target} 保留以便排查")
+        sys.exit(1)
+    if args.no_switch:
+        print(f"👉 校验通过；确认后运行 python scripts/rebuild_collection.py --indexer {args.indexer} --model {model} "
+              f"--target {target} --skip-index{' --chunks' if args.chunks else ''} 切换")
+        return
+
+    carried = carry_notes(WEAVIATE_URL, live.class_name, target)
+    switch(args.collection, target, provider, client.embedding_model, args.dimensions)
+    if chunk_target:
+        switch(args.chunk_collection, chunk_target, provider, client.embedding_model, args.dimensions)
+    # 合并与切换之间写入旧集合的沟通记录
+    carried += carry_notes(WEAVIATE_URL, live.class_name, target)
+    print(f"📝 已迁移 {carried} 位候选人的沟通记录")
+    print(f"🔀 {args.collection}: {live.class_name} → {target}"
+          + (f"，{args.chunk_collection}: {chunk_live.class_name} → {chunk_target}" if chunk_target else ""))
+    print(f"↩️ 回滚：python scripts/collection_registry.py --rollback {args.collection}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+换 embedding 模型 / 输出维度的迁移：用集合中保存的原文（content）重新向量化，写入新集合，校验数量后切换。
+    1. 以当前生效的 class 定义为模板新建目标 class（默认 <Collection>D<维度>），PQ 段数按新维度重新计算
+    2. 游标遍历源集合，按批重新向量化 content，沿用原 UUID 和全部属性（notes 沟通记录不丢失）写入目标集合
+    3. --chunks 时段落集合一并迁移，段落指向候选人的引用改为指向新集合
+    4. 源 / 目标数量一致且没有失败时更新集合注册表指针（scripts/collection_registry.py），
+       ResumeSearcher 下一次查询起使用新集合和新维度；源集合保留，可用 collection_registry.py --rollback 切回
+    5. 切换后按目标清单补一次增量：迁移期间源集合新增 / 内容变化的对象重新向量化，沟通记录合并到目标集合
+迁移期间源集合照常提供搜索；中断后加 --resume 重跑，目标清单中已是新向量标识的对象会跳过。
+池化向量（EMBED_STRATEGY=pooled）依赖全部段落，这里按保存的 content 重新向量化，切换后再跑一次索引脚本即可补齐。
+用法示例：
+    python scripts/reembed_collection.py --model text-embedding-3-small --dimensions 256
+    python scripts/reembed_collection.py --model text-embedding-3-small --dimensions 512 --chunks --no-switch
+    python scripts/reembed_collection.py --provider dashscope --model text-embedding-v3 --dimensions 512 --resume
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.chunk_index import beacon
+from scripts.collection_registry import resolve, switch
+from scripts.embedding_batcher import embed_batch
+from scripts.index_manifest import IndexManifest, content_hash, object_attributes, scan_collection
+from scripts.index_pipeline import run_pipeline
+from scripts.pooled_embedding import embedding_signature
+from scripts.provider_client import BACKENDS, get_client
+from scripts.vector_compression import pq_segments
+from scripts.weaviate_batch import BatchWriter
+from scripts.weaviate_schema import carry_notes, clone_definition, count_objects, create_class, get_class
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_CHUNK_COLLECTION = os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks")
+
+logger = logging.getLogger(__name__)
+
+
+def default_target(collection: str, dimensions: int, model: str) -> str:
+    if dimensions:
+        return f"{collection}D{dimensions}"
+    return collection + "".join(part.capitalize() for part in model.replace("_", "-").split("-") if part.isalnum())
+
+
+def target_definition(definition: Dict[str, Any], target: str, dimensions: int) -> Dict[str, Any]:
+    """沿用源 class 的属性与索引配置；PQ 段数必须整除维度，按新维度重新计算"""
+    new_definition = clone_definition(definition, target)
+    pq = (new_definition.get("vectorIndexConfig") or {}).get("pq") or {}
+    if pq.get("segments") and dimensions:
+        pq["segments"] = pq_segments(dimensions)
+    return new_definition
+
+
+def reembed(weaviate_url: str, logical: str, client, target: Optional[str] = None, parent_class: Optional[str] = None,
+            resume: bool = False, source: Optional[str] = None) -> Dict[str, Any]:
+    """把逻辑集合当前生效的 class（或指定的 source）重新向量化到 target，返回数量校验结果（不切换指针）"""
+    source = source or resolve(logical).class_name
+    definition = get_class(weaviate_url, source)
+    if definition is None:
+        raise SystemExit(f"❌ 集合不存在: {source}")
+    target = target or default_target(logical, client.dimensions, client.embedding_model)
+    if target == source:
+        raise SystemExit(f"❌ 目标集合与当前集合相同: {target}")
+    if get_class(weaviate_url, target) is None:
+        if not create_class(weaviate_url, target_definition(definition, target, client.dimensions)):
+            raise SystemExit(1)
+    elif not resume:
+        raise SystemExit(f"❌ 目标集合已存在: {target}（中断后继续请加 --resume，或换一个 --target）")
+
+    total = count_objects(weaviate_url, source)
+    signature = embedding_signature(client.embedding_model, "truncate", client.dimensions)
+    print(f"📚 {source} → {target}: {total} 条，向量 {client.provider}:{client.embedding_model}"
+          f"（{client.dimensions or '默认'} 维）")
+
+    # 目标集合的索引清单：记录新向量标识，之后的增量索引不会把迁移过的对象当作“需要更新”
+    manifest = IndexManifest(weaviate_url=weaviate_url, weaviate_class=target).load(seed=False)
+
+    def prepare(obj):
+        properties = dict(obj.get("properties") or {})
+        content = properties.get("content") or ""
+        # 候选人对象的哈希带上结构化属性，与索引脚本一致，切换后增量索引不会把它们当作“需要更新”
+        digest = content_hash(content, None if parent_class else object_attributes(properties))
+        entry = manifest.get(obj["id"])
+        if resume and entry and entry["embedding_model"] == signature and entry["content_hash"] == digest:
+            return None
+        if not content.strip():
+            logger.warning("⚠️ 对象没有 content，无法重新向量化: %s", obj["id"])
+            return None
+        if parent_class and properties.get("candidate"):
+            # 段落对象：引用改为指向迁移后的候选人集合
+            parent_ids = [ref["beacon"].rsplit("/", 1)[-1] for ref in properties["candidate"]]
+            properties["candidate"] = [{"beacon": beacon(parent_class, parent_id)} for parent_id in parent_ids]
+        return {"id": obj["id"], "properties": properties, "content": content, "digest": digest}
+
+    def embed_records(batch):
+        return embed_batch(client, [record["content"] for record in batch])
+
+    records: Dict[str, Dict[str, Any]] = {}
+
+    def on_written(obj_id: str):
+        record = records.pop(obj_id)
+        manifest.record(obj_id, record["properties"].get("filename", ""), embedding_model=signature,
+                        digest=record["digest"])
+
+    def write_records(batch, vectors):
+        for record, vector in zip(batch, vectors):
+            records[record["id"]] = record
+            writer.add(record["id"], record["properties"], vector)
+
+    writer = BatchWriter(weaviate_url=weaviate_url, weaviate_class=target, on_success=on_written)
+    with writer:
+        stats = run_pipeline(scan_collection(weaviate_url, source), prepare, embed_records, write_records,
+                             report=logger.info)
+    print(f"📊 {writer.report()}")
+
+    copied = count_objects(weaviate_url, target)
+    ok = copied == total and writer.stats.failed == 0 and stats.embed_failed == 0 and not stats.interrupted
+    print(f"{'✅' if ok else '❌'} {logical}: 源 {total} 条，目标 {copied} 条，"
+          f"向量化失败 {stats.embed_failed} 条，写入失败 {writer.stats.failed} 条")
+    return {"collection": logical, "source": source, "target": target, "ok": ok,
+            "source_count": total, "target_count": copied}
+
+
+def reembed_delta(weaviate_url: str, result: Dict[str, Any], client, parent_class: Optional[str] = None) -> int:
+    """
+    切换指针后补齐迁移期间写入旧集合的变化：按目标清单增量重新向量化新增 / 内容变化的对象（同 --resume），
+    再合并沟通记录；返回合并了沟通记录的对象数
+    """
+    reembed(weaviate_url, result["collection"], client, result["target"], parent_class=parent_class, resume=True,
+            source=result["source"])
+    return carry_notes(weaviate_url, result["source"], result["target"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新向量化到新集合（换模型 / 维度），校验后切换")
+    parser.add_argument("--provider", default=os.getenv("EMBEDDING_PROVIDER", "openai"))
+    parser.add_argument("--model", required=True, help="新的 embedding 模型，如 text-embedding-3-small")
+    parser.add_argument("--dimensions", type=int, default=0, help="输出维度，0 为模型默认")
+    parser.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    parser.add_argument("--target", help="目标 class 名（默认 <Collection>D<维度>）")
+    parser.add_argument("--chunks", action="store_true", help="段落集合（INDEX_MODE=chunk）一并迁移")
+    parser.add_argument("--chunk-collection", default=WEAVIATE_CHUNK_COLLECTION)
+    parser.add_argument("--resume", action="store_true", help="目标集合已存在时继续写入，跳过已迁移的对象")
+    parser.add_argument("--no-switch", action="store_true", help="只迁移和校验，不切换注册表指针")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    client = get_client(args.provider, embedding_model=args.model, dimensions=args.dimensions)
+    provider = BACKENDS[args.provider.lower()].name  # 注册表记录 openai / dashscope（PROVIDER_OVERRIDE 不影响）
+    results = [reembed(WEAVIATE_URL, args.collection, client, args.target, resume=args.resume)]
+    if args.chunks:
+        chunk_target = default_target(args.chunk_collection, args.dimensions, args.model)
+        results.append(reembed(WEAVIATE_URL, args.chunk_collection, client, chunk_target,
+                               parent_class=results[0]["target"], resume=args.resume))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if not all(r["ok"] for r in results):
+        print("❌ 校验未通过，未切换；修复后加 --resume 重跑")
+        sys.exit(1)
+    if args.no_switch:
+        print("👉 校验通过；确认后去掉 --no-switch 加 --resume 重跑即可切换")
+        return
+    for result in results:
+        switch(result["collection"], result["target"], provider, client.embedding_model, client.dimensions)
+        print(f"🔀 {result['collection']}: {result['source']} → {result['target']}"
+              f"（回滚：python scripts/collection_registry.py --rollback {result['collection']}）")
+    # 迁移与切换之间写入旧集合的对象和沟通记录
+    carried = reembed_delta(WEAVIATE_URL, results[0], client)
+    if args.chunks:
+        reembed_delta(WEAVIATE_URL, results[1], client, parent_class=results[0]["target"])
+    print(f"📝 已补齐迁移期间的写入，合并 {carried} 位候选人的沟通记录")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+从简历抽取类型化属性：工作年限（数值）、最高学历（枚举 + 等级）、所在城市、最近任职公司。
+字段提取结果（LLM 输出的“工作年限 / 最高学历 / 所在城市 / 最近公司”）合法时优先使用，否则按模块文本规则推断：
+    - 工作年限：原文自述（“8年工作经验”“工作年限：5年”）→ 工作经历模块中各段起止时间的并集（重叠不重复计算，
+      “至今”按索引时的月份计；该值随时间变化，不参与索引清单的内容哈希，见 index_manifest.TIME_RELATIVE_PROPERTIES，
+      由 index_resumes.py refresh-years 定期刷新）
+    - 最高学历：教育背景模块（没有模块标题时为含学校 / 学历字样的行）中出现的最高学历
+    - 所在城市：“现居住地 / 所在城市 / 期望城市”等标注行，统一为不带“省 / 市”的城市名
+    - 最近公司：结束时间最晚（“至今”最晚）的一段工作经历中的单位名称
+结果只包含能确定的属性，未知的不写入（Weaviate 中为 null，不会被范围过滤命中）。
+用法示例：
+    typed_attributes(fields, body)   # {"years_experience": 6.5, "degree": "硕士", "degree_rank": 6, "city": "深圳", ...}
+    degree_rank("本科")                    # 5
+    python scripts/resume_attributes.py data/resumes_extract_enhanced/张三_光学工程师_1a2b3c4d.txt
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.prompt_packer import split_blocks
+
+DEGREES = ["初中", "高中", "中专", "大专", "本科", "硕士", "博士"]  # 等级 = 下标 + 1
+# 英文学历只在独立成词且带学位语境时识别（"Scrum Master"、"Doctor 医生" 不是学历）；整个值就是学位名时也识别。
+# 中文与英文相邻时 \b 不成立，用字母前后断言代替
+_EN = r"(?<![A-Za-z])(?:{})(?![A-Za-z])"
+_DEGREE_CONTEXT = r"'?s?\s+(?:of|degree|in)"
+DEGREE_ALIASES = [
+    (re.compile(r"博士|" + _EN.format(r"ph\.?\s*d|d\.?phil|doctorate|doctor" + _DEGREE_CONTEXT) + r"|^doctor$",
+                re.IGNORECASE), "博士"),
+    (re.compile(r"硕士|研究生|" + _EN.format(r"e?m\.?b\.?a|master" + _DEGREE_CONTEXT) + r"|^masters?$",
+                re.IGNORECASE), "硕士"),
+    (re.compile(r"本科|学士|" + _EN.format(r"bachelor" + _DEGREE_CONTEXT) + r"|^bachelor'?s?$", re.IGNORECASE), "本科"),
+    (re.compile(r"大专|专科|高职|" + _EN.format(r"associate" + _DEGREE_CONTEXT) + r"|^associate$", re.IGNORECASE),
+     "大专"),
+    (re.compile(r"中专|中技|技校|职高"), "中专"),
+    (re.compile(r"高中"), "高中"),
+    (re.compile(r"初中"), "初中"),
+]
+MAJOR_CITIES = [
+    "北京", "上海", "广州", "深圳", "杭州", "南京", "苏州", "成都", "重庆", "武汉", "西安", "天津", "长沙", "郑州",
+    "东莞", "佛山", "宁波", "青岛", "合肥", "无锡", "厦门", "福州", "济南", "大连", "沈阳", "昆明", "珠海", "中山",
+    "惠州", "常州", "南昌", "贵阳", "南宁", "石家庄", "太原", "哈尔滨", "长春", "香港", "澳门", "台北",
+]
+
+DATE = r"((?:19|20)\d{2})\s*(?:[./年-]\s*(\d{1,2}))?\s*月?"
+DATE_RANGE = re.compile(DATE + r"\s*(?:-|–|—|~|～|至|到)+\s*(?:" + DATE + r"|(至今|现在|今|present|now))", re.IGNORECASE)
+STATED_YEARS = re.compile(r"(\d{1,2}(?:\.\d)?)\s*年(?:以上)?(?:的)?(?:工作|从业|相关|行业)?经验|"
+                          r"(?:工作|从业)年限\s*[:：]?\s*(\d{1,2}(?:\.\d)?)\s*年")
+CITY_LINE = re.compile(r"(?:现居住?地?|居住地|所在地|所在城市|现居城市|现所在地|期望(?:工作)?(?:城市|地点))\s*[:：]\s*([^\s|,，;；]+)")
+COMPANY = re.compile(r"([一-龥A-Za-z0-9（）()&·]{2,40}?(?:有限责任公司|有限公司|股份公司|公司|集团|研究院|研究所|"
+                     r"银行|医院|事务所|工作室|中心))")
+EDUCATION_LINE = re.compile(r"大学|学院|学校|学历|学位|University|College", re.IGNORECASE)
+UNKNOWN = {"", "null", "none", "未知", "无", "暂无", "不详"}
+
+
+def _known(value: Any) -> Optional[str]:
+    text = "" if value is None else str(value).strip()
+    return None if text.lower() in UNKNOWN else text
+
+
+# ========= 学历 =========
+def normalize_degree(value: Any) -> Optional[str]:
+    """学历文本 → DEGREES 中的枚举值；多个学历时取最高"""
+    text = _known(value)
+    if not text:
+        return None
+    for pattern, degree in DEGREE_ALIASES:  # 从高到低
+        if pattern.search(text):
+            return degree
+    return None
+
+
+def degree_rank(value: Any) -> Optional[int]:
+    degree = normalize_degree(value)
+    return DEGREES.index(degree) + 1 if degree else None
+
+
+# ========= 城市 =========
+def normalize_city(value: Any) -> Optional[str]:
+    """“广东省深圳市南山区” → “深圳”；多个城市时取第一个"""
+    text = _known(value)
+    if not text:
+        return None
+    text = re.split(r"[，,、/|;；\s]+", text)[0]
+    text = re.sub(r"^.*?(?:省|自治区|特别行政区)", "", text) or text
+    text = re.sub(r"(?:市|地区|自治州).*$", "", text)
+    return text or None
+
+
+# ========= 工作经历 =========
+def _month(year: str, month: Optional[str]) -> int:
+    return int(year) * 12 + max(1, min(12, int(month or 1))) - 1
+
+
+def date_ranges(text: str) -> List[Tuple[int, int, int]]:
+    """文本中的起止时间 → [(起始月序号, 结束月序号, 匹配结束位置)]，“至今”为当前月"""
+    now = time.localtime()
+    current = now.tm_year * 12 + now.tm_mon - 1
+    ranges = []
+    for m in DATE_RANGE.finditer(text):
+        start = _month(m.group(1), m.group(2))
+        end = current if m.group(5) else _month(m.group(3), m.group(4))
+        if start <= end <= current:
+            ranges.append((start, end, m.end()))
+    return ranges
+
+
+def work_lines(text: str) -> List[str]:
+    """工作经历模块的行；没有模块标题时为全文中不像教育经历的行"""
+    blocks = split_blocks(text)
+    work = [line for b in blocks if "工作" in b.title for line in b.lines]
+    if work:
+        return work
+    skip = ("教育", "项目", "培训", "实习")
+    return [line for b in blocks if not any(k in b.title for k in skip)
+            for line in b.lines if not EDUCATION_LINE.search(line)]
+
+
+def years_from_ranges(lines: List[str]) -> Optional[float]:
+    """各段工作时间的并集（月），换算为年，保留 1 位小数"""
+    spans = sorted((start, end + 1) for line in lines for start, end, _ in date_ranges(line))
+    if not spans:
+        return None
+    months, cur_start, cur_end = 0, *spans[0]
+    for start, end in spans[1:]:
+        if start > cur_end:
+            months += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    months += cur_end - cur_start
+    return round(months / 12, 1)
+
+
+def parse_years(value: Any) -> Optional[float]:
+    text = _known(value)
+    match = re.search(r"\d+(?:\.\d+)?", text or "")
+    if not match:
+        return None
+    years = float(match.group())
+    return years if 0 <= years <= 60 else None
+
+
+def recent_company(lines: List[str]) -> Optional[str]:
+    """结束时间最晚的工作经历所在行（或紧随其后的一行）中的单位名称"""
+    best, best_end = None, -1
+    for i, line in enumerate(lines):
+        for _, end, pos in date_ranges(line):
+            match = COMPANY.search(line[pos:]) or COMPANY.search(line) or \
+                (COMPANY.search(lines[i + 1]) if i + 1 < len(lines) else None)
+            if match and end > best_end:
+                best, best_end = match.group(1).strip("（）() "), end
+    return best
+
+
+# ========= 汇总 =========
+def typed_attributes(fields: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """写入 Weaviate 的类型化属性；只返回能确定的值"""
+    lines = work_lines(text)
+    stated = STATED_YEARS.search(text)
+    years = parse_years(fields.get("工作年限"))
+    if years is None and stated:
+        years = parse_years(stated.group(1) or stated.group(2))
+    if years is None:
+        years = years_from_ranges(lines)
+
+    degree = normalize_degree(fields.get("最高学历"))
+    if degree is None:
+        education = [line for b in split_blocks(text) if "教育" in b.title for line in b.lines]
+        # 没有教育模块时只看像教育经历的行，避免“Scrum Master 认证”之类的行被当成学历
+        education = education or [line for line in text.splitlines() if EDUCATION_LINE.search(line)]
+        found = [normalize_degree(line) for line in education]
+        found = [d for d in found if d]
+        degree = max(found, key=DEGREES.index) if found else None
+
+    city = normalize_city(fields.get("所在城市"))
+    if city is None:
+        match = CITY_LINE.search(text)
+        city = normalize_city(match.group(1)) if match else None
+
+    company = _known(fields.get("最近公司")) or recent_company(lines)
+
+    attributes = {
+        "years_experience": years,
+        "degree": degree,
+        "degree_rank": DEGREES.index(degree) + 1 if degree else None,
+        "city": city,
+        "recent_company": company,
+    }
+    return {k: v for k, v in attributes.items() if v is not None}
+
+
+def main():
+    from scripts.candidate_schema import parse_fields
+
+    for path in sys.argv[1:]:
+        text = Path(path).read_text(encoding="utf-8")
+        print(f"📄 {Path(path).name}: {json.dumps(typed_attributes(parse_fields(text), text), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
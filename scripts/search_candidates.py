@@ -9,10 +9,10 @@ import json
 import re
 import time
 import logging
+import threading
 import requests
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
-from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dotenv import load_dotenv
 
 # ✅ 加载 .env
@@ -21,33 +21,113 @@ load_dotenv()
 # ✅ 环境变量
 WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
 WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_CHUNK_COLLECTION = os.getenv("WEAVIATE_CHUNK_COLLECTION", "CandidateChunks")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
 TOP_K = int(os.getenv("DEFAULT_TOP_K", "5"))
 CERTAINTY = float(os.getenv("SEARCH_CERTAINTY", "0.75"))
 SUMMARY_LENGTH = int(os.getenv("SUMMARY_LENGTH", "200"))
-EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "100"))
+SEARCH_INDEX_MODE = os.getenv("SEARCH_INDEX_MODE", "single")  # single | chunk（段落级索引，按候选人聚合）
+# 降级检索：向量服务不可用时改用本地离线向量（scripts/local_embedding.py）查询该集合，留空则不降级。
+# 集合用 reembed_collection.py --provider local --model local-tfidf --target CandidatesLocal --no-switch 生成
+SEARCH_FALLBACK_COLLECTION = os.getenv("SEARCH_FALLBACK_COLLECTION", "")
+# 索引时写入的类型化属性（scripts/resume_attributes.py）→ 结果中的字段名
+ATTRIBUTE_FIELDS = {"years_experience": "工作年限", "degree": "学历", "city": "城市", "recent_company": "最近公司"}
 
 # ✅ 日志设置
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# ✅ OpenAI Client
-from openai import OpenAI
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# ✅ 统一 Provider Client（OpenAI）
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+from scripts.provider_client import EMBEDDING_DIMENSIONS, api_key_for, get_client, missing_credentials
+from scripts.collection_registry import resolve
+from scripts.chunk_index import CHUNK_AGGREGATION, search_chunks
+from scripts.candidate_schema import build_where, class_properties, graphql_where, where_properties
+from scripts.hybrid_search import (HYBRID_ALPHA, SEARCH_MODE, SEARCH_MODES, additional_fields, hit_score,
+                                   search_clause)
+client = get_client("openai", api_key=OPENAI_API_KEY, embedding_model=EMBEDDING_MODEL)
 
 def is_uuid_like(s: str) -> bool:
     return re.match(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$", s) is not None
 
 class ResumeSearcher:
-    def __init__(self, weaviate_url, weaviate_class, openai_client, embedding_model):
+    def __init__(self, weaviate_url=WEAVIATE_URL, weaviate_class=None, client=None, embedding_model=None,
+                 index_mode=SEARCH_INDEX_MODE, chunk_class=None, aggregation=CHUNK_AGGREGATION):
         self.weaviate_url = weaviate_url
         self.weaviate_class = weaviate_class
-        self.openai_client = openai_client
+        self.client = client
         self.embedding_model = embedding_model
-        print(f"🔧 当前使用 OpenAI 模型: {self.embedding_model}")
+        self.index_mode = index_mode
+        self.chunk_class = chunk_class
+        self.aggregation = aggregation
+        # 未指定 class 时跟随集合注册表：指针切换（如换维度迁移）后下一次查询自动生效，无需重启
+        self.follow_registry = weaviate_class is None
+        self._target = None
+        self._rejected = None  # 因缺少凭据未能切换到的注册表条目（只提示一次）
+        self._target_lock = threading.Lock()
+        self._properties: Dict[str, Set[str]] = {}  # class -> 已声明的属性（决定可取的字段与可用的过滤条件）
+        self.refresh_target()
+        print(f"🔧 当前使用 {self.client.provider} 模型: {self.embedding_model}")
         logger.info("🔍 初始化 ResumeSearcher")
 
+    def refresh_target(self):
+        """
+        按集合注册表更新物理 class 以及查询向量的 provider / 模型 / 维度（注册表未变化时只比较一次 mtime）。
+        新集合的 provider 缺少 API Key 时拒绝切换，继续查询原集合（启动时则直接报错）。
+        """
+        if not self.follow_registry:
+            self.client = self.client or client
+            self.embedding_model = self.embedding_model or self.client.embedding_model
+            self.chunk_class = self.chunk_class or resolve(WEAVIATE_CHUNK_COLLECTION).class_name
+            return
+        target = (resolve(WEAVIATE_CLASS), resolve(WEAVIATE_CHUNK_COLLECTION))
+        with self._target_lock:
+            if target in (self._target, self._rejected):
+                return
+            parent, chunks = target
+            provider = parent.provider or "openai"
+            if parent.embedding_model:
+                model, dimensions = parent.embedding_model, parent.dimensions
+            else:
+                model, dimensions = EMBEDDING_MODEL if provider == "openai" else None, EMBEDDING_DIMENSIONS
+            missing = missing_credentials(provider)
+            if missing and parent.provider:
+                message = f"集合 {parent.class_name} 由 {provider}/{model} 向量化，但未配置 {missing}，无法生成查询向量"
+                if self._target is None:
+                    raise RuntimeError(message)
+                logger.error("❌ %s，拒绝切换，继续使用 %s", message, self.weaviate_class)
+                self._rejected = target
+                return
+            if self._target is not None:
+                logger.info("🔀 集合已切换: %s → %s（%s/%s，%s）", self.weaviate_class, parent.class_name, provider,
+                            model, f"{dimensions} 维" if dimensions else "默认维度")
+            self.weaviate_class = parent.class_name
+            self.chunk_class = chunks.class_name
+            self.client = get_client(provider, api_key=api_key_for(provider), embedding_model=model,
+                                     dimensions=dimensions)
+            self.embedding_model = self.client.embedding_model
+            self._properties.clear()
+            self._target = target
+
+    def properties_of(self, weaviate_class: str, refresh: bool = False) -> Set[str]:
+        if refresh or weaviate_class not in self._properties:
+            self._properties[weaviate_class] = class_properties(self.weaviate_url, weaviate_class)
+        return self._properties[weaviate_class]
+
+    def build_filter(self, filters: Optional[Dict[str, Any]], weaviate_class: str) -> Optional[Dict[str, Any]]:
+        """过滤条件 → where；集合缺少对应属性（尚未用新版索引脚本补齐）时报错，而不是静默返回空结果"""
+        where = build_where(filters)
+        missing = where_properties(where) - self.properties_of(weaviate_class)
+        if missing:
+            # 缓存可能早于索引脚本补齐属性，重新读取一次 schema
+            missing = where_properties(where) - self.properties_of(weaviate_class, refresh=True)
+        if missing:
+            raise ValueError(f"集合 {weaviate_class} 没有可过滤属性: {', '.join(sorted(missing))}（请先运行索引脚本补齐）")
+        return where
+
     @staticmethod
     def format_summary(content: str) -> str:
         if not content:
@@ -64,21 +144,50 @@ class ResumeSearcher:
             job_title = match.group(2)
         return name, job_title
 
-    @lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+    @classmethod
+    def name_and_position(cls, obj: Dict[str, Any]) -> Tuple[str, str]:
+        """优先取索引时写入的 name / position 属性，旧对象没有时按文件名解析"""
+        name, job_title = cls.parse_filename(obj.get("filename") or "")
+        return obj.get("name") or name, obj.get("position") or job_title
+
+    @staticmethod
+    def attribute_fields(obj: Dict[str, Any]) -> Dict[str, Any]:
+        return {label: obj[prop] for prop, label in ATTRIBUTE_FIELDS.items() if obj.get(prop) not in (None, "")}
+
+    @staticmethod
+    def mode_label(mode: str, alpha: Optional[float]) -> str:
+        if mode == "hybrid":
+            return f"hybrid（alpha={HYBRID_ALPHA if alpha is None else alpha}）"
+        return mode
+
     def get_embedding(self, text: str) -> List[float]:
         try:
-            response = self.openai_client.embeddings.create(
-                input=[text],
-                model=self.embedding_model
-            )
-            return response.data[0].embedding
+            return self.client.embed_one(text, self.embedding_model, scope="query")
         except Exception as e:
             logger.error(f"❌ 获取向量失败: {e}")
             raise
 
-    def search(self, query: str) -> Dict[str, Any]:
+    def get_query_embedding(self, query: str) -> Tuple[List[float], str]:
+        """返回 (查询向量, 要查询的 class)；向量服务失败且配置了降级集合时改用本地向量"""
+        try:
+            return self.get_embedding(query), self.weaviate_class
+        except Exception:
+            if not SEARCH_FALLBACK_COLLECTION or self.index_mode == "chunk":
+                raise
+        logger.warning("⚠️ 向量服务不可用，降级为本地向量检索: %s", SEARCH_FALLBACK_COLLECTION)
+        local = get_client("local", dimensions=0)
+        return local.embed_one(query, scope="query"), SEARCH_FALLBACK_COLLECTION
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None, mode: Optional[str] = None,
+               alpha: Optional[float] = None) -> Dict[str, Any]:
+        """filters 见 scripts/candidate_schema.py 的 FILTERS，在 Weaviate 内先过滤再做向量检索（UUID 精确查找时忽略）；
+        mode 为 vector / keyword / hybrid（默认 SEARCH_MODE），alpha 为混合检索中向量得分的权重（默认 HYBRID_ALPHA）"""
         start_time = time.time()
-        logger.info(f"开始处理查询: {query}")
+        mode = mode or SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"不支持的检索模式: {mode}（可选: {', '.join(SEARCH_MODES)}）")
+        logger.info(f"开始处理查询: {query}（{mode}）" + (f"，过滤条件: {filters}" if filters else ""))
+        self.refresh_target()
 
         try:
             # ✅ 如果是 UUID 直接用 REST API 查询
@@ -88,7 +197,7 @@ class ResumeSearcher:
                 res = requests.get(url)
                 if res.status_code == 200:
                     obj = res.json().get("properties", {})
-                    name, job_title = self.parse_filename(obj.get("filename", ""))
+                    name, job_title = self.name_and_position(obj)
                     elapsed = time.time() - start_time
                     return {
                         "查询": query,
@@ -98,6 +207,7 @@ class ResumeSearcher:
                             "UUID": query,
                             "姓名": name,
                             "应聘职位": job_title,
+                            **self.attribute_fields(obj),
                             "文件名": obj.get("filename", ""),
                             "匹配度": "100.0%",
                             "简历摘要": self.format_summary(obj.get("content", "")),
@@ -108,25 +218,36 @@ class ResumeSearcher:
                 else:
                     return {"查询": query, "候选人数量": 0, "候选人列表": []}
 
-            # ✅ 否则执行向量搜索
-            embedding = self.get_embedding(query)
+            # ✅ 否则执行向量 / 关键词 / 混合搜索（关键词检索不需要查询向量）
+            if mode == "keyword":
+                embedding, weaviate_class = None, self.weaviate_class
+            else:
+                embedding, weaviate_class = self.get_query_embedding(query)
+            if self.index_mode == "chunk":
+                return self.search_by_chunks(query, embedding, start_time, filters, mode, alpha)
+            degraded = weaviate_class != self.weaviate_class
+            # certainty 阈值只对向量检索有意义；本地向量的相似度整体偏低，降级检索也不套用
+            certainty = CERTAINTY if mode == "vector" and not degraded else None
+            clause = search_clause(mode, query, embedding, certainty, **({} if alpha is None else {"alpha": alpha}))
+            where = self.build_filter(filters, weaviate_class)
+            where_clause = f"where: {graphql_where(where)}," if where else ""
+            available = self.properties_of(weaviate_class)
+            fields = " ".join(p for p in ("name", "position", *ATTRIBUTE_FIELDS) if p in available)
             graphql_query = {
                 "query": f"""
                 {{
                   Get {{
-                    {self.weaviate_class}(
-                      nearVector: {{
-                        vector: {json.dumps(embedding)},
-                        certainty: {CERTAINTY}
-                      }},
+                    {weaviate_class}(
+                      {clause},
+                      {where_clause}
                       limit: {TOP_K}
                     ) {{
                       filename
                       content
                       notes
+                      {fields}
                       _additional {{
-                        id
-                        distance
+                        {additional_fields(mode)}
                       }}
                     }}
                   }}
@@ -137,24 +258,31 @@ class ResumeSearcher:
             res = requests.post(f"{self.weaviate_url}/v1/graphql", json=graphql_query)
             if res.status_code != 200:
                 raise Exception(f"GraphQL 请求失败：{res.status_code} - {res.text}")
+            body = res.json()
+            if body.get("errors"):
+                raise Exception(f"GraphQL 错误：{body['errors']}")
 
-            results = res.json()["data"]["Get"][self.weaviate_class]
+            results = body["data"]["Get"][weaviate_class] or []
+            # BM25 得分没有上界，匹配度按相对第一名的比例给出，原始得分另列；混合检索的融合得分在 0~1 之间
+            scores = [hit_score(mode, obj.get("_additional", {})) for obj in results]
+            top_score = max(scores, default=0.0) or 1.0
             candidates = []
-            for obj in results:
+            for obj, score in zip(results, scores):
                 content = obj.get("content", "")
                 filename = obj.get("filename", "")
                 notes = obj.get("notes", [])
                 additional = obj.get("_additional", {})
-                distance = additional.get("distance", 1.0)
-                certainty = (1 - float(distance)) * 100
+                match = (score / top_score if mode == "keyword" else score) * 100
 
-                name, job_title = self.parse_filename(filename)
+                name, job_title = self.name_and_position(obj)
                 candidates.append({
                     "UUID": additional.get("id", "未知"),
                     "姓名": name,
                     "应聘职位": job_title,
+                    **self.attribute_fields(obj),
                     "文件名": filename,
-                    "匹配度": f"{certainty:.1f}%",
+                    "匹配度": f"{match:.1f}%",
+                    **({"关键词得分": round(score, 4)} if mode == "keyword" else {}),
                     "简历摘要": self.format_summary(content),
                     "沟通记录": notes if notes else [],
                     "简历内容": content,
@@ -163,17 +291,71 @@ class ResumeSearcher:
             candidates.sort(key=lambda x: float(x["匹配度"].rstrip("%")), reverse=True)
             elapsed = time.time() - start_time
 
-            return {
+            result = {
                 "查询": query,
                 "候选人数量": len(candidates),
                 "处理时间": f"{elapsed:.2f}秒",
                 "候选人列表": candidates
             }
+            if filters:
+                result["过滤条件"] = filters
+            if mode != "vector":
+                result["检索模式"] = self.mode_label(mode, alpha)
+            if degraded:
+                result["降级"] = f"向量服务不可用，已使用本地向量检索 {weaviate_class}"
+            return result
 
         except Exception as e:
             logger.error(f"❌ 搜索失败: {e}")
             raise
 
+    def search_by_chunks(self, query: str, embedding: Optional[List[float]], start_time: float,
+                         filters: Optional[Dict[str, Any]] = None, mode: str = "vector",
+                         alpha: Optional[float] = None) -> Dict[str, Any]:
+        """段落级索引：按段落召回，按候选人聚合（max / sum），摘要取最佳匹配段落；过滤条件经 candidate 引用作用于候选人属性"""
+        self.build_filter(filters, self.weaviate_class)
+        where = build_where(filters, path_prefix=["candidate", self.weaviate_class])
+        # 候选人属性经 candidate 引用在段落查询中一并取回，不再逐个 GET 父对象
+        available = self.properties_of(self.weaviate_class)
+        parent_properties = ["content", "notes",
+                             *(p for p in ("name", "position", *ATTRIBUTE_FIELDS) if p in available)]
+        groups = search_chunks(self.weaviate_url, embedding, certainty=CERTAINTY, aggregation=self.aggregation,
+                               chunk_class=self.chunk_class, parent_class=self.weaviate_class, where=where,
+                               mode=mode, query=query, alpha=alpha, parent_properties=parent_properties)
+        top_score = max((g["chunks"][0]["score"] for g in groups), default=0.0) or 1.0
+        candidates = []
+        for group in groups[:TOP_K]:
+            obj = group["properties"]
+            filename = obj.get("filename") or group["filename"]
+            name, job_title = self.name_and_position(dict(obj, filename=filename))
+            best = group["chunks"][0]
+            candidates.append({
+                "UUID": group["uuid"],
+                "姓名": name,
+                "应聘职位": job_title,
+                **self.attribute_fields(obj),
+                "文件名": filename,
+                "匹配度": f"{(best['score'] / top_score if mode == 'keyword' else best['score']) * 100:.1f}%",
+                "聚合得分": round(group["score"], 4),
+                "命中段落数": len(group["chunks"]),
+                "简历摘要": self.format_summary(best["content"]),
+                "沟通记录": obj.get("notes") or [],
+                "简历内容": obj.get("content", ""),
+            })
+
+        elapsed = time.time() - start_time
+        result = {
+            "查询": query,
+            "候选人数量": len(candidates),
+            "处理时间": f"{elapsed:.2f}秒",
+            "候选人列表": candidates
+        }
+        if filters:
+            result["过滤条件"] = filters
+        if mode != "vector":
+            result["检索模式"] = self.mode_label(mode, alpha)
+        return result
+
 def main():
     query = ""
     if len(sys.argv) > 1:
@@ -190,7 +372,7 @@ def main():
 
     print(f"搜索关键词: {query}")
     try:
-        searcher = ResumeSearcher(WEAVIATE_URL, WEAVIATE_CLASS, openai_client, EMBEDDING_MODEL)
+        searcher = ResumeSearcher(WEAVIATE_URL)
         result = searcher.search(query)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     except Exception as e:
@@ -12,7 +12,6 @@ import logging
 import requests
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
-from functools import lru_cache
 from dotenv import load_dotenv
 
 # ✅ 加载 .env
@@ -26,24 +25,26 @@ EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
 TOP_K = int(os.getenv("DEFAULT_TOP_K", "5"))
 CERTAINTY = float(os.getenv("SEARCH_CERTAINTY", "0.75"))
 SUMMARY_LENGTH = int(os.getenv("SUMMARY_LENGTH", "200"))
-EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "100"))
 
 # ✅ 日志设置
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# ✅ OpenAI Client
-from openai import OpenAI
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# ✅ 统一 Provider Client（OpenAI）
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+from scripts.provider_client import get_client
+client = get_client("openai", api_key=OPENAI_API_KEY, embedding_model=EMBEDDING_MODEL)
 
 def is_uuid_like(s: str) -> bool:
     return re.match(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$", s) is not None
 
 class ResumeSearcher:
-    def __init__(self, weaviate_url, weaviate_class, openai_client, embedding_model):
+    def __init__(self, weaviate_url=WEAVIATE_URL, weaviate_class=WEAVIATE_CLASS, client=client, embedding_model=EMBEDDING_MODEL):
         self.weaviate_url = weaviate_url
         self.weaviate_class = weaviate_class
-        self.openai_client = openai_client
+        self.client = client
         self.embedding_model = embedding_model
         print(f"🔧 当前使用 OpenAI 模型: {self.embedding_model}")
         logger.info("🔍 初始化 ResumeSearcher")
@@ -64,14 +65,9 @@ class ResumeSearcher:
             job_title = match.group(2)
         return name, job_title
 
-    @lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
     def get_embedding(self, text: str) -> List[float]:
         try:
-            response = self.openai_client.embeddings.create(
-                input=[text],
-                model=self.embedding_model
-            )
-            return response.data[0].embedding
+            return self.client.embed_one(text, self.embedding_model, scope="query")
         except Exception as e:
             logger.error(f"❌ 获取向量失败: {e}")
             raise
@@ -190,7 +186,7 @@ def main():
 
     print(f"搜索关键词: {query}")
     try:
-        searcher = ResumeSearcher(WEAVIATE_URL, WEAVIATE_CLASS, openai_client, EMBEDDING_MODEL)
+        searcher = ResumeSearcher(WEAVIATE_URL, WEAVIATE_CLASS, client, EMBEDDING_MODEL)
         result = searcher.search(query)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     except Exception as e:
@@ -12,17 +12,18 @@ import logging
 import requests
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
-from functools import lru_cache
 from dotenv import load_dotenv
 
 # ✅ 加载 .env
 load_dotenv()
 
-import dashscope
-from dashscope import TextEmbedding
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+from scripts.provider_client import get_client, require_api_key
 
-# ✅ 手动写死通义 API Key（确保替换成你的真实 key）
-dashscope.api_key = "sk-1d92a7280052451c84509f57e1b44991"
+# ✅ 通义 API Key 只从环境变量 DASHSCOPE_API_KEY 读取，未配置时直接退出
+DASHSCOPE_API_KEY = require_api_key("dashscope")
 
 # ✅ 环境变量
 WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
@@ -30,7 +31,8 @@ WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
 EMBEDDING_MODEL = os.getenv("DASHSCOPE_EMBEDDING_MODEL", "text-embedding-v1")
 TOP_K = 5
 SUMMARY_LENGTH = 200
-EMBEDDING_CACHE_SIZE = 100
+
+client = get_client("dashscope", api_key=DASHSCOPE_API_KEY, embedding_model=EMBEDDING_MODEL)
 
 # ✅ 日志设置
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -39,14 +41,9 @@ logger = logging.getLogger(__name__)
 # ✅ 通义 embedding 接口封装
 def get_tongyi_embedding(text: str, model: str = EMBEDDING_MODEL) -> List[float]:
     try:
-        response = TextEmbedding.call(model=model, input=text)
-        if response and "output" in response and "embeddings" in response["output"]:
-            embedding = response["output"]["embeddings"][0]["embedding"]
-            logger.info(f"✅ 通义返回向量长度: {len(embedding)}")
-            return embedding
-        else:
-            logger.error(f"❌ 通义返回结果异常: {response}")
-            return []
+        embedding = client.embed_one(text, model, scope="query")
+        logger.info(f"✅ 通义返回向量长度: {len(embedding)}")
+        return embedding
     except Exception as e:
         logger.error(f"❌ 通义向量生成失败: {e}")
         return []
@@ -73,14 +70,9 @@ class ResumeSearcher:
             job_title = match.group(2)
         return name, job_title
 
-    @lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
     def get_embedding(self, text: str) -> List[float]:
         try:
-            from dashscope import TextEmbedding
-            import dashscope
-            dashscope.api_key = os.getenv("DASHSCOPE_API_KEY")
-            response = TextEmbedding.call(model=self.embedding_model, input=text)
-            return response.output["embeddings"][0]["embedding"]
+            return client.embed_one(text, self.embedding_model, scope="query")
         except Exception as e:
             logger.error(f"❌ 获取向量失败（通义）: {e}")
             raise
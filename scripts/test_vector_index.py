@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 
 import json
+import os
+import sys
+
 import requests
 from dashscope import TextEmbedding
 
-# ✅ 用你写死的 DashScope Key
+# ✅ DashScope Key 只从环境变量读取
 embedding_model = "text-embedding-v1"
-dashscope_api_key = "sk-1d92a7280052451c84509f57e1b44991"
+dashscope_api_key = os.getenv("DASHSCOPE_API_KEY")
+if not dashscope_api_key:
+    sys.exit("❌ 未配置 DASHSCOPE_API_KEY：请在环境变量或 .env 中设置后重试")
 test_text = "吕冬冬 男 29 岁 本科 AI工程师 深圳"
 
 # ✅ 获取向量
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+按 token 切分简历文本，替代各索引脚本中按字符长度、反复字符串拼接的 chunk_text。
+    - 长度用 embedding 模型的 tokenizer 计量（scripts/tokens.py，无 tiktoken 时按中文按字估算）
+    - 段落不跨越结构边界：【字段信息】/【模块结构分类】/【原文补充】、=== 标题 ===、"模块": "岗位经历" 等
+    - 相邻段落之间保留 CHUNK_OVERLAP_TOKENS 的重叠（只在同一结构内）
+    - 句子保留原有标点，不再在换行后补 "。"；单句超过上限时按 token 硬切
+    - 每个句子只计数一次、每段只 join 一次，整体线性时间
+环境变量：CHUNK_MAX_TOKENS（默认 300）、CHUNK_OVERLAP_TOKENS（默认 50）、CHUNK_MIN_TOKENS（默认 5）
+用法示例：
+    chunks = chunk_text(merged_text, model=EMBEDDING_MODEL)
+    for chunk in iter_chunks(merged_text): print(chunk.section, chunk.tokens, chunk.text)
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.tokens import get_token_counter, split_by_tokens
+
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "300"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "5"))
+
+SECTION_PATTERN = re.compile(
+    r'^[ \t]*(?:【(?P<a>[^】\n]+)】|===\s*(?P<b>[^=\n]+?)\s*===|"模块"\s*:\s*"(?P<c>[^"\n]+)",?)[ \t]*$',
+    re.MULTILINE,
+)
+# 句子 = 非分隔符内容 + 结尾标点 + 随后的换行/空白（原样保留）
+SENTENCE_PATTERN = re.compile(r'[^\n。！？!?；;]*[。！？!?；;]*\s*')
+
+
+@dataclass
+class Chunk:
+    section: str
+    text: str
+    tokens: int
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """按结构标题切成 (标题, 正文)；标题行保留在正文开头，第一个标题之前的内容标题为空"""
+    sections = []
+    start, title = 0, ""
+    for match in SECTION_PATTERN.finditer(text):
+        if match.start() > start:
+            sections.append((title, text[start:match.start()]))
+        start = match.start()
+        title = match.group("a") or match.group("b") or match.group("c")
+    sections.append((title, text[start:]))
+    return [(t, body) for t, body in sections if body.strip()]
+
+
+def _chunk_section(title: str, body: str, count: Callable[[str], int], max_tokens: int, overlap: int,
+                   min_tokens: int, model: Optional[str]) -> Iterator[Chunk]:
+    pieces: List[Tuple[str, int]] = []  # 当前段落中的 (句子, token 数)
+    size = 0
+
+    def emit() -> Optional[Chunk]:
+        text = "".join(p for p, _ in pieces).strip()
+        return Chunk(title, text, size) if text and size >= min_tokens else None
+
+    for match in SENTENCE_PATTERN.finditer(body):
+        sentence = match.group()
+        if not sentence.strip():
+            continue
+        n = count(sentence)
+        parts = [(sentence, n)]
+        if n > max_tokens:
+            parts = [(s, count(s)) for s in split_by_tokens(sentence, max_tokens, model)]
+        for part, n in parts:
+            if pieces and size + n > max_tokens:
+                chunk = emit()
+                if chunk:
+                    yield chunk
+                # 从尾部保留不超过 overlap 的整句作为下一段开头
+                kept, kept_size = [], 0
+                for p, pn in reversed(pieces):
+                    if kept_size + pn > overlap or kept_size + pn + n > max_tokens:
+                        break
+                    kept.append((p, pn))
+                    kept_size += pn
+                pieces, size = kept[::-1], kept_size
+            pieces.append((part, n))
+            size += n
+    chunk = emit()
+    if chunk:
+        yield chunk
+
+
+def iter_chunks(text: str, max_tokens: int = CHUNK_MAX_TOKENS, overlap: int = CHUNK_OVERLAP_TOKENS,
+                model: Optional[str] = None, min_tokens: int = CHUNK_MIN_TOKENS) -> Iterator[Chunk]:
+    max_tokens = max(1, max_tokens)
+    overlap = max(0, min(overlap, max_tokens // 2))
+    count = get_token_counter(model)
+    for title, body in split_sections(text or ""):
+        yield from _chunk_section(title, body, count, max_tokens, overlap, min_tokens, model)
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_MAX_TOKENS, overlap: int = CHUNK_OVERLAP_TOKENS,
+               model: Optional[str] = None) -> List[str]:
+    return [chunk.text for chunk in iter_chunks(text, max_tokens, overlap, model)]
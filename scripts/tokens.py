@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Token 计数工具：优先使用 tiktoken 按模型精确计数，
+未安装 tiktoken、模型未知（如通义 qwen 系列）或离线无法加载编码表时，
+退回到中文按字、其他字符约 4 字符 1 token 的估算。
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef]')
+NON_CJK_RUN_PATTERN = re.compile(r'[^\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef]+')
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=16)
+def _tiktoken_encoding(model: Optional[str]):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+    except KeyError:
+        # 非 OpenAI 模型：用 cl100k_base 近似
+        try:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception:
+            return None
+    except Exception:
+        # 离线环境下编码表下载失败
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    # 按非中文连续片段计数，比逐字 findall 中文字符少创建大量短字符串
+    other = sum(map(len, NON_CJK_RUN_PATTERN.findall(text)))
+    cjk = len(text) - other
+    return cjk + (other + 3) // 4
+
+
+def encode(text: str, model: Optional[str] = None) -> Optional[List[int]]:
+    """返回 token id 列表；无法精确编码时返回 None"""
+    enc = _tiktoken_encoding(model)
+    return enc.encode(text) if enc is not None else None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    enc = _tiktoken_encoding(model)
+    if enc is None:
+        return estimate_tokens(text)
+    return len(enc.encode(text))
+
+
+def get_token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    enc = _tiktoken_encoding(model)
+    if enc is None:
+        return estimate_tokens
+    return lambda text: len(enc.encode(text))
+
+
+def is_exact(model: Optional[str] = None) -> bool:
+    return _tiktoken_encoding(model) is not None
+
+
+def split_by_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """按 token 窗口切开文本；无法精确编码时按字符窗口（估算口径下中文 1 字 1 token）"""
+    enc = _tiktoken_encoding(model)
+    if enc is None:
+        return [text[i:i + max_tokens] for i in range(0, len(text), max_tokens)]
+    ids = enc.encode(text)
+    # 一个汉字可能被编码为多个字节级 token：窗口边界落在字符中间时向前收缩（单字超过窗口时向后扩展），
+    # 切点总在完整的 UTF-8 字符之间，不会出现 U+FFFD
+    data = text.encode("utf-8")
+    offsets = [0]
+    for token in ids:
+        offsets.append(offsets[-1] + len(enc.decode_single_token_bytes(token)))
+
+    def clean(k: int) -> bool:
+        return offsets[k] >= len(data) or (data[offsets[k]] & 0xC0) != 0x80  # 下一个字节不是 UTF-8 续字节
+
+    parts = []
+    start = 0
+    while start < len(ids):
+        end = min(start + max_tokens, len(ids))
+        while end > start + 1 and not clean(end):
+            end -= 1
+        while not clean(end):
+            end += 1
+        parts.append(data[offsets[start]:offsets[end]].decode("utf-8"))
+        start = end
+    return parts
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+向量压缩（PQ / BQ）配置与迁移：ada-002 的 1536 维 float32 向量每条占 6KB 内存，候选人变多后 Weaviate 节点内存是瓶颈。
+    - VECTOR_COMPRESSION=none（默认）| pq | bq，新建 Candidates / CandidateChunks 时写入 vectorIndexConfig
+    - PQ：每段 1 字节编码（PQ_SEGMENTS，0 表示按维度自动选择），用 PQ_TRAINING_LIMIT 条向量训练码本；
+          检索先用压缩向量召回，再用磁盘上的原始向量重排
+    - BQ：每维 1 bit（内存约为 1/32），召回 VECTOR_RESCORE_LIMIT 条后用原始向量重排
+迁移方式：
+    - PQ 可在已有集合上在线开启（PUT /v1/schema/{class}），Weaviate 在后台用现有向量训练码本
+    - BQ 不能在已有 HNSW 索引上开启：把逻辑集合当前生效的 class（集合注册表）复制到新集合（默认 <Class>Bq），
+      校验数量后切换注册表指针，再补齐复制期间写入旧集合的对象与沟通记录；旧集合保留，可用 collection_registry.py --rollback 切回
+    - --copy 时 PQ 也复制到新集合，原集合保持不变，便于用 bench_vector_compression.py 对比（加 --no-switch 只复制不切换）
+用法示例：
+    python scripts/vector_compression.py --show
+    python scripts/vector_compression.py --apply pq
+    python scripts/vector_compression.py --apply bq --target CandidatesBq
+    python scripts/vector_compression.py --apply pq --copy --target CandidatesPq --no-switch
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.collection_registry import resolve, switch
+from scripts.weaviate_schema import (catch_up, clone_definition, copy_collection, count_objects, create_class,
+                                     get_class, update_class)
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_COLLECTION = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+VECTOR_COMPRESSION = os.getenv("VECTOR_COMPRESSION", "none")  # none | pq | bq
+PQ_SEGMENTS = int(os.getenv("PQ_SEGMENTS", "0"))
+PQ_TRAINING_LIMIT = int(os.getenv("PQ_TRAINING_LIMIT", "100000"))
+VECTOR_RESCORE_LIMIT = int(os.getenv("VECTOR_RESCORE_LIMIT", "200"))
+COMPRESSIONS = ("none", "pq", "bq")
+
+logger = logging.getLogger(__name__)
+
+
+def pq_segments(dim: int) -> int:
+    """每段 6 / 8 / 4 ... 维中第一个能整除的方案；1536 维 → 256 段（每条 256 字节）"""
+    for width in (6, 8, 4, 5, 3, 2, 1):
+        if dim % width == 0:
+            return dim // width
+    return dim
+
+
+def vector_index_config(compression: Optional[str] = None, segments: int = PQ_SEGMENTS,
+                        training_limit: int = PQ_TRAINING_LIMIT, rescore_limit: int = VECTOR_RESCORE_LIMIT) -> Dict:
+    """返回 HNSW 的 vectorIndexConfig 片段；none 时返回空 dict（沿用 Weaviate 默认）"""
+    compression = compression or VECTOR_COMPRESSION
+    if compression == "pq":
+        pq = {"enabled": True, "trainingLimit": training_limit,
+              "encoder": {"type": "kmeans", "distribution": "log-normal"}}
+        if segments:
+            pq["segments"] = segments
+        return {"pq": pq}
+    if compression == "bq":
+        return {"bq": {"enabled": True, "rescoreLimit": rescore_limit}}
+    if compression != "none":
+        raise ValueError(f"未知的 VECTOR_COMPRESSION: {compression}（可选 {', '.join(COMPRESSIONS)}）")
+    return {}
+
+
+def with_compression(definition: Dict[str, Any], compression: Optional[str] = None) -> Dict[str, Any]:
+    """在 class 定义上合并压缩配置（建 class 时调用）"""
+    config = vector_index_config(compression)
+    if config:
+        definition = dict(definition)
+        definition["vectorIndexConfig"] = dict(definition.get("vectorIndexConfig") or {}, **config)
+    return definition
+
+
+def current_compression(definition: Dict[str, Any]) -> str:
+    config = definition.get("vectorIndexConfig") or {}
+    for name in ("pq", "bq"):
+        if (config.get(name) or {}).get("enabled"):
+            return name
+    return "none"
+
+
+def migrate(weaviate_url: str, logical: str, compression: str, target: Optional[str] = None,
+            copy: bool = False) -> Dict[str, Any]:
+    """迁移逻辑集合当前生效的 class：PQ 原地开启；BQ（或 --copy）复制到新 class 并校验数量（不切换指针）"""
+    current = resolve(logical)
+    weaviate_class = current.class_name
+    definition = get_class(weaviate_url, weaviate_class)
+    if definition is None:
+        raise SystemExit(f"❌ 集合不存在: {weaviate_class}")
+    before = current_compression(definition)
+    total = count_objects(weaviate_url, weaviate_class)
+    print(f"📚 {weaviate_class}: {total} 条，当前压缩 {before} → 目标 {compression}")
+
+    if compression == "pq" and not copy:
+        if total < 1000:
+            print("⚠️ 对象较少，PQ 码本训练效果有限（Weaviate 至少需要若干千条向量）")
+        config = dict(definition.get("vectorIndexConfig") or {}, **vector_index_config("pq"))
+        ok = update_class(weaviate_url, dict(definition, vectorIndexConfig=config))
+        return {"mode": "in-place", "collection": logical, "class": weaviate_class, "ok": ok}
+
+    # BQ（或 --copy）：建新集合 → 复制对象与向量 → 校验数量
+    suffix = compression.capitalize() if compression != "none" else "Raw"
+    target = target or f"{weaviate_class}{suffix}"
+    if get_class(weaviate_url, target) is not None:
+        raise SystemExit(f"❌ 目标集合已存在: {target}（先删除或换一个 --target）")
+    new_definition = clone_definition(definition, target)
+    config = {k: v for k, v in (new_definition.get("vectorIndexConfig") or {}).items() if k not in ("pq", "bq")}
+    new_definition["vectorIndexConfig"] = dict(config, **vector_index_config(compression))
+    if not create_class(weaviate_url, new_definition):
+        raise SystemExit(1)
+    stats = copy_collection(weaviate_url, weaviate_class, target)
+    copied = count_objects(weaviate_url, target)
+    ok = copied == total and stats["failed"] == 0
+    print(f"{'✅' if ok else '❌'} 复制完成: 源 {total} 条，目标 {copied} 条，失败 {stats['failed']} 条")
+    return {"mode": "copy", "collection": logical, "source": weaviate_class, "class": target, "ok": ok,
+            "provider": current.provider, "embedding_model": current.embedding_model,
+            "dimensions": current.dimensions, "source_count": total, "target_count": copied, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate 向量压缩配置与迁移")
+    parser.add_argument("--collection", default=WEAVIATE_COLLECTION, help="逻辑集合名")
+    parser.add_argument("--show", action="store_true", help="查看当前向量索引配置")
+    parser.add_argument("--apply", choices=COMPRESSIONS, help="迁移到指定压缩方式")
+    parser.add_argument("--target", help="复制迁移的目标集合名（默认 <Class>Pq / <Class>Bq）")
+    parser.add_argument("--copy", action="store_true", help="PQ 也复制到新集合，不修改原集合")
+    parser.add_argument("--no-switch", action="store_true", help="复制迁移只复制和校验，不切换注册表指针")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.apply:
+        result = migrate(WEAVIATE_URL, args.collection, args.apply, args.target, args.copy)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        if result["mode"] != "copy":
+            return
+        if not result["ok"]:
+            print(f"❌ 校验未通过，未切换；线上仍为 {result['source']}")
+            sys.exit(1)
+        if args.no_switch:
+            print(f"👉 校验通过；确认后可用 collection_registry.py 把 {args.collection} 切换到 {result['class']}")
+            return
+        switch(args.collection, result["class"], result["provider"], result["embedding_model"], result["dimensions"])
+        # 复制与切换之间写入旧集合的对象和沟通记录
+        catch_up(WEAVIATE_URL, result["source"], result["class"])
+        print(f"🔀 {args.collection}: {result['source']} → {result['class']}"
+              f"（回滚：python scripts/collection_registry.py --rollback {args.collection}）")
+        return
+    class_name = resolve(args.collection).class_name
+    definition = get_class(WEAVIATE_URL, class_name)
+    if definition is None:
+        print(f"❌ 集合不存在: {class_name}")
+        return
+    print(f"🗜️ {args.collection} → {class_name} 当前压缩: {current_compression(definition)}")
+    print(json.dumps(definition.get("vectorIndexConfig") or {}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
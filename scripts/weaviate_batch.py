@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Weaviate 批量写入：通过 POST /v1/batch/objects 一次写入多条对象，替代逐条 POST /v1/objects + sleep。
+    - 批大小、并发批数可配置（WEAVIATE_BATCH_SIZE / WEAVIATE_BATCH_CONCURRENCY）
+    - 逐条解析响应中的 result.errors，只重试失败的对象（WEAVIATE_BATCH_RETRIES）
+    - 整批请求失败（网络 / 5xx）时整批退避重试
+    - 同时在途的批次数有上限，Weaviate 变慢时 add() 会阻塞调用方（背压）
+用法示例：
+    with BatchWriter(on_success=lambda key: print("✅", key)) as writer:
+        writer.add(resume_uuid, {"filename": filename, "content": content}, vector, key=filename)
+    print(writer.report())
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WEAVIATE_CLASS = os.getenv("WEAVIATE_COLLECTION", "Candidates")
+WEAVIATE_BATCH_SIZE = int(os.getenv("WEAVIATE_BATCH_SIZE", "100"))
+WEAVIATE_BATCH_CONCURRENCY = int(os.getenv("WEAVIATE_BATCH_CONCURRENCY", "2"))
+WEAVIATE_BATCH_RETRIES = int(os.getenv("WEAVIATE_BATCH_RETRIES", "3"))
+WEAVIATE_BATCH_TIMEOUT = float(os.getenv("WEAVIATE_BATCH_TIMEOUT", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    obj: Dict[str, Any]
+    key: Any
+    attempts: int = 0
+    error: str = ""
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)  # key -> 最后一次错误信息
+
+
+def object_errors(result: Dict[str, Any]) -> str:
+    """从单条对象的批量响应中取出错误信息，成功时返回空串"""
+    errors = ((result.get("result") or {}).get("errors") or {}).get("error") or []
+    return "; ".join(e.get("message", str(e)) for e in errors)
+
+
+def is_transient(error: str) -> bool:
+    """整批请求失败（网络异常 / 429 / 5xx）稍后重放可能成功；对象级错误（如属性类型不符）重放也不会成功"""
+    return error.startswith("请求异常") or error == "响应中缺少该对象" or bool(re.match(r"HTTP (429|5\d\d)", error))
+
+
+class BatchWriter:
+    def __init__(self, weaviate_url: str = WEAVIATE_URL, weaviate_class: str = WEAVIATE_CLASS,
+                 batch_size: int = WEAVIATE_BATCH_SIZE, concurrency: int = WEAVIATE_BATCH_CONCURRENCY,
+                 max_retries: int = WEAVIATE_BATCH_RETRIES,
+                 on_success: Optional[Callable[[Any], None]] = None,
+                 on_failure: Optional[Callable[[Any, str], None]] = None):
+        self.url = f"{weaviate_url.rstrip('/')}/v1/batch/objects"
+        self.weaviate_class = weaviate_class
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.stats = BatchStats()
+
+        self._buffer: List[BatchItem] = []
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._inflight = threading.BoundedSemaphore(max(1, concurrency) * 2)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="weaviate-batch")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(1, concurrency))
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    # ========= 对外接口 =========
+    def add(self, obj_id: str, properties: Dict[str, Any], vector: Optional[List[float]] = None, key: Any = None):
+        """加入一条对象；攒满 batch_size 条后交给后台线程发送。key 用于回调和错误报告（默认取 obj_id）"""
+        obj = {"class": self.weaviate_class, "id": obj_id, "properties": properties}
+        if vector is not None:
+            obj["vector"] = vector
+        batch = None
+        with self._lock:
+            self._buffer.append(BatchItem(obj=obj, key=obj_id if key is None else key))
+            if len(self._buffer) >= self.batch_size:
+                batch, self._buffer = self._buffer, []
+        if batch:
+            self._submit(batch)
+
+    def flush(self):
+        """发送缓冲区剩余对象并等待所有批次完成"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._submit(batch)
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+        self._session.close()
+
+    def report(self) -> str:
+        s = self.stats
+        return f"写入成功 {s.succeeded} 条，失败 {s.failed} 条，重试 {s.retried} 次，请求 {s.requests} 次"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ========= 内部实现 =========
+    def _submit(self, batch: List[BatchItem]):
+        self._inflight.acquire()  # 在途批次已满时阻塞，直到有批次完成
+        future = self._pool.submit(self._send_with_retry, batch)
+        future.add_done_callback(lambda _: self._inflight.release())
+        with self._lock:
+            done = [f for f in self._futures if f.done()]
+            for f in done:
+                f.result()  # 让后台线程中的异常浮出来
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+
+    def _post(self, items: List[BatchItem]) -> List[str]:
+        """发送一批，返回与 items 对齐的错误信息列表（空串表示成功）"""
+        with self._lock:
+            self.stats.requests += 1
+        try:
+            response = self._session.post(self.url, json={"objects": [item.obj for item in items]},
+                                          timeout=WEAVIATE_BATCH_TIMEOUT)
+        except requests.RequestException as e:
+            return [f"请求异常: {e}"] * len(items)
+        if response.status_code != 200:
+            return [f"HTTP {response.status_code}: {response.text[:200]}"] * len(items)
+
+        results = response.json()
+        by_id = {str(r.get("id")): r for r in results if isinstance(r, dict)}
+        errors = []
+        for i, item in enumerate(items):
+            result = by_id.get(str(item.obj["id"]))
+            if result is None and i < len(results):
+                result = results[i]
+            errors.append(object_errors(result) if result is not None else "响应中缺少该对象")
+        return errors
+
+    def _send_with_retry(self, batch: List[BatchItem]):
+        pending = batch
+        while pending:
+            errors = self._post(pending)
+            retry = []
+            for item, error in zip(pending, errors):
+                item.attempts += 1
+                if not error:
+                    self._succeed(item)
+                elif item.attempts <= self.max_retries:
+                    item.error = error
+                    retry.append(item)
+                else:
+                    self._fail(item, error)
+            if retry:
+                with self._lock:
+                    self.stats.retried += len(retry)
+                logger.warning("🔁 %d/%d 条写入失败，重试第 %d 次: %s",
+                               len(retry), len(pending), retry[0].attempts, retry[0].error)
+                time.sleep(min(0.5 * 2 ** (retry[0].attempts - 1), 8))
+            pending = retry
+
+    def _succeed(self, item: BatchItem):
+        with self._lock:
+            self.stats.succeeded += 1
+        if self.on_success:
+            self.on_success(item.key)
+
+    def _fail(self, item: BatchItem, error: str):
+        with self._lock:
+            self.stats.failed += 1
+            self.stats.errors[str(item.key)] = error
+        logger.error("❌ 写入失败: %s | %s", item.key, error)
+        if self.on_failure:
+            self.on_failure(item.key, error)
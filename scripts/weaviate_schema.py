@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Weaviate 集合（class）管理的公共 REST 工具：读取 / 创建 / 更新 / 删除 class、追加属性、统计对象数、整集合复制。
+压缩迁移、换维度迁移等需要“建新集合 → 复制 → 校验数量 → 切换”的脚本共用这里的实现；
+切换后用 catch_up() 补齐复制期间源集合新增 / 重新索引的对象和沟通记录。
+用法示例：
+    schema = get_class(WEAVIATE_URL, "Candidates")
+    create_class(WEAVIATE_URL, dict(schema, **{"class": "CandidatesPq"}))
+    copied = copy_collection(WEAVIATE_URL, "Candidates", "CandidatesPq")
+    assert count_objects(WEAVIATE_URL, "CandidatesPq") == count_objects(WEAVIATE_URL, "Candidates")
+    catch_up(WEAVIATE_URL, "Candidates", "CandidatesPq")   # 切换指针后
+"""
+
+import copy
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.index_manifest import scan_collection
+from scripts.weaviate_batch import BatchWriter
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+
+# 复制 class 定义时需要去掉的服务端生成字段
+SERVER_MANAGED_KEYS = ("shardingConfig", "replicationConfig", "multiTenancyConfig")
+
+logger = logging.getLogger(__name__)
+
+
+def list_classes(weaviate_url: str = WEAVIATE_URL) -> List[str]:
+    resp = requests.get(f"{weaviate_url}/v1/schema", timeout=30)
+    resp.raise_for_status()
+    return [c["class"] for c in resp.json().get("classes", [])]
+
+
+def get_class(weaviate_url: str, weaviate_class: str) -> Optional[Dict[str, Any]]:
+    resp = requests.get(f"{weaviate_url}/v1/schema/{weaviate_class}", timeout=30)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+
+def clone_definition(definition: Dict[str, Any], new_class: str) -> Dict[str, Any]:
+    """以现有 class 定义为模板生成新 class 定义（属性、向量索引配置沿用）"""
+    cloned = copy.deepcopy(definition)
+    cloned["class"] = new_class
+    for key in SERVER_MANAGED_KEYS:
+        cloned.pop(key, None)
+    return cloned
+
+
+def create_class(weaviate_url: str, definition: Dict[str, Any]) -> bool:
+    resp = requests.post(f"{weaviate_url}/v1/schema", json=definition, timeout=60)
+    if resp.status_code == 200:
+        logger.info("✅ 已创建 Weaviate class: %s", definition["class"])
+        return True
+    logger.error("❌ 创建 class 失败 %s: %s", definition["class"], resp.text[:300])
+    return False
+
+
+def update_class(weaviate_url: str, definition: Dict[str, Any]) -> bool:
+    """PUT /v1/schema/{class}：只有部分配置（如 pq、ef、rescoreLimit）允许在线修改"""
+    resp = requests.put(f"{weaviate_url}/v1/schema/{definition['class']}", json=definition, timeout=60)
+    if resp.status_code == 200:
+        logger.info("✅ 已更新 Weaviate class: %s", definition["class"])
+        return True
+    logger.error("❌ 更新 class 失败 %s: %s", definition["class"], resp.text[:300])
+    return False
+
+
+def add_property(weaviate_url: str, weaviate_class: str, prop: Dict[str, Any]) -> bool:
+    """POST /v1/schema/{class}/properties：给已有 class 追加属性（已有属性不能修改类型或分词方式）"""
+    resp = requests.post(f"{weaviate_url}/v1/schema/{weaviate_class}/properties", json=prop, timeout=60)
+    if resp.status_code == 200:
+        logger.info("✅ 已为 %s 添加属性: %s", weaviate_class, prop["name"])
+        return True
+    logger.error("❌ 添加属性失败 %s.%s: %s", weaviate_class, prop["name"], resp.text[:300])
+    return False
+
+
+def delete_class(weaviate_url: str, weaviate_class: str) -> bool:
+    resp = requests.delete(f"{weaviate_url}/v1/schema/{weaviate_class}", timeout=60)
+    if resp.status_code == 200:
+        logger.info("🗑️ 已删除 Weaviate class: %s", weaviate_class)
+        return True
+    logger.error("❌ 删除 class 失败 %s: %s", weaviate_class, resp.text[:300])
+    return False
+
+
+def count_objects(weaviate_url: str, weaviate_class: str) -> int:
+    query = {"query": f"{{ Aggregate {{ {weaviate_class} {{ meta {{ count }} }} }} }}"}
+    resp = requests.post(f"{weaviate_url}/v1/graphql", json=query, timeout=60)
+    resp.raise_for_status()
+    body = resp.json()
+    if body.get("errors"):
+        raise RuntimeError(f"GraphQL 错误：{body['errors']}")
+    return int(body["data"]["Aggregate"][weaviate_class][0]["meta"]["count"])
+
+
+def copy_collection(weaviate_url: str, source_class: str, target_class: str,
+                    transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None) -> Dict[str, int]:
+    """
+    游标遍历 source_class（含向量），按原 id 批量写入 target_class。
+    transform 可改写对象（properties / vector），返回 None 表示跳过。返回写入统计。
+    """
+    scanned = 0
+    with BatchWriter(weaviate_url=weaviate_url, weaviate_class=target_class) as writer:
+        for obj in scan_collection(weaviate_url, source_class, include_vector=True):
+            scanned += 1
+            if transform is not None:
+                obj = transform(obj)
+                if obj is None:
+                    continue
+            writer.add(obj["id"], obj.get("properties") or {}, obj.get("vector"))
+            if scanned % 1000 == 0:
+                logger.info("📦 已复制 %d 条: %s → %s", scanned, source_class, target_class)
+    stats = writer.stats
+    return {"scanned": scanned, "written": stats.succeeded, "failed": stats.failed}
+
+
+def copy_delta(weaviate_url: str, source_class: str, target_class: str,
+               transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None) -> Dict[str, int]:
+    """
+    复制之后的增量补齐：只写入 target 中没有、或 ingested_at 与 target 不同（复制期间被重新索引）的对象。
+    切换指针后调用，补上复制窗口内写入源集合的对象；沟通记录的变化由 carry_notes() 合并
+    """
+    copied = {obj["id"]: (obj.get("properties") or {}).get("ingested_at")
+              for obj in scan_collection(weaviate_url, target_class)}
+
+    def changed(obj):
+        if obj["id"] in copied and copied[obj["id"]] == (obj.get("properties") or {}).get("ingested_at"):
+            return None
+        return transform(obj) if transform is not None else obj
+
+    return copy_collection(weaviate_url, source_class, target_class, transform=changed)
+
+
+def carry_notes(weaviate_url: str, source: str, target: str) -> int:
+    """把 source 中的 notes 合并到 target 的同 UUID 对象（保留顺序、去重），返回更新的对象数"""
+    updated = 0
+    if get_class(weaviate_url, source) is None:
+        return updated
+    for obj in scan_collection(weaviate_url, source):
+        notes = (obj.get("properties") or {}).get("notes") or []
+        if not notes:
+            continue
+        url = f"{weaviate_url}/v1/objects/{target}/{obj['id']}"
+        res = requests.get(url, timeout=30)
+        if res.status_code != 200:
+            continue
+        current = (res.json().get("properties") or {}).get("notes") or []
+        merged = notes + [n for n in current if n not in notes]
+        if merged == current:
+            continue
+        patch = requests.patch(url, json={"properties": {"notes": merged}}, timeout=30)
+        if patch.status_code in (200, 204):
+            updated += 1
+        else:
+            logger.error("❌ 沟通记录迁移失败 %s: %s", obj["id"], patch.text)
+    return updated
+
+
+def catch_up(weaviate_url: str, source_class: str, target_class: str,
+             transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None) -> Dict[str, int]:
+    """切换指针后补齐复制窗口内源集合的变化：新增 / 重新索引的对象与新的沟通记录"""
+    stats = copy_delta(weaviate_url, source_class, target_class, transform)
+    notes = carry_notes(weaviate_url, source_class, target_class)
+    logger.info("🔁 已补齐 %s → %s: 对象 %d 条（失败 %d），沟通记录 %d 位", source_class, target_class,
+                stats["written"], stats["failed"], notes)
+    return {"objects": stats["written"], "failed": stats["failed"], "notes": notes}
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+Weaviate 写前日志（spool）：向量化完成的对象先追加到本地段文件（fsync 落盘），再由后台补写线程批量写入 Weaviate，
+Weaviate 重启或不可达时索引照常进行，已付费的向量不会因为写库失败而在下次运行时重新计算。
+    - 段文件为 JSONL：class / id / properties / 向量（float32 的 base64），写入中的段为 .open，封存后为 .seg；
+      已写入 Weaviate 的行号记在同名 .ack 中，整段确认后删除；超过 WRITE_SPOOL_SEGMENT_MB 换新段
+    - 补写线程先探测 Weaviate 是否可用，不可用时指数退避（最长 WRITE_SPOOL_MAX_BACKOFF 秒）；
+      对象 UUID 由文件名 / 段落序号决定，重放即 upsert，重复写入无副作用
+    - 需要保留沟通记录的对象在补写前才从 Weaviate 取回 notes 合并（merge_notes），spool 期间新增的记录不会被覆盖
+    - 对象级错误（如属性类型不符）重放也不会成功，移入 dead.jsonl 并从索引清单中移除（下次索引时按新增重新写入），
+      可用 requeue 命令修复后重新排队
+    - 进程崩溃留下的 .open 段在下次启动时被接管；多个进程共用同一目录时按段加文件锁，互不重复补写
+    - 段文件与 .ack 都只追加：积压统计与读取待写对象只增量读取新追加的部分，不会每次重读整段
+    - require(class, ensure)：索引脚本启动时 Weaviate 不可达、未能建类时登记，补写该 class 前先执行 ensure，
+      避免对象写入时 Weaviate 自动建类（缺少分词、压缩等配置）
+    - WRITE_SPOOL=off 关闭（索引脚本直接使用 BatchWriter），WRITE_SPOOL_DIR 指定目录
+用法示例：
+    with SpoolWriter(weaviate_class="Candidates", on_success=on_indexed) as writer:   # 接口与 BatchWriter 相同
+        writer.add(resume_uuid, properties, vector, key=filename, merge_notes=[resume_uuid])
+    python scripts/write_spool.py status
+    python scripts/write_spool.py flush --timeout 600
+    python scripts/write_spool.py requeue
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows：不加锁，同一目录只应由一个进程补写
+    fcntl = None
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+from scripts.incremental_index import fetch_notes
+from scripts.index_manifest import IndexManifest
+from scripts.weaviate_batch import BatchWriter, is_transient
+
+WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+WRITE_SPOOL = os.getenv("WRITE_SPOOL", "on").lower() not in ("off", "0", "false")
+WRITE_SPOOL_DIR = os.getenv("WRITE_SPOOL_DIR", str(root_dir / "data" / "spool"))
+WRITE_SPOOL_SEGMENT_MB = float(os.getenv("WRITE_SPOOL_SEGMENT_MB", "16"))
+WRITE_SPOOL_BATCH = int(os.getenv("WRITE_SPOOL_BATCH", "200"))
+WRITE_SPOOL_FSYNC = os.getenv("WRITE_SPOOL_FSYNC", "1") == "1"
+WRITE_SPOOL_MAX_BACKOFF = float(os.getenv("WRITE_SPOOL_MAX_BACKOFF", "30"))
+WRITE_SPOOL_DRAIN_TIMEOUT = float(os.getenv("WRITE_SPOOL_DRAIN_TIMEOUT", "120"))
+WRITE_SPOOL_INTERVAL = float(os.getenv("WRITE_SPOOL_INTERVAL", "0.5"))
+
+logger = logging.getLogger(__name__)
+
+
+def encode_vector(vector: Optional[List[float]]) -> Optional[str]:
+    if vector is None:
+        return None
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_vector(data: Optional[str]) -> Optional[List[float]]:
+    if data is None:
+        return None
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
+
+
+def weaviate_ready(weaviate_url: str) -> bool:
+    """Weaviate 可连通且未返回 5xx（启动中的节点 ready 接口返回 503）"""
+    try:
+        return requests.get(f"{weaviate_url}/v1/.well-known/ready", timeout=5).status_code < 500
+    except requests.RequestException:
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class WriteSpool:
+    def __init__(self, path: str = WRITE_SPOOL_DIR, segment_bytes: int = int(WRITE_SPOOL_SEGMENT_MB * 1024 * 1024)):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.dead_path = self.path / "dead.jsonl"
+        self._lock = threading.Lock()
+        # SpoolWriter 的“追加 + on_success（登记索引清单）”与移入 dead.jsonl 时的清单移除互斥，
+        # 保证清除发生在登记之后，不会被随后的登记覆盖
+        self.callback_lock = threading.Lock()
+        self._file = None
+        self._segment: Optional[Path] = None
+        self._own: List[Path] = []       # 本进程写过的段（用于 drain）
+        self._locks: Dict[Path, Any] = {}  # 本进程持有锁的 .ack 文件句柄（与当前段一起由 _lock 保护）
+        self._index_lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}  # 段名 -> 已读到的位置、各行起始偏移、已确认行号
+        self._ensure: Dict[str, Callable[[], Any]] = {}  # class -> 首次补写前执行的建类 / 补齐 schema
+        self.appended = 0
+        self.flushed = 0
+        self.dead = 0
+        self._adopt_orphans()
+
+    # ========= 追加 =========
+    def append(self, obj: Dict[str, Any], key: Any = None, merge_notes: Optional[List[str]] = None):
+        """把一条待写对象追加到当前段并落盘；返回后即使进程退出，对象也会被补写"""
+        record = {"class": obj["class"], "id": obj["id"], "properties": obj["properties"],
+                  "vector": encode_vector(obj.get("vector")), "key": key}
+        if merge_notes:
+            record["merge_notes"] = merge_notes
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.segment_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+            if WRITE_SPOOL_FSYNC:
+                os.fsync(self._file.fileno())
+            self.appended += 1
+
+    def _rotate(self):
+        self._seal_current()
+        self._segment = self.path / f"{time.time_ns():020d}-{os.getpid()}.open"
+        self._file = open(self._segment, "a", encoding="utf-8")
+        self._own.append(self._segment)
+
+    def _seal_current(self):
+        if self._file is None:
+            return
+        self._file.close()
+        sealed = self._segment.with_suffix(".seg")
+        os.replace(self._segment, sealed)
+        self._own[self._own.index(self._segment)] = sealed
+        if self._segment in self._locks:
+            self._locks[sealed] = self._locks.pop(self._segment)
+        self._file = self._segment = None
+
+    def seal(self):
+        """封存当前段（之后的追加写入新段）"""
+        with self._lock:
+            self._seal_current()
+
+    def _adopt_orphans(self):
+        """接管已退出进程留下的 .open 段：截掉末尾不完整的行后封存"""
+        for segment in self.path.glob("*.open"):
+            pid = int(segment.stem.rsplit("-", 1)[-1]) if "-" in segment.stem else 0
+            if pid == os.getpid() or _pid_alive(pid):
+                continue
+            data = segment.read_bytes()
+            if data and not data.endswith(b"\n"):
+                segment.write_bytes(data[:data.rfind(b"\n") + 1])
+            os.replace(segment, segment.with_suffix(".seg"))
+            logger.info("📦 接管未封存的 spool 段: %s", segment.name)
+
+    # ========= 读取 / 确认 =========
+    def _ack_path(self, segment: Path) -> Path:
+        return segment.with_suffix(".ack")
+
+    def _claim(self, segment: Path) -> bool:
+        """对段的 .ack 加排他锁；其他进程正在补写该段时跳过"""
+        with self._lock:  # 封存当前段时 _seal_current 会改键
+            if segment in self._locks or fcntl is None:
+                return True
+            handle = open(self._ack_path(segment), "a", encoding="utf-8")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self._locks[segment] = handle
+            return True
+
+    def _release(self, segment: Path):
+        with self._lock:
+            handle = self._locks.pop(segment, None)
+        if handle is not None:
+            handle.close()
+
+    @staticmethod
+    def _read_from(path: Path, offset: int) -> bytes:
+        """从 offset 读到最后一个完整行（正在追加的半行留到下次）"""
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return b""
+        return data[:data.rfind(b"\n") + 1]
+
+    def _scan(self, segment: Path) -> Dict[str, Any]:
+        """增量读取段文件与 .ack 中上次之后追加的部分（.open 封存为 .seg 只改后缀，段名不变）"""
+        with self._index_lock:
+            state = self._index.setdefault(segment.stem, {"size": 0, "starts": [], "ack_size": 0, "acked": set()})
+            data = self._read_from(segment, state["size"])
+            pos = 0
+            while pos < len(data):
+                state["starts"].append(state["size"] + pos)
+                pos = data.index(b"\n", pos) + 1
+            state["size"] += len(data)
+            acks = self._read_from(self._ack_path(segment), state["ack_size"])
+            state["acked"].update(int(n) for n in acks.split())
+            state["ack_size"] += len(acks)
+            return state
+
+    def segments(self) -> List[Path]:
+        """可补写的段：全部已封存段 + 本进程正在写的段，按创建时间排序"""
+        with self._lock:
+            current = self._segment
+        found = sorted(self.path.glob("*.seg"))
+        if current is not None:
+            found.append(current)
+        with self._index_lock:  # 已被删除的段（含其他进程补写完的）不再跟踪
+            for stem in set(self._index) - {p.stem for p in found}:
+                del self._index[stem]
+        return sorted(found, key=lambda p: p.stem)
+
+    def pending_count(self, segment: Path) -> int:
+        state = self._scan(segment)
+        with self._index_lock:
+            return max(0, len(state["starts"]) - len(state["acked"]))
+
+    def pending(self, segment: Path, limit: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """段中尚未确认的对象（按行号顺序，最多 limit 条），只读取这些行"""
+        state = self._scan(segment)
+        with self._index_lock:
+            lines = [(i, start) for i, start in enumerate(state["starts"]) if i not in state["acked"]][:limit]
+        if not lines:
+            return []
+        records = []
+        try:
+            with open(segment, "rb") as f:
+                for line_no, start in lines:
+                    f.seek(start)
+                    records.append((line_no, json.loads(f.readline())))
+        except FileNotFoundError:  # 刚被封存或已被其他进程删除，下一轮按新路径读取
+            return []
+        return records
+
+    def ack(self, segment: Path, line_numbers: List[int]):
+        if not line_numbers:
+            return
+        with open(self._ack_path(segment), "a", encoding="utf-8") as f:
+            f.write("".join(f"{n}\n" for n in line_numbers))
+            f.flush()
+            if WRITE_SPOOL_FSYNC:
+                os.fsync(f.fileno())
+
+    def retire(self, segment: Path):
+        """整段确认后删除（正在写入的段除外）"""
+        if segment.suffix != ".seg":
+            return
+        self._release(segment)
+        for path in (segment, self._ack_path(segment)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        with self._index_lock:
+            self._index.pop(segment.stem, None)
+
+    def bury(self, record: Dict[str, Any], error: str):
+        with self._lock:
+            with open(self.dead_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({**record, "error": error}, ensure_ascii=False) + "\n")
+            self.dead += 1
+        logger.error("❌ %s/%s 写入失败，已移入 %s: %s", record["class"], record["id"], self.dead_path.name, error)
+        with self.callback_lock:
+            forget_indexed(record)
+
+    # ========= 补写 =========
+    def flush_once(self, weaviate_url: str = WEAVIATE_URL, limit: int = WRITE_SPOOL_BATCH) -> Tuple[int, bool]:
+        """补写最多 limit 条，返回 (处理条数（含移入 dead.jsonl 的）, 是否遇到暂时性错误)"""
+        for segment in self.segments():
+            if not self._claim(segment):
+                continue
+            pending = self.pending(segment, limit)
+            if not pending:
+                self.retire(segment)
+                continue
+            processed, transient = self._replay(weaviate_url, segment, pending)
+            if not transient and not self.pending_count(segment):
+                self.retire(segment)
+            return processed, transient
+        return 0, False
+
+    def require(self, weaviate_class: str, ensure: Callable[[], Any]):
+        """补写 weaviate_class 的对象前先执行 ensure（返回 False 或抛出请求异常时视为暂时失败，稍后重试）"""
+        with self._lock:
+            self._ensure[weaviate_class] = ensure
+
+    def _ensure_class(self, weaviate_class: str) -> bool:
+        with self._lock:
+            ensure = self._ensure.get(weaviate_class)
+        if ensure is None:
+            return True
+        if ensure() is False:
+            logger.warning("⚠️ 补写前创建 / 补齐 %s 的 schema 失败，稍后重试", weaviate_class)
+            return False
+        logger.info("📚 已在补写前确认 %s 的 schema", weaviate_class)
+        with self._lock:
+            self._ensure.pop(weaviate_class, None)
+        return True
+
+    def _replay(self, weaviate_url: str, segment: Path, items: List[Tuple[int, Dict[str, Any]]]) -> Tuple[int, bool]:
+        by_class: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for line_no, record in items:
+            by_class.setdefault(record["class"], []).append((line_no, record))
+
+        done: List[int] = []
+        buried: List[int] = []
+        transient = False
+        for weaviate_class, records in by_class.items():
+            try:
+                if not self._ensure_class(weaviate_class):
+                    transient = True
+                    continue
+                self._merge_notes(weaviate_url, weaviate_class, [r for _, r in records])
+            except requests.RequestException as e:
+                logger.warning("⚠️ 补写前读取 schema / notes 失败，稍后重试: %s", e)
+                transient = True
+                continue
+            lookup = dict(records)
+            failures: Dict[int, str] = {}
+            writer = BatchWriter(weaviate_url=weaviate_url, weaviate_class=weaviate_class, batch_size=len(records),
+                                 on_success=done.append, on_failure=failures.__setitem__)
+            with writer:
+                for line_no, record in records:
+                    writer.add(record["id"], record["properties"], decode_vector(record["vector"]), key=line_no)
+            for line_no, error in failures.items():
+                if is_transient(error):
+                    transient = True
+                else:
+                    self.bury(lookup[line_no], error)
+                    buried.append(line_no)
+        self.ack(segment, sorted(done + buried))
+        with self._lock:
+            self.flushed += len(done)
+        return len(done) + len(buried), transient
+
+    @staticmethod
+    def _merge_notes(weaviate_url: str, weaviate_class: str, records: List[Dict[str, Any]]):
+        ids = sorted({obj_id for r in records for obj_id in r.get("merge_notes") or []})
+        if not ids:
+            return
+        existing = fetch_notes(weaviate_url, weaviate_class, ids)
+        for record in records:
+            merged: List[str] = []
+            for obj_id in record.get("merge_notes") or []:
+                merged.extend(n for n in existing.get(obj_id, []) if n not in merged)
+            spooled = record["properties"].get("notes") or []
+            record["properties"]["notes"] = merged + [n for n in spooled if n not in merged]
+
+    # ========= 统计 =========
+    def backlog(self, own_only: bool = False) -> int:
+        if own_only:
+            with self._lock:
+                segments = list(self._own)
+        else:
+            segments = self.segments()
+        return sum(self.pending_count(segment) for segment in segments if segment.exists())
+
+    def stats(self) -> Dict[str, Any]:
+        segments = self.segments()
+        dead = sum(1 for _ in open(self.dead_path, encoding="utf-8")) if self.dead_path.exists() else 0
+        return {"path": str(self.path), "segments": len(segments),
+                "pending": sum(self.pending_count(s) for s in segments), "dead": dead}
+
+    def close(self):
+        self.seal()
+        with self._lock:
+            held = list(self._locks)
+        for segment in held:
+            self._release(segment)
+
+
+def forget_indexed(record: Dict[str, Any]):
+    """索引脚本在对象落盘时已登记清单；对象最终未写入 Weaviate 时移除该条目，下次索引时不会被判为未变"""
+    try:
+        IndexManifest(weaviate_class=record["class"]).forget(record["id"])
+    except sqlite3.Error as e:
+        logger.error("❌ 从索引清单移除 %s/%s 失败: %s", record["class"], record["id"], e)
+
+
+class SpoolFlusher(threading.Thread):
+    """后台补写线程：Weaviate 可用时持续补写，不可用时指数退避"""
+
+    def __init__(self, spool: WriteSpool, weaviate_url: str = WEAVIATE_URL, interval: float = WRITE_SPOOL_INTERVAL):
+        super().__init__(name="spool-flusher", daemon=True)
+        self.spool = spool
+        self.weaviate_url = weaviate_url.rstrip("/")
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self.backoff = 0.0
+
+    def run(self):
+        while not self._stop_event.is_set():
+            processed, transient = 0, False
+            if weaviate_ready(self.weaviate_url):
+                try:
+                    processed, transient = self.spool.flush_once(self.weaviate_url)
+                except Exception as e:  # 补写线程不能退出，下一轮重试
+                    logger.exception("❌ spool 补写异常: %s", e)
+                    transient = True
+            else:
+                transient = True
+            if transient:
+                self.backoff = min(WRITE_SPOOL_MAX_BACKOFF, max(1.0, self.backoff * 2))
+                logger.warning("⏳ Weaviate 暂不可用，%.0fs 后重试补写（待写 %d 条）",
+                               self.backoff, self.spool.backlog())
+                self._wake.wait(self.backoff)
+            else:
+                if self.backoff:
+                    logger.info("✅ Weaviate 已恢复，继续补写")
+                self.backoff = 0.0
+                if not processed:
+                    self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        self.join(timeout=30)
+
+
+_spools: Dict[Tuple[str, str], Tuple[WriteSpool, SpoolFlusher]] = {}
+_spools_lock = threading.Lock()
+
+
+def get_spool(path: str = WRITE_SPOOL_DIR, weaviate_url: str = WEAVIATE_URL) -> Tuple[WriteSpool, SpoolFlusher]:
+    """同一进程内每个目录共用一个 spool 与补写线程（候选人与段落对象写入同一 spool），首次调用时开始补写积压"""
+    key = (str(Path(path).resolve()), weaviate_url.rstrip("/"))
+    with _spools_lock:
+        if key not in _spools:
+            spool = WriteSpool(path)
+            flusher = SpoolFlusher(spool, weaviate_url)
+            flusher.start()
+            _spools[key] = (spool, flusher)
+            backlog = spool.backlog()
+            if backlog:
+                logger.info("📦 spool 中有 %d 条上次未写入的对象，后台补写", backlog)
+        return _spools[key]
+
+
+class SpoolWriter:
+    """与 BatchWriter 接口相同：add() 落盘到 spool 即视为写入（触发 on_success），close() 时等待补写完成"""
+
+    def __init__(self, weaviate_url: str = WEAVIATE_URL, weaviate_class: str = "Candidates",
+                 on_success: Optional[Callable[[Any], None]] = None, path: str = WRITE_SPOOL_DIR,
+                 drain_timeout: float = WRITE_SPOOL_DRAIN_TIMEOUT, **_batch_options):
+        self.weaviate_class = weaviate_class
+        self.on_success = on_success
+        self.drain_timeout = drain_timeout
+        self.spool, self.flusher = get_spool(path, weaviate_url)
+        self.spooled = 0
+        self.drained = True
+
+    def add(self, obj_id: str, properties: Dict[str, Any], vector: Optional[List[float]] = None, key: Any = None,
+            merge_notes: Optional[List[str]] = None):
+        obj = {"class": self.weaviate_class, "id": obj_id, "properties": properties, "vector": vector}
+        key = obj_id if key is None else key
+        with self.spool.callback_lock:
+            self.spool.append(obj, key, merge_notes)
+            self.spooled += 1
+            if self.on_success:
+                self.on_success(key)
+        self.flusher.wake()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """封存当前段并等待本进程写入的对象全部补写完成；超时返回 False（对象仍在 spool 中，下次运行补写）"""
+        self.spool.seal()
+        self.flusher.wake()
+        deadline = time.monotonic() + (self.drain_timeout if timeout is None else timeout)
+        while self.spool.backlog(own_only=True):
+            if time.monotonic() >= deadline:
+                self.drained = False
+                return False
+            time.sleep(0.2)
+        self.drained = True
+        return True
+
+    def close(self):
+        if not self.flush():
+            logger.warning("📦 %d 条对象尚未写入 Weaviate，已保存在 spool（%s），下次运行或 "
+                           "python scripts/write_spool.py flush 时补写", self.spool.backlog(own_only=True),
+                           self.spool.path)
+
+    def report(self) -> str:
+        pending = self.spool.backlog(own_only=True)
+        return f"写入 spool {self.spooled} 条，本进程已补写到 Weaviate {self.spool.flushed} 条，待补写 {pending} 条，" \
+               f"失败 {self.spool.dead} 条"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def make_writer(spool: bool = WRITE_SPOOL) -> Callable[..., Any]:
+    """索引脚本用的写入器工厂：spool 开启时为 SpoolWriter，否则直接 BatchWriter"""
+    return SpoolWriter if spool else BatchWriter
+
+
+# ========= 命令行 =========
+def requeue(spool: WriteSpool) -> int:
+    """把 dead.jsonl 中的对象重新追加到 spool（修复 schema 等问题之后）"""
+    if not spool.dead_path.exists():
+        return 0
+    with open(spool.dead_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    for record in records:
+        record.pop("error", None)
+        forget_indexed(record)  # 重放成功前不算已索引
+        obj = {"class": record["class"], "id": record["id"], "properties": record["properties"],
+               "vector": decode_vector(record["vector"])}
+        spool.append(obj, record.get("key"), record.get("merge_notes"))
+    spool.seal()
+    spool.dead_path.unlink()
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate 写前日志（spool）")
+    parser.add_argument("--dir", default=WRITE_SPOOL_DIR, help="spool 目录")
+    parser.add_argument("--url", default=WEAVIATE_URL, help="Weaviate 地址")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="待补写与失败的对象数")
+    flush = sub.add_parser("flush", help="补写全部积压后退出")
+    flush.add_argument("--timeout", type=float, default=600, help="最长等待秒数")
+    sub.add_parser("requeue", help="把 dead.jsonl 中的对象重新排队")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.command == "status":
+        print(json.dumps(WriteSpool(args.dir).stats(), ensure_ascii=False, indent=2))
+        return
+    if args.command == "requeue":
+        spool = WriteSpool(args.dir)
+        print(f"🔁 重新排队 {requeue(spool)} 条")
+        spool.close()
+        return
+
+    spool, flusher = get_spool(args.dir, args.url)
+    deadline = time.monotonic() + args.timeout
+    while spool.backlog() and time.monotonic() < deadline:
+        time.sleep(0.5)
+    flusher.stop()
+    spool.close()
+    stats = spool.stats()
+    print(f"📦 已补写 {spool.flushed} 条，剩余 {stats['pending']} 条，失败 {stats['dead']} 条")
+    if stats["pending"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+飞书 #search 过滤条件解析：年限 / 学历 / 城市转为过滤条件，无法识别的值报错而不是被静默丢弃
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts.candidate_schema import build_where, split_filter_terms  # noqa: E402
+
+
+@pytest.mark.parametrize("text, query, filters", [
+    ("Java 年限:5", "Java", {"min_years": 5.0}),
+    ("Java 工作年限：5年", "Java", {"min_years": 5.0}),
+    ("Java 年限:3-5", "Java", {"min_years": 3.0, "max_years": 5.0}),
+    ("Java 年限:5+", "Java", {"min_years": 5.0}),
+    ("Java 年限:10年以内", "Java", {"max_years": 10.0}),
+    ("光学工程师 5年以上 本科及以上 深圳", "光学工程师", {"min_years": 5.0, "min_degree": "本科", "city": "深圳"}),
+    ("算法工程师 城市:深圳 城市:上海", "算法工程师", {"city": ["深圳", "上海"]}),
+])
+def test_split_filter_terms(text, query, filters):
+    assert split_filter_terms(text) == (query, filters)
+
+
+def test_unrecognised_years_rejected():
+    query, filters = split_filter_terms("Java 年限:很多")
+    assert query == "Java"
+    with pytest.raises(ValueError, match="min_years"):
+        build_where(filters)
+
+
+def test_years_filter_is_range():
+    where = build_where(split_filter_terms("Java 年限:5")[1])
+    assert where == {"path": ["years_experience"], "operator": "GreaterThanEqual", "valueNumber": 5.0}
@@ -0,0 +1,71 @@
+"""
+索引清单对账：从 Weaviate 补录的条目与索引脚本写入的内容哈希一致，未变的简历不会被重新向量化
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts import index_manifest  # noqa: E402
+from scripts.incremental_index import IncrementalIndex, candidate_uuid  # noqa: E402
+
+FILENAME = "张三_后端工程师.txt"
+CONTENT = "张三 后端工程师 5 年 Python 经验"
+ATTRIBUTES = {"name": "张三", "position": "后端工程师", "phone": "", "email": "",
+              "years_experience": 5.0, "degree": "本科", "degree_rank": 5}
+
+
+def remote_objects():
+    # Weaviate 返回的 number 属性整数值不带小数点，并带有 notes / ingested_at 等不参与哈希的属性
+    properties = {"filename": FILENAME, "content": CONTENT, **ATTRIBUTES, "years_experience": 5,
+                  "notes": ["已电话沟通"], "ingested_at": "2026-01-01T00:00:00+00:00"}
+    return [{"id": candidate_uuid(FILENAME), "class": "Candidates", "properties": properties}]
+
+
+def test_reconciled_object_is_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_manifest, "scan_collection", lambda url, cls: iter(remote_objects()))
+    manifest = index_manifest.IndexManifest("http://weaviate.invalid", "Candidates",
+                                            path=str(tmp_path / "manifest.sqlite3"))
+    assert manifest.reconcile()["added"] == 1
+
+    changes = IncrementalIndex(manifest.load(seed=False), "openai:text-embedding-3-small",
+                               weaviate_class="Candidates")
+    assert changes.classify(FILENAME, CONTENT, ATTRIBUTES) == "unchanged"
+    assert changes.classify(FILENAME, CONTENT, {**ATTRIBUTES, "city": "深圳"}) == "updated"
+
+    # 再次对账不应改写补录的条目
+    assert manifest.reconcile()["updated"] == 0
+
+
+def test_time_relative_years_not_hashed():
+    # “至今”的工作年限每月变化，不应导致重新向量化
+    aged = {**ATTRIBUTES, "years_experience": 5.1}
+    assert index_manifest.content_hash(CONTENT, aged) == index_manifest.content_hash(CONTENT, ATTRIBUTES)
+    assert index_manifest.content_hash(CONTENT, {**ATTRIBUTES, "degree": "硕士"}) != \
+        index_manifest.content_hash(CONTENT, ATTRIBUTES)
+
+
+def test_source_digest_skips_unchanged(tmp_path):
+    # 源摘要一致（且向量标识未变）时直接判定未变，无需选段；补录的条目首次判定未变后补记源摘要
+    signature = "openai:text-embedding-3-small"
+    manifest = index_manifest.IndexManifest("http://weaviate.invalid", "Candidates",
+                                            path=str(tmp_path / "manifest.sqlite3"))
+    resume_uuid = candidate_uuid(FILENAME)
+    manifest.record(resume_uuid, FILENAME, embedding_model=signature,
+                    digest=index_manifest.content_hash(CONTENT, ATTRIBUTES))
+    changes = IncrementalIndex(manifest, signature, weaviate_class="Candidates")
+    assert not changes.unchanged_source(FILENAME, "source-v1")
+
+    manifest.record_source(resume_uuid, "source-v1")
+    reloaded = index_manifest.IndexManifest("http://weaviate.invalid", "Candidates",
+                                            path=str(tmp_path / "manifest.sqlite3")).load(seed=False)
+    changes = IncrementalIndex(reloaded, signature, weaviate_class="Candidates")
+    assert changes.unchanged_source(FILENAME, "source-v1")
+    assert not changes.unchanged_source(FILENAME, "source-v2")
+    assert changes.counts["unchanged"] == 1
+    assert not IncrementalIndex(reloaded, "openai:text-embedding-3-large",
+                                weaviate_class="Candidates").unchanged_source(FILENAME, "source-v1")
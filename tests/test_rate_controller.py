@@ -0,0 +1,85 @@
+"""
+AIMD 限流器：成功时加性增加、限流 / 服务端错误时乘性减小（同一波失败只减一次），Retry-After 暂停整个 provider
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts import rate_controller  # noqa: E402
+from scripts.rate_controller import AdaptiveLimiter  # noqa: E402
+
+
+class Throttled(Exception):
+    def __init__(self, status=429, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(rate_controller.time, "sleep", lambda seconds: None)
+
+
+def flaky(failures, error=Throttled):
+    """前 failures 次调用抛 error，之后返回 "ok" """
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error()
+        return "ok"
+    fn.calls = calls
+    return fn
+
+
+def test_success_increases_budget_up_to_max():
+    limiter = AdaptiveLimiter("test", concurrency=2, rate=50.0, max_concurrency=3, max_rate=50.2)
+    for _ in range(30):
+        assert limiter.call(lambda: "ok") == "ok"
+    assert limiter.concurrency == 3
+    assert limiter.rate == 50.2
+    assert limiter.counters["succeeded"] == 30
+
+
+def test_throttle_halves_once_per_wave_then_retries():
+    limiter = AdaptiveLimiter("test", concurrency=8, rate=100.0, retries=3)
+    fn = flaky(2)
+    assert limiter.call(fn) == "ok"
+    assert len(fn.calls) == 3
+    # 连续两次限流发生在同一个请求间隔内，只减一次；随后的成功再略微增加
+    assert 4 <= limiter.concurrency < 5
+    assert limiter.counters["throttled"] == 2 and limiter.counters["retried"] == 2
+
+
+def test_retries_exhausted_raises():
+    limiter = AdaptiveLimiter("test", concurrency=4, rate=100.0, retries=1)
+    fn = flaky(5)
+    with pytest.raises(Throttled):
+        limiter.call(fn)
+    assert len(fn.calls) == 2
+    assert limiter.in_flight == 0
+
+
+def test_other_errors_are_not_retried():
+    limiter = AdaptiveLimiter("test", concurrency=4, rate=100.0, retries=3)
+    fn = flaky(1, error=lambda: Throttled(status=400))
+    with pytest.raises(Throttled):
+        limiter.call(fn)
+    assert len(fn.calls) == 1
+    assert limiter.concurrency == 4 and limiter.counters["failed"] == 1
+
+
+def test_retry_after_pauses_provider():
+    limiter = AdaptiveLimiter("test", concurrency=4, rate=100.0)
+    limiter.acquire()
+    limiter.release(False, throttled=True, retry_after=30)
+    assert limiter.snapshot()["paused_s"] > 25
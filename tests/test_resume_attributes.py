@@ -0,0 +1,41 @@
+"""
+学历归一化：英文别名只在学位语境中识别，没有教育模块时只看像教育经历的行
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts.resume_attributes import normalize_degree, typed_attributes  # noqa: E402
+
+
+@pytest.mark.parametrize("text, degree", [
+    ("硕士研究生", "硕士"),
+    ("Master of Science", "硕士"),
+    ("master's degree in EE", "硕士"),
+    ("清华大学 MBA", "硕士"),
+    ("EMBA学位", "硕士"),
+    ("Ph.D.", "博士"),
+    ("Bachelor of Arts", "本科"),
+    ("Master", "硕士"),              # 字段值本身就是学位名
+    ("Scrum Master 认证", None),
+    ("Microsoft Certified Master", None),
+    ("Associate Director", None),
+    ("Doctor 医生", None),
+])
+def test_normalize_degree(text, degree):
+    assert normalize_degree(text) == degree
+
+
+def test_scrum_master_is_not_a_degree():
+    text = "张三\n2015-2019 浙江大学 计算机科学 本科\nScrum Master 认证\n"
+    attributes = typed_attributes({}, text)
+    assert attributes["degree"] == "本科"
+    assert attributes["degree_rank"] == 5
+    assert "degree" not in typed_attributes({}, "李四\nScrum Master 认证\nPMP\n")
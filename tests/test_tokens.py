@@ -0,0 +1,32 @@
+"""
+按 token 窗口切分：窗口边界不能落在多字节字符中间（否则解码出 U+FFFD）
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts import tokens  # noqa: E402
+
+
+class ByteEncoding:
+    """字节级编码：每个字节一个 token，汉字与 emoji 都会跨越多个 token"""
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode_single_token_bytes(self, token):
+        return bytes([token])
+
+
+def test_split_by_tokens_keeps_characters_whole(monkeypatch):
+    monkeypatch.setattr(tokens, "_tiktoken_encoding", lambda model: ByteEncoding())
+    text = "光学工程师 Zemax 𠀀😀。" * 3
+    for max_tokens in (1, 2, 4, 7, 50):
+        parts = tokens.split_by_tokens(text, max_tokens)
+        assert "".join(parts) == text
+        assert all(parts) and not any("�" in part for part in parts)
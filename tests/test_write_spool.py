@@ -0,0 +1,95 @@
+"""
+写前日志（spool）：补写后确认并删除段文件；对象级错误移入 dead.jsonl 并移除索引清单条目；暂时性错误保留待重试
+运行：python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = Path(__file__).resolve().parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.append(str(root_dir))
+
+from scripts import write_spool  # noqa: E402
+from scripts.index_manifest import IndexManifest  # noqa: E402
+
+FAILURES = {}  # 对象 id -> BatchWriter 报告的错误
+
+
+class FakeBatchWriter:
+    """按 FAILURES 回调成功 / 失败，不发请求"""
+
+    def __init__(self, weaviate_url, weaviate_class, batch_size, on_success, on_failure):
+        self.on_success, self.on_failure = on_success, on_failure
+        self.items = []
+
+    def add(self, obj_id, properties, vector=None, key=None):
+        self.items.append((obj_id, key))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for obj_id, key in self.items:
+            if obj_id in FAILURES:
+                self.on_failure(key, FAILURES[obj_id])
+            else:
+                self.on_success(key)
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    FAILURES.clear()
+    manifest = IndexManifest("http://weaviate.invalid", "Candidates", path=str(tmp_path / "manifest.sqlite3"))
+    monkeypatch.setattr(write_spool, "BatchWriter", FakeBatchWriter)
+    monkeypatch.setattr(write_spool, "IndexManifest", lambda weaviate_class: manifest)
+    spool = write_spool.WriteSpool(str(tmp_path / "spool"))
+    spool.manifest = manifest
+    yield spool
+    spool.close()
+
+
+def append(spool, obj_id):
+    spool.append({"class": "Candidates", "id": obj_id, "properties": {"content": obj_id}, "vector": [0.5, 0.25]})
+
+
+def test_replay_acks_and_retires_segment(spool):
+    for obj_id in ("a", "b", "c"):
+        append(spool, obj_id)
+    spool.seal()
+    assert spool.backlog() == 3
+    assert spool.flush_once("http://weaviate.invalid") == (3, False)
+    assert spool.backlog() == 0
+    assert not list(spool.path.glob("*.seg")) and not list(spool.path.glob("*.ack"))
+    assert spool.flushed == 3
+
+
+def test_dead_letter_forgets_manifest_entry_and_requeue(spool):
+    spool.manifest.record("bad", "bad.txt", content="bad")
+    FAILURES["bad"] = "属性类型不符"
+    append(spool, "ok")
+    append(spool, "bad")
+    spool.seal()
+    assert spool.flush_once("http://weaviate.invalid") == (2, False)
+    assert spool.dead == 1 and spool.backlog() == 0
+    assert "bad" not in spool.manifest  # 否则之后的索引会把它判为未变，永远不再写入
+
+    spool.manifest.record("bad", "bad.txt", content="bad")
+    assert write_spool.requeue(spool) == 1
+    assert "bad" not in spool.manifest and not spool.dead_path.exists()
+    assert spool.backlog() == 1
+
+
+def test_transient_failure_stays_pending(spool):
+    FAILURES["a"] = "请求异常: Connection refused"
+    append(spool, "a")
+    append(spool, "b")
+    spool.seal()
+    processed, transient = spool.flush_once("http://weaviate.invalid")
+    assert (processed, transient) == (1, True)
+    assert spool.backlog() == 1 and spool.dead == 0
+    del FAILURES["a"]
+    assert spool.flush_once("http://weaviate.invalid") == (1, False)
+    assert spool.backlog() == 0